@@ -0,0 +1,143 @@
+"""Checking many sites in one go."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from app.rate_limit import RateLimitError
+from app.runner import build_request_row, get_report
+from app.utils.urls import normalize_site_url
+
+logger = logging.getLogger(__name__)
+
+# Called with the CheckRequest row of every finished site (e.g. to save it)
+RowCallback = Callable[[Any], Awaitable[None]]
+
+
+@dataclass
+class BatchStats:
+    """Progress and throughput of a batch."""
+
+    sites: int
+    completed: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus elapsed time and throughput."""
+        elapsed = time.monotonic() - self.started
+        done = self.completed + self.failed
+        return {
+            "sites": self.sites,
+            "completed": self.completed,
+            "failed": self.failed,
+            "elapsed_sec": round(elapsed, 3),
+            "sites_per_minute": round(done / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        }
+
+
+def unique_sites(site_urls: list[str]) -> list[str]:
+    """Drop repeated sites (same normalized URL), keeping the first occurrence."""
+    seen: set[str] = set()
+    unique = []
+    for site_url in site_urls:
+        key = normalize_site_url(site_url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(site_url)
+    return unique
+
+
+async def run_batch(
+    site_urls: list[str],
+    telegram_id: int,
+    force_refresh: bool = False,
+    concurrency: int = 10,
+    per_host_concurrency: int = 2,
+    on_row: Optional[RowCallback] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Check sites concurrently, yielding each result as soon as it is ready.
+
+    At most ``concurrency`` sites are checked at once and at most
+    ``per_host_concurrency`` of them on the same host. All runs share the
+    application connection pool, the report cache and in-flight runs.
+
+    Args:
+        site_urls: Websites to check (repeated sites are checked once)
+        telegram_id: Telegram user ID the checks are saved for
+        force_refresh: Ignore cached reports and run the checks
+        concurrency: Max sites checked at once
+        per_host_concurrency: Max sites of one host checked at once
+        on_row: Optional async callback receiving the CheckRequest row of
+            every finished site
+
+    Yields:
+        ``{"type": "result", ...}`` per site in completion order, then one
+        ``{"type": "summary", ...}`` with counters and throughput
+    """
+    sites = unique_sites(site_urls)
+    stats = BatchStats(sites=len(sites))
+    results: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def check_one(site_url: str) -> None:
+        host = (urlsplit(site_url).hostname or site_url).lower()
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_concurrency))
+        # Host slot first, so sites waiting for a busy host don't hold global slots
+        async with host_limit, global_limit:
+            created_at = datetime.utcnow()
+            start = time.monotonic()
+            response: Optional[dict[str, Any]] = None
+            error = {"code": "internal_error", "message": "Произошла внутренняя ошибка"}
+            try:
+                response = await get_report(site_url, force_refresh)
+            except RateLimitError as e:
+                error = e.error_body()["error"]
+            except Exception as e:
+                logger.error(f"Batch check of {site_url} failed: {e}", exc_info=True)
+            elapsed_ms = round((time.monotonic() - start) * 1000)
+
+        if response is not None:
+            stats.completed += 1
+            line = {
+                "type": "result",
+                "site_url": site_url,
+                "status": "completed",
+                "elapsed_ms": elapsed_ms,
+                "report": response,
+            }
+        else:
+            stats.failed += 1
+            line = {
+                "type": "result",
+                "site_url": site_url,
+                "status": "failed",
+                "elapsed_ms": elapsed_ms,
+                "error": error,
+            }
+
+        # Save before streaming: once the line is out the consumer may go
+        # away and cancel this task, which must not lose the row
+        if on_row is not None:
+            await asyncio.shield(
+                on_row(build_request_row(telegram_id, site_url, created_at, response))
+            )
+        await results.put(line)
+
+    tasks = [asyncio.ensure_future(check_one(site_url)) for site_url in sites]
+    try:
+        for _ in tasks:
+            yield await results.get()
+        summary = stats.as_dict()
+        logger.info(f"Batch of {summary['sites']} sites: {summary['sites_per_minute']} sites/min")
+        yield {"type": "summary", **summary}
+    finally:
+        # Consumer went away (e.g. client disconnected): stop the rest
+        for task in tasks:
+            task.cancel()
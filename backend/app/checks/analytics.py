@@ -2,10 +2,12 @@
 
 import httpx
 
+from app.fetcher import HttpClient
+
 from .base import CheckResult
 
 
-async def check_analytics(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_analytics(site_url: str, client: HttpClient) -> CheckResult:
     """Check for analytics counters (Yandex.Metrika, Google Analytics).
 
     Args:
@@ -1,13 +1,15 @@
 """Canonical URL check implementation."""
 
 import httpx
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
+from app.fetcher import HttpClient
+
 from .base import CheckResult
+from .document import get_page
 
 
-async def check_canonical(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_canonical(site_url: str, client: HttpClient) -> CheckResult:
     """Check canonical URL tag on main page.
 
     Args:
@@ -29,10 +31,9 @@ async def check_canonical(site_url: str, client: httpx.AsyncClient) -> CheckResu
                 category="technical",
             )
 
-        soup = BeautifulSoup(response.content, "html.parser")
-        canonical = soup.find("link", rel="canonical")
+        page = await get_page(response)
 
-        if not canonical:
+        if page.canonical is None:
             return CheckResult(
                 id="tech-canonical",
                 name="Canonical URL",
@@ -42,7 +43,7 @@ async def check_canonical(site_url: str, client: httpx.AsyncClient) -> CheckResu
                 category="technical",
             )
 
-        href = canonical.get("href", "")
+        href = page.canonical
         if not href:
             return CheckResult(
                 id="tech-canonical",
@@ -1,12 +1,14 @@
 """HTML sitemap check implementation."""
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.fetcher import HttpClient
 
 from .base import CheckResult
+from .document import get_page
 
 
-async def check_html_sitemap(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_html_sitemap(site_url: str, client: HttpClient) -> CheckResult:
     """Check for HTML sitemap presence.
 
     Args:
@@ -29,17 +31,19 @@ async def check_html_sitemap(site_url: str, client: httpx.AsyncClient) -> CheckR
                 response = await client.get(url, timeout=5.0)
 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    links = soup.find_all("a")
+                    page = await get_page(response)
 
-                    if len(links) >= 5:
+                    if page.link_count >= 5:
                         # Extract path from URL for display
                         path = url.replace(site_url, "")
                         return CheckResult(
                             id="content-sitemap-html",
                             name="HTML-карта сайта",
                             status="ok",
-                            message=f"✅ HTML-карта найдена ({path}), содержит {len(links)} ссылок",
+                            message=(
+                                f"✅ HTML-карта найдена ({path}), "
+                                f"содержит {page.link_count} ссылок"
+                            ),
                             category="content",
                         )
             except (httpx.TimeoutException, httpx.HTTPError):
@@ -1,12 +1,14 @@
 """OpenGraph tags check implementation."""
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.fetcher import HttpClient
 
 from .base import CheckResult
+from .document import get_page
 
 
-async def check_opengraph(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_opengraph(site_url: str, client: HttpClient) -> CheckResult:
     """Check OpenGraph tags on main page.
 
     Args:
@@ -34,29 +36,17 @@ async def check_opengraph(site_url: str, client: httpx.AsyncClient) -> CheckResu
                 category="content",
             )
 
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Check for OpenGraph tags (try both property= and name=)
-        og_title = soup.find("meta", property="og:title") or soup.find(
-            "meta", attrs={"name": "og:title"}
-        )
-        og_description = soup.find("meta", property="og:description") or soup.find(
-            "meta", attrs={"name": "og:description"}
-        )
-        og_image = soup.find("meta", property="og:image") or soup.find(
-            "meta", attrs={"name": "og:image"}
-        )
+        page = await get_page(response)
 
-        has_title = og_title is not None
-        has_description = og_description is not None
-        has_image = og_image is not None
+        # OpenGraph tags (both property= and name= count)
+        has_title = "og:title" in page.og_tags
+        has_description = "og:description" in page.og_tags
+        has_image = "og:image" in page.og_tags
 
         # Detect JS frameworks
         html_lower = response.text.lower()
         has_js_framework = (
-            soup.find(id="root")
-            or soup.find(id="__next")
-            or soup.find(id="app")
+            page.has_app_root
             or "react" in html_lower
             or "vue" in html_lower
         )
@@ -1,24 +1,54 @@
 """Schema.org microdata check implementation."""
 
-import json
+import asyncio
 import random
-from typing import Dict, List
+from typing import Optional
+from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.fetcher import HttpClient
+from app.robots import RobotsRules
 
 from .base import CheckResult
+from .document import get_page
+
+
+async def _extract_schema_types(response: httpx.Response) -> list[str]:
+    """Extract Schema.org types from LD+JSON scripts of a page.
+
+    Args:
+        response: Page HTTP response
+
+    Returns:
+        List of @type values (one entry per schema object)
+    """
+    page = await get_page(response)
+    return list(page.schema_types)
 
 
 async def check_schema_microdata(
-    site_url: str, sitemap_urls: List[str], client: httpx.AsyncClient
+    site_url: str,
+    sitemap_urls: list[str],
+    client: HttpClient,
+    max_concurrency_per_host: int = 5,
+    time_budget: float = 20.0,
+    robots: Optional[RobotsRules] = None,
 ) -> CheckResult:
     """Check Schema.org microdata on 15 pages.
 
+    Pages are fetched concurrently (at most ``max_concurrency_per_host`` at a
+    time per host). When ``time_budget`` runs out, pages still loading are
+    dropped and the result is built from the pages that finished. Sitemap
+    URLs disallowed by robots.txt are not sampled.
+
     Args:
         site_url: Website main URL
         sitemap_urls: List of URLs from sitemap
         client: Async HTTP client
+        max_concurrency_per_host: Max simultaneous requests to one host
+        time_budget: Overall time limit for sampling in seconds
+        robots: Optional parsed robots.txt of the site
 
     Returns:
         CheckResult with status ok/partial/problem/error
@@ -26,40 +56,47 @@ async def check_schema_microdata(
     try:
         # Select 15 pages: main + 14 random from sitemap
         pages_to_check = [site_url]
+        if robots is not None:
+            sitemap_urls = [url for url in sitemap_urls if robots.can_fetch(url)]
         if sitemap_urls:
             sample_size = min(14, len(sitemap_urls))
             pages_to_check.extend(random.sample(sitemap_urls, sample_size))
-        
-        # Check each page for Schema.org
-        all_schemas: Dict[str, int] = {}
+
+        host_limits: dict[str, asyncio.Semaphore] = {}
+
+        async def fetch_page(url: str) -> Optional[list[str]]:
+            host = urlparse(url).netloc
+            limit = host_limits.setdefault(host, asyncio.Semaphore(max_concurrency_per_host))
+            async with limit:
+                try:
+                    response = await client.get(url, timeout=5.0)
+                except (httpx.TimeoutException, httpx.RequestError):
+                    return None
+            if response.status_code != 200:
+                return None
+            return await _extract_schema_types(response)
+
+        # Check pages for Schema.org concurrently within the time budget
+        tasks = [asyncio.ensure_future(fetch_page(url)) for url in pages_to_check]
+        done, pending = await asyncio.wait(tasks, timeout=time_budget)
+        for task in pending:
+            task.cancel()
+        # Let cancelled fetches finish unwinding (release connections, semaphores)
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        all_schemas: dict[str, int] = {}
         pages_checked = 0
-        
-        for url in pages_to_check:
-            try:
-                response = await client.get(url, timeout=5.0)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    
-                    # Find all LD+JSON scripts
-                    for script in soup.find_all("script", type="application/ld+json"):
-                        try:
-                            data = json.loads(script.string)
-                            
-                            # Handle both single objects and arrays
-                            if isinstance(data, list):
-                                for item in data:
-                                    schema_type = item.get("@type", "Unknown")
-                                    all_schemas[schema_type] = all_schemas.get(schema_type, 0) + 1
-                            else:
-                                schema_type = data.get("@type", "Unknown")
-                                all_schemas[schema_type] = all_schemas.get(schema_type, 0) + 1
-                        except (json.JSONDecodeError, AttributeError):
-                            pass
-                    
-                    pages_checked += 1
-            except (httpx.TimeoutException, httpx.RequestError):  # Changed: use RequestError instead of HTTPError
+
+        for task in done:
+            if task.cancelled() or task.exception() is not None:
+                continue
+            schema_types = task.result()
+            if schema_types is None:
                 continue
-        
+            for schema_type in schema_types:
+                all_schemas[schema_type] = all_schemas.get(schema_type, 0) + 1
+            pages_checked += 1
+
         if pages_checked == 0:
             return CheckResult(
                 id="meta-schema",
@@ -68,33 +105,36 @@ async def check_schema_microdata(
                 message="⚠️ Не удалось проверить страницы",
                 category="content",
             )
-        
+
         # Check for key schema types
-        has_organization = (
-            "Organization" in all_schemas or "RealEstateAgent" in all_schemas
-        )
+        has_organization = "Organization" in all_schemas or "RealEstateAgent" in all_schemas
         has_apartment_complex = "ApartmentComplex" in all_schemas
         has_product = "Product" in all_schemas
         has_breadcrumb = "BreadcrumbList" in all_schemas
-        
+
         schema_count = len(all_schemas)
-        key_schemas_count = sum([
-            has_organization,
-            has_apartment_complex,
-            has_product,
-            has_breadcrumb
-        ])
-        
+        key_schemas_count = sum(
+            [has_organization, has_apartment_complex, has_product, has_breadcrumb]
+        )
+
         # Build message
         schemas_list = ", ".join(all_schemas.keys()) if all_schemas else "не найдено"
-        
+        budget_note = (
+            f" (не уложились во время: {len(pending)} из {len(pages_to_check)} страниц)"
+            if pending
+            else ""
+        )
+
         # Evaluate
         if schema_count == 0:
             return CheckResult(
                 id="meta-schema",
                 name="Микроразметка Schema.org",
                 status="problem",
-                message=f"❌ Микроразметка отсутствует (проверено {pages_checked} страниц)",
+                message=(
+                    f"❌ Микроразметка отсутствует (проверено {pages_checked} страниц)"
+                    f"{budget_note}"
+                ),
                 severity="important",
                 category="content",
             )
@@ -103,7 +143,10 @@ async def check_schema_microdata(
                 id="meta-schema",
                 name="Микроразметка Schema.org",
                 status="ok",
-                message=f"✅ Микроразметка настроена ({schema_count} типов): {schemas_list}",
+                message=(
+                    f"✅ Микроразметка настроена ({schema_count} типов): "
+                    f"{schemas_list}{budget_note}"
+                ),
                 category="content",
             )
         elif has_organization:
@@ -111,7 +154,10 @@ async def check_schema_microdata(
                 id="meta-schema",
                 name="Микроразметка Schema.org",
                 status="partial",
-                message=f"⚠️ Есть Organization, но мало типов ({schema_count}): {schemas_list}",
+                message=(
+                    f"⚠️ Есть Organization, но мало типов ({schema_count}): "
+                    f"{schemas_list}{budget_note}"
+                ),
                 severity="important",
                 category="content",
             )
@@ -120,11 +166,14 @@ async def check_schema_microdata(
                 id="meta-schema",
                 name="Микроразметка Schema.org",
                 status="partial",
-                message=f"⚠️ Разметка неполная, нет Organization ({schema_count} типов): {schemas_list}",
+                message=(
+                    f"⚠️ Разметка неполная, нет Organization ({schema_count} типов): "
+                    f"{schemas_list}{budget_note}"
+                ),
                 severity="important",
                 category="content",
             )
-            
+
     except Exception as e:
         return CheckResult(
             id="meta-schema",
@@ -0,0 +1,137 @@
+"""Parsed HTML pages shared by HTML-based checks."""
+
+import asyncio
+import json
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from app.metrics import record_parse
+from app.parse_pool import run_parser
+
+# lxml is several times faster than the pure-Python html.parser on big pages
+HTML_PARSER = "lxml"
+
+# OpenGraph tags reported by the summary
+OG_TAGS = ("og:title", "og:description", "og:image")
+
+
+@dataclass(frozen=True)
+class PageSummary:
+    """Everything HTML checks need from a page.
+
+    Built in a worker process for big pages, so it holds plain values only
+    (no DOM) and pickles cheaply.
+    """
+
+    title: str = ""  # Text of <title>, stripped
+    meta_description: str = ""  # content of <meta name="description">, stripped
+    meta_robots: Optional[str] = None  # content of <meta name="robots">, None if absent
+    canonical: Optional[str] = None  # href of <link rel="canonical">, None if absent
+    og_tags: frozenset[str] = field(default_factory=frozenset)  # Present OG_TAGS
+    has_app_root: bool = False  # SPA mount point (#root, #__next, #app)
+    h1_count: int = 0
+    h2_count: int = 0
+    link_count: int = 0  # <a> elements
+    schema_types: tuple[Any, ...] = ()  # @type of every LD+JSON object
+
+
+def _schema_types(soup: BeautifulSoup) -> list[Any]:
+    """Extract Schema.org types from LD+JSON scripts."""
+    schema_types: list[Any] = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string)
+
+            # Handle both single objects and arrays
+            if isinstance(data, list):
+                for item in data:
+                    schema_types.append(item.get("@type", "Unknown"))
+            else:
+                schema_types.append(data.get("@type", "Unknown"))
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            pass
+    return schema_types
+
+
+def summarize_html(content: bytes) -> PageSummary:
+    """Parse page and extract what HTML checks need.
+
+    Runs in parse worker processes, so it must stay a module-level function.
+
+    Args:
+        content: Page HTML bytes
+
+    Returns:
+        Page summary
+    """
+    soup = BeautifulSoup(content, HTML_PARSER)
+
+    title_tag = soup.find("title")
+    desc_tag = soup.find("meta", {"name": "description"})
+    robots_tag = soup.find("meta", {"name": "robots"})
+    canonical_tag = soup.find("link", rel="canonical")
+
+    og_tags = frozenset(
+        tag
+        for tag in OG_TAGS
+        if soup.find("meta", property=tag) or soup.find("meta", attrs={"name": tag})
+    )
+
+    return PageSummary(
+        title=title_tag.get_text().strip() if title_tag else "",
+        meta_description=str(desc_tag.get("content", "")).strip()
+        if isinstance(desc_tag, Tag)
+        else "",
+        meta_robots=str(robots_tag.get("content", "")) if isinstance(robots_tag, Tag) else None,
+        canonical=str(canonical_tag.get("href", "")) if isinstance(canonical_tag, Tag) else None,
+        og_tags=og_tags,
+        has_app_root=bool(soup.find(id="root") or soup.find(id="__next") or soup.find(id="app")),
+        h1_count=len(soup.find_all("h1")),
+        h2_count=len(soup.find_all("h2")),
+        link_count=len(soup.find_all("a")),
+        schema_types=tuple(_schema_types(soup)),
+    )
+
+
+# Summaries (or summaries being built) keyed by response object. PageFetcher
+# hands the same response to every check asking for a URL, so each URL is
+# parsed once per run; entries go away together with the response.
+_summaries: "weakref.WeakKeyDictionary[Any, asyncio.Future[PageSummary]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_page(response: Any) -> PageSummary:
+    """Get summary of an HTTP response, parsing it on first use.
+
+    Big pages are parsed in a worker process (see ``app.parse_pool``);
+    checks asking for the same response while it is parsed wait for the
+    same result. Waiting time is added to the timings of the calling check.
+
+    Args:
+        response: HTTP response with ``content``
+
+    Returns:
+        Page summary (shared between all callers with the same response)
+    """
+    start = time.perf_counter()
+    try:
+        future = _summaries.get(response)
+    except TypeError:
+        # Response objects that can't be weak-referenced are parsed every time
+        future = None
+    else:
+        if future is None:
+            future = asyncio.ensure_future(run_parser(summarize_html, response.content))
+            _summaries[response] = future
+
+    try:
+        if future is None:
+            return await run_parser(summarize_html, response.content)
+        return await asyncio.shield(future)
+    finally:
+        record_parse(time.perf_counter() - start)
@@ -1,12 +1,14 @@
 """Headings check implementation."""
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.fetcher import HttpClient
 
 from .base import CheckResult
+from .document import get_page
 
 
-async def check_headings(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_headings(site_url: str, client: HttpClient) -> CheckResult:
     """Check H1 and H2 structure.
 
     Args:
@@ -27,13 +29,10 @@ async def check_headings(site_url: str, client: httpx.AsyncClient) -> CheckResul
                 message="⚠️ Не удалось загрузить главную страницу",
             )
 
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        h1_tags = soup.find_all("h1")
-        h2_tags = soup.find_all("h2")
+        page = await get_page(response)
 
-        h1_count = len(h1_tags)
-        h2_count = len(h2_tags)
+        h1_count = page.h1_count
+        h2_count = page.h2_count
 
         if h1_count == 0:
             return CheckResult(
@@ -1,12 +1,14 @@
 """Meta tags check implementation."""
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.fetcher import HttpClient
 
 from .base import CheckResult
+from .document import get_page
 
 
-async def check_meta_tags(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_meta_tags(site_url: str, client: HttpClient) -> CheckResult:
     """Check meta tags (title and description).
 
     Args:
@@ -27,20 +29,14 @@ async def check_meta_tags(site_url: str, client: httpx.AsyncClient) -> CheckResu
                 message="⚠️ Не удалось загрузить главную страницу",
             )
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        page = await get_page(response)
 
         # Check title
-        title_tag = soup.find("title")
-        title = title_tag.get_text().strip() if title_tag else ""
+        title = page.title
         title_len = len(title)
 
         # Check description
-        desc_tag = soup.find("meta", {"name": "description"})
-        description = (
-            str(desc_tag.get("content", "")).strip()
-            if desc_tag and hasattr(desc_tag, "get")
-            else ""
-        )
+        description = page.meta_description
         desc_len = len(description)
 
         issues = []
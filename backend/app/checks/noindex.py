@@ -1,12 +1,14 @@
 """Noindex check implementation."""
 
 import httpx
-from bs4 import BeautifulSoup
+
+from app.fetcher import HttpClient
 
 from .base import CheckResult
+from .document import get_page
 
 
-async def check_noindex(site_url: str, client: httpx.AsyncClient) -> CheckResult:
+async def check_noindex(site_url: str, client: HttpClient) -> CheckResult:
     """Check for noindex on main page.
 
     Args:
@@ -39,12 +41,10 @@ async def check_noindex(site_url: str, client: httpx.AsyncClient) -> CheckResult
             )
 
         # Check meta robots tag
-        soup = BeautifulSoup(response.content, "html.parser")
-        meta_robots = soup.find("meta", {"name": "robots"})
+        page = await get_page(response)
 
-        if meta_robots and hasattr(meta_robots, "get"):
-            content = str(meta_robots.get("content", "")).lower()
-            if "noindex" in content:
+        if page.meta_robots is not None:
+            if "noindex" in page.meta_robots.lower():
                 return CheckResult(
                     id="tech-noindex",
                     name="Noindex Check",
@@ -0,0 +1,286 @@
+"""Registry of SEO checks and the scheduler running them.
+
+Every check is registered with the data it needs (``inputs``) and the data it
+provides to other checks (``outputs``). The scheduler starts all checks at
+once; a check with inputs waits only for the checks producing them, not for
+the whole batch. Pages themselves (homepage, robots.txt, ...) are not inputs:
+checks fetch them through the run's ``PageFetcher``, which downloads each URL
+once however many checks ask for it.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.database import settings
+from app.deadline import Deadline
+from app.fetcher import HttpClient
+from app.metrics import CheckTimings, current_timings
+from app.robots import ROBOTS_TIMEOUT, robots_cache
+
+from .analytics import check_analytics
+from .base import CheckResult
+from .check_canonical import check_canonical
+from .check_html_sitemap import check_html_sitemap
+from .check_opengraph import check_opengraph
+from .check_schema import check_schema_microdata
+from .headings import check_headings
+from .meta_tags import check_meta_tags
+from .noindex import check_noindex
+from .robots_txt import inspect_robots_txt
+from .sitemap_xml import check_sitemap_xml
+
+
+@dataclass
+class CheckContext:
+    """Everything a check gets to run."""
+
+    site_url: str
+    client: HttpClient
+    inputs: dict[str, Any] = field(default_factory=dict)
+    deadline: Optional[Deadline] = None
+    force_refresh: bool = False  # Don't reuse data cached by earlier runs
+
+
+# Check result and values of the declared outputs
+CheckOutput = tuple[CheckResult, dict[str, Any]]
+CheckFunc = Callable[[CheckContext], Awaitable[CheckOutput]]
+ResultCallback = Callable[[CheckResult], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class CheckSpec:
+    """Registered check."""
+
+    id: str
+    category: str
+    run: CheckFunc
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+class CheckRegistry:
+    """Ordered collection of checks.
+
+    Registration order is the order of results in the report. An input must
+    be produced by a check registered earlier, so the dependency graph can't
+    have cycles.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._specs: dict[str, CheckSpec] = {}
+
+    def register(self, spec: CheckSpec) -> CheckSpec:
+        """Add a check.
+
+        Args:
+            spec: Check to add
+
+        Returns:
+            The same spec
+
+        Raises:
+            ValueError: If the ID is taken or an input has no producer yet
+        """
+        if spec.id in self._specs:
+            raise ValueError(f"Check {spec.id} is already registered")
+        produced = {name for known in self._specs.values() for name in known.outputs}
+        missing = [name for name in spec.inputs if name not in produced]
+        if missing:
+            raise ValueError(f"Check {spec.id} needs unknown inputs: {', '.join(missing)}")
+        self._specs[spec.id] = spec
+        return spec
+
+    def check(
+        self,
+        id: str,
+        category: str,
+        inputs: tuple[str, ...] = (),
+        outputs: tuple[str, ...] = (),
+    ) -> Callable[[CheckFunc], CheckFunc]:
+        """Decorator registering a check function."""
+
+        def decorator(func: CheckFunc) -> CheckFunc:
+            self.register(CheckSpec(id, category, func, inputs, outputs))
+            return func
+
+        return decorator
+
+    def specs(self, disabled: Iterable[str] = ()) -> list[CheckSpec]:
+        """Get enabled checks in registration order.
+
+        Args:
+            disabled: IDs of checks to leave out
+
+        Returns:
+            List of check specs
+        """
+        skip = set(disabled)
+        return [spec for spec in self._specs.values() if spec.id not in skip]
+
+
+def enabled_checks() -> list[CheckSpec]:
+    """Get checks enabled in this deployment (see ``DISABLED_CHECKS``)."""
+    disabled = [check_id.strip() for check_id in settings.disabled_checks.split(",")]
+    return registry.specs(disabled=[check_id for check_id in disabled if check_id])
+
+
+async def run_scheduled(
+    specs: list[CheckSpec],
+    site_url: str,
+    client: HttpClient,
+    on_result: Optional[ResultCallback] = None,
+    deadline: Optional[Deadline] = None,
+    timings: Optional[dict[str, CheckTimings]] = None,
+    force_refresh: bool = False,
+) -> list[Any]:
+    """Run checks, starting each one as soon as its inputs are ready.
+
+    Inputs whose producer is not among ``specs`` or failed are passed as None.
+    Checks still running when the deadline passes are cancelled.
+
+    Args:
+        specs: Checks to run
+        site_url: Website URL to check
+        client: HTTP client shared by the checks
+        on_result: Optional async callback invoked with each check result
+            as soon as it is ready
+        deadline: Optional deadline of the run
+        timings: Optional dict filled with timings of every check by ID
+            (time waiting for inputs is not included)
+        force_refresh: Don't reuse data cached by earlier runs (robots.txt)
+
+    Returns:
+        CheckResult or raised exception for each spec, in order of ``specs``
+        (``TimeoutError`` for checks cut off by the deadline)
+    """
+    loop = asyncio.get_running_loop()
+    produced: dict[str, asyncio.Future[Any]] = {
+        name: loop.create_future() for spec in specs for name in spec.outputs
+    }
+
+    async def run_one(spec: CheckSpec) -> CheckResult:
+        outputs: dict[str, Any] = {}
+        # Every check runs in its own task, so the fetcher and the parser
+        # add to the timings of this check only
+        check_timings = CheckTimings()
+        current_timings.set(check_timings)
+        if timings is not None:
+            timings[spec.id] = check_timings
+        start: Optional[float] = None
+        try:
+            inputs = {
+                name: await produced[name] if name in produced else None for name in spec.inputs
+            }
+            start = time.perf_counter()
+            ctx = CheckContext(site_url, client, inputs, deadline, force_refresh)
+            result, outputs = await spec.run(ctx)
+        finally:
+            if start is not None:
+                check_timings.total_sec = time.perf_counter() - start
+            for name in spec.outputs:
+                if not produced[name].done():
+                    produced[name].set_result(outputs.get(name))
+
+        if on_result is not None:
+            await on_result(result)
+        return result
+
+    tasks = [asyncio.ensure_future(run_one(spec)) for spec in specs]
+    if not tasks:
+        return []
+
+    _, pending = await asyncio.wait(
+        tasks, timeout=deadline.remaining() if deadline is not None else None
+    )
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results: list[Any] = []
+    for spec, task in zip(specs, tasks):
+        if task.cancelled():
+            results.append(TimeoutError(f"Check {spec.id} cut off by run deadline"))
+        else:
+            results.append(task.exception() or task.result())
+    return results
+
+
+def _single(check: Callable[[str, HttpClient], Awaitable[CheckResult]]) -> CheckFunc:
+    """Adapt a plain ``check(site_url, client)`` function."""
+
+    async def run(ctx: CheckContext) -> CheckOutput:
+        return await check(ctx.site_url, ctx.client), {}
+
+    return run
+
+
+registry = CheckRegistry()
+
+
+@registry.check("tech-robots", "technical", outputs=("robots",))
+async def _robots(ctx: CheckContext) -> CheckOutput:
+    # Parsed rules are cached per site and shared with the sitemap and schema checks
+    result, robots = await inspect_robots_txt(
+        ctx.site_url,
+        ctx.client,
+        cache=robots_cache,
+        refresh=ctx.force_refresh,
+        timeout=ctx.deadline.timeout(ROBOTS_TIMEOUT) if ctx.deadline is not None else None,
+    )
+    return result, {"robots": robots.rules if robots is not None else None}
+
+
+@registry.check("tech-sitemap", "technical", inputs=("robots",), outputs=("sitemap_urls",))
+async def _sitemap(ctx: CheckContext) -> CheckOutput:
+    result, urls = await check_sitemap_xml(
+        ctx.site_url,
+        ctx.client,
+        max_urls=settings.sitemap_max_urls,
+        index_concurrency=settings.sitemap_index_concurrency,
+        robots=ctx.inputs["robots"],
+        # Stop reading before the run deadline, so the URLs read so far are kept;
+        # the second margin is left to the schema check that samples them
+        time_budget=(
+            ctx.deadline.timeout(
+                settings.sitemap_budget_sec, margin=2 * settings.check_deadline_margin_sec
+            )
+            if ctx.deadline is not None
+            else settings.sitemap_budget_sec
+        ),
+    )
+    return result, {"sitemap_urls": urls}
+
+
+registry.register(CheckSpec("tech-analytics", "technical", _single(check_analytics)))
+registry.register(CheckSpec("tech-noindex", "technical", _single(check_noindex)))
+registry.register(CheckSpec("content-meta", "technical", _single(check_meta_tags)))
+registry.register(CheckSpec("content-headings", "technical", _single(check_headings)))
+registry.register(CheckSpec("tech-canonical", "technical", _single(check_canonical)))
+registry.register(CheckSpec("content-opengraph", "content", _single(check_opengraph)))
+registry.register(CheckSpec("content-sitemap-html", "content", _single(check_html_sitemap)))
+
+
+# NOTE: check_page_speed (Playwright) temporarily disabled - requires Docker setup
+@registry.check("meta-schema", "content", inputs=("sitemap_urls", "robots"))
+async def _schema(ctx: CheckContext) -> CheckOutput:
+    # Schema check on 15 pages (homepage comes from the fetcher cache)
+    result = await check_schema_microdata(
+        ctx.site_url,
+        ctx.inputs["sitemap_urls"] or [],
+        ctx.client,
+        max_concurrency_per_host=settings.schema_sample_concurrency,
+        # Stop sampling before the run deadline, so the partial result is kept
+        time_budget=(
+            ctx.deadline.timeout(
+                settings.schema_sample_budget_sec, margin=settings.check_deadline_margin_sec
+            )
+            if ctx.deadline is not None
+            else settings.schema_sample_budget_sec
+        ),
+        robots=ctx.inputs["robots"],
+    )
+    return result, {}
@@ -1,74 +1,118 @@
 """Robots.txt check implementation."""
 
+from typing import Optional
+
 import httpx
 
+from app.fetcher import HttpClient
+from app.robots import ROBOTS_TIMEOUT, RobotsCache, RobotsFile, fetch_robots
+
 from .base import CheckResult
 
 
-async def check_robots_txt(site_url: str, client: httpx.AsyncClient) -> CheckResult:
-    """Check robots.txt presence and content.
+async def inspect_robots_txt(
+    site_url: str,
+    client: HttpClient,
+    cache: Optional[RobotsCache] = None,
+    refresh: bool = False,
+    timeout: Optional[float] = None,
+) -> tuple[CheckResult, Optional[RobotsFile]]:
+    """Check robots.txt and return the parsed file for other checks.
 
     Args:
         site_url: Website URL to check
         client: Async HTTP client
+        cache: Optional cache of parsed files shared between runs
+        refresh: Download the file even if ``cache`` has it
+        timeout: Max seconds to wait for the file (None: request timeout)
 
     Returns:
-        CheckResult with status ok/partial/problem/error
+        Tuple of (CheckResult, parsed file or None if it couldn't be downloaded)
     """
     url = f"{site_url}/robots.txt"
 
     try:
-        response = await client.get(url, timeout=5.0)
-
-        if response.status_code != 200:
-            return CheckResult(
-                id="tech-robots",
-                name="Robots.txt",
-                status="problem",
-                message="❌ Файл robots.txt не найден",
-                severity="critical",
-            )
-
-        content = response.text.lower()
-
-        has_user_agent = "user-agent:" in content
-        has_sitemap = "sitemap:" in content
-
-        if has_user_agent and has_sitemap:
-            return CheckResult(
-                id="tech-robots",
-                name="Robots.txt",
-                status="ok",
-                message="✅ Файл найден, содержит User-agent и Sitemap",
-            )
-        elif has_user_agent:
-            return CheckResult(
+        if cache is not None:
+            robots = await cache.get(url, client, refresh=refresh, timeout=timeout)
+        else:
+            request_timeout = ROBOTS_TIMEOUT if timeout is None else min(timeout, ROBOTS_TIMEOUT)
+            robots = await fetch_robots(url, client, request_timeout)
+    except httpx.TimeoutException:
+        return (
+            CheckResult(
                 id="tech-robots",
                 name="Robots.txt",
-                status="partial",
-                message="⚠️ Файл найден, но отсутствует Sitemap",
-                severity="important",
-            )
-        else:
-            return CheckResult(
+                status="error",
+                message="⚠️ Timeout при проверке robots.txt",
+            ),
+            None,
+        )
+    except Exception as e:
+        return (
+            CheckResult(
                 id="tech-robots",
                 name="Robots.txt",
-                status="problem",
-                message="❌ Файл найден, но отсутствует User-agent",
-                severity="critical",
-            )
+                status="error",
+                message=f"⚠️ Ошибка проверки: {str(e)}",
+            ),
+            None,
+        )
 
-    except httpx.TimeoutException:
-        return CheckResult(
+    rules = robots.rules
+    if not robots.found:
+        result = CheckResult(
             id="tech-robots",
             name="Robots.txt",
-            status="error",
-            message="⚠️ Timeout при проверке robots.txt",
+            status="problem",
+            message="❌ Файл robots.txt не найден",
+            severity="critical",
         )
-    except Exception as e:
-        return CheckResult(
+    elif not rules.user_agents:
+        result = CheckResult(
             id="tech-robots",
             name="Robots.txt",
-            status="error",
-            message=f"⚠️ Ошибка проверки: {str(e)}",
+            status="problem",
+            message="❌ Файл найден, но отсутствует User-agent",
+            severity="critical",
         )
+    elif not rules.can_fetch(f"{site_url}/", "*"):
+        result = CheckResult(
+            id="tech-robots",
+            name="Robots.txt",
+            status="problem",
+            message="❌ Файл запрещает индексацию главной страницы (Disallow: /)",
+            severity="critical",
+        )
+    elif rules.sitemaps:
+        result = CheckResult(
+            id="tech-robots",
+            name="Robots.txt",
+            status="ok",
+            message="✅ Файл найден, содержит User-agent и Sitemap",
+        )
+    else:
+        result = CheckResult(
+            id="tech-robots",
+            name="Robots.txt",
+            status="partial",
+            message="⚠️ Файл найден, но отсутствует Sitemap",
+            severity="important",
+        )
+    return result, robots
+
+
+async def check_robots_txt(
+    site_url: str, client: HttpClient, cache: Optional[RobotsCache] = None
+) -> CheckResult:
+    """Check robots.txt presence and content.
+
+    Args:
+        site_url: Website URL to check
+        client: Async HTTP client
+        cache: Optional cache of parsed files shared between runs
+
+    Returns:
+        CheckResult with status ok/partial/problem/error
+    """
+    result, _ = await inspect_robots_txt(site_url, client, cache)
+    return result
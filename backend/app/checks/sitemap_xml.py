@@ -1,78 +1,354 @@
 """Sitemap.xml check implementation."""
 
+import asyncio
+import random
 import xml.etree.ElementTree as ElementTree
-from typing import List, Tuple
+import zlib
+from collections.abc import Callable
+from typing import Optional
 
 import httpx
 
+from app.fetcher import HttpClient
+from app.robots import RobotsRules
+
 from .base import CheckResult
 
+SITEMAP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; SEOChecker/1.0; +https://seo-checker.com/bot)",
+    "Accept": "application/xml,text/xml,*/*",
+}
+
+# .xml.gz sitemaps come as gzip files, not as gzip Content-Encoding
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Max decompressed bytes produced from one step (protects from gzip bombs)
+DECOMPRESS_CHUNK = 64 * 1024
+
+# Number of sitemap URLs returned for page sampling
+SAMPLE_SIZE = 100
+
+# Child sitemap URLs kept from one sitemap index
+MAX_INDEX_CHILDREN = 1000
+
+# Sitemap indexes nested deeper than this are not followed
+MAX_INDEX_DEPTH = 2
+
+
+def _local_name(tag: str) -> str:
+    """Strip XML namespace from a tag name."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapParser:
+    """Incremental parser of ``<urlset>`` and ``<sitemapindex>`` documents.
+
+    The body is fed in chunks as it is downloaded, gzip is detected and
+    decompressed on the fly. Entries are dropped from the tree right after
+    they are read, so memory use does not depend on the sitemap size.
+    """
+
+    def __init__(self, on_url: Callable[[str], None]) -> None:
+        """Initialize parser.
+
+        Args:
+            on_url: Called with every page URL of a ``<urlset>``
+        """
+        self._on_url = on_url
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._decompressor: Optional["zlib._Decompress"] = None
+        self._started = False
+        self._root: Optional[ElementTree.Element] = None
+        self._depth = 0
+        self.is_index = False
+        self.sitemaps: list[str] = []  # Child sitemaps (first MAX_INDEX_CHILDREN)
+        self.sitemaps_total = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse next chunk of the body.
+
+        Raises:
+            ElementTree.ParseError: If the document is not valid XML
+            zlib.error: If gzip data is corrupted
+        """
+        if not self._started:
+            self._started = True
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._decompressor is None:
+            self._parse(chunk)
+            return
+
+        while chunk:
+            self._parse(self._decompressor.decompress(chunk, DECOMPRESS_CHUNK))
+            chunk = self._decompressor.unconsumed_tail
+
+    def close(self) -> None:
+        """Finish parsing.
+
+        Raises:
+            ElementTree.ParseError: If the document is empty or incomplete
+        """
+        self._parser.close()
+
+    def _parse(self, data: bytes) -> None:
+        """Feed raw XML and handle finished elements."""
+        self._parser.feed(data)
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                if self._root is None:
+                    self._root = element
+                    self.is_index = _local_name(element.tag) == "sitemapindex"
+                continue
+
+            # <loc> of an entry is on the third level: <urlset><url><loc>
+            # (deeper ones belong to extensions such as <image:loc>)
+            name = _local_name(element.tag)
+            if name == "loc" and self._depth == 3 and element.text and element.text.strip():
+                self._add_loc(element.text.strip())
+            elif self._depth == 2 and self._root is not None:
+                # Entry is read: drop it from the tree
+                self._root.clear()
+            self._depth -= 1
+
+    def _add_loc(self, loc: str) -> None:
+        """Handle URL of a page or of a child sitemap."""
+        if not self.is_index:
+            self._on_url(loc)
+            return
+        self.sitemaps_total += 1
+        if len(self.sitemaps) < MAX_INDEX_CHILDREN:
+            self.sitemaps.append(loc)
+
+
+class _UrlCollector:
+    """Counts sitemap URLs up to a cap and keeps a random sample of them."""
+
+    def __init__(self, max_urls: int) -> None:
+        self.max_urls = max_urls
+        self.urls_total = 0
+        self.sample: list[str] = []
+        self.sitemaps_read = 0
+        self.sitemaps_failed = 0
+        self.timed_out = False  # Children left unread when the time budget ran out
+
+    @property
+    def full(self) -> bool:
+        """Whether the URL cap is reached."""
+        return self.urls_total >= self.max_urls
+
+    def add(self, url: str) -> None:
+        """Count URL and maybe put it into the sample (reservoir sampling)."""
+        if self.full:
+            return
+        self.urls_total += 1
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(url)
+            return
+        index = random.randrange(self.urls_total)
+        if index < SAMPLE_SIZE:
+            self.sample[index] = url
+
+
+async def _read_sitemap(
+    url: str, client: HttpClient, collector: _UrlCollector
+) -> Optional[SitemapParser]:
+    """Download and parse one sitemap, streaming the body.
+
+    Reading stops early once the collector is full.
+
+    Returns:
+        Parser with the document info, or None if the sitemap is not available
+    """
+    async with client.stream("GET", url, timeout=15.0, headers=SITEMAP_HEADERS) as response:
+        if response.status_code != 200:
+            return None
+
+        parser = SitemapParser(collector.add)
+        async for chunk in response.aiter_bytes():
+            parser.feed(chunk)
+            if collector.full:
+                return parser
+        parser.close()
+        return parser
+
+
+async def _read_index_children(
+    urls: list[str],
+    client: HttpClient,
+    collector: _UrlCollector,
+    concurrency: int,
+    depth: int = 1,
+) -> None:
+    """Read child sitemaps of an index concurrently until the URL cap."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def read_child(url: str) -> None:
+        async with semaphore:
+            if collector.full:
+                return
+            try:
+                parser = await _read_sitemap(url, client, collector)
+            except (httpx.HTTPError, ElementTree.ParseError, zlib.error):
+                parser = None
+        if parser is None:
+            collector.sitemaps_failed += 1
+            return
+        collector.sitemaps_read += 1
+        if parser.is_index and depth < MAX_INDEX_DEPTH:
+            await _read_index_children(parser.sitemaps, client, collector, concurrency, depth + 1)
+
+    await asyncio.gather(*(read_child(url) for url in urls))
+
 
 async def check_sitemap_xml(
-    site_url: str, client: httpx.AsyncClient
-) -> Tuple[CheckResult, List[str]]:
+    site_url: str,
+    client: HttpClient,
+    max_urls: int = 50_000,
+    index_concurrency: int = 4,
+    robots: Optional[RobotsRules] = None,
+    time_budget: Optional[float] = None,
+) -> tuple[CheckResult, list[str]]:
     """Check sitemap.xml presence and validity.
 
+    The sitemap is parsed while it is downloaded (gzip supported), so big
+    sitemaps don't have to fit in memory. For a sitemap index child sitemaps
+    are read concurrently until ``max_urls`` URLs are counted.
+
+    Sitemaps declared in robots.txt are used instead of ``/sitemap.xml``:
+    the first one is checked, the rest are read like children of an index.
+    ``/sitemap.xml`` is still tried if the first declared one is missing.
+
+    Child sitemaps of an index are no longer read once ``time_budget`` runs
+    out; URLs counted by then make a partial result instead of losing the
+    whole check to the run deadline.
+
     Args:
         site_url: Website URL to check
         client: Async HTTP client
+        max_urls: Stop reading after this many URLs
+        index_concurrency: Max child sitemaps downloaded at once
+        robots: Optional parsed robots.txt of the site
+        time_budget: Max seconds for reading child sitemaps (None = no limit)
 
     Returns:
-        Tuple of (CheckResult, list of URLs from sitemap)
+        Tuple of (CheckResult, random sample of URLs from sitemap)
     """
-    url = f"{site_url}/sitemap.xml"
-    sitemap_urls: List[str] = []
+    default_url = f"{site_url}/sitemap.xml"
+    declared = list(robots.sitemaps) if robots is not None else []
+    url = declared[0] if declared else default_url
+    collector = _UrlCollector(max_urls)
+    loop = asyncio.get_running_loop()
+    stop_at = None if time_budget is None else loop.time() + time_budget
 
     try:
-        # Use longer timeout and browser-like headers for better compatibility
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; SEOChecker/1.0; +https://seo-checker.com/bot)",
-            "Accept": "application/xml,text/xml,*/*",
-        }
-        response = await client.get(url, timeout=15.0, headers=headers)
+        parser = await _read_sitemap(url, client, collector)
+        if parser is None and url != default_url:
+            url = default_url
+            parser = await _read_sitemap(url, client, collector)
 
-        if response.status_code != 200:
+        if parser is None:
+            message = "❌ Файл sitemap.xml не найден"
+            if declared:
+                message = f"❌ Sitemap из robots.txt ({declared[0]}) и /sitemap.xml не найдены"
             return (
                 CheckResult(
                     id="tech-sitemap",
                     name="Sitemap.xml",
                     status="problem",
-                    message="❌ Файл sitemap.xml не найден",
+                    message=message,
                     severity="critical",
                 ),
                 [],
             )
 
-        # Parse XML
-        root = ElementTree.fromstring(response.content)
+        children = parser.sitemaps if parser.is_index else []
+        extra = [other for other in declared[1:] if other != url]
+        if children or extra:
+            try:
+                await asyncio.wait_for(
+                    _read_index_children(children + extra, client, collector, index_concurrency),
+                    None if stop_at is None else max(stop_at - loop.time(), 0.0),
+                )
+            except asyncio.TimeoutError:
+                # Unread children are cancelled; keep what was counted
+                collector.timed_out = True
 
-        # Check for URLs or sitemap index
-        namespaces = {"ns": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-        urls = root.findall(".//ns:url/ns:loc", namespaces)
-        sitemaps = root.findall(".//ns:sitemap", namespaces)
+        count = collector.urls_total
+        source = " (указан в robots.txt)" if url in declared else ""
+        count_text = f"не менее {count}" if collector.full or collector.timed_out else str(count)
 
-        if urls:
-            sitemap_urls = [url.text for url in urls if url.text]
-            count = len(sitemap_urls)
+        if parser.is_index and collector.timed_out:
             return (
                 CheckResult(
                     id="tech-sitemap",
                     name="Sitemap.xml",
-                    status="ok",
-                    message=f"✅ Файл найден, содержит {count} URL",
+                    status="partial" if count else "error",
+                    message=(
+                        f"⚠️ Найден sitemap index{source} с {parser.sitemaps_total} картами, "
+                        + (
+                            f"содержит {count_text} URL; прочитан не полностью"
+                            if count
+                            else "но вложенные карты не успели прочитать"
+                        )
+                        + " — не хватило времени"
+                    ),
+                    severity="enhancement" if count else None,
                 ),
-                sitemap_urls,
+                collector.sample,
             )
-        elif sitemaps:
-            count = len(sitemaps)
+        elif parser.is_index and count and collector.sitemaps_failed:
             return (
                 CheckResult(
                     id="tech-sitemap",
                     name="Sitemap.xml",
                     status="partial",
-                    message=f"⚠️ Найден sitemap index с {count} картами (не проверяем вложенные)",
+                    message=(
+                        f"⚠️ Найден sitemap index{source} с {parser.sitemaps_total} картами, "
+                        f"содержит {count_text} URL, но {collector.sitemaps_failed} "
+                        f"карт не удалось прочитать"
+                    ),
                     severity="enhancement",
                 ),
+                collector.sample,
+            )
+        elif parser.is_index and count:
+            return (
+                CheckResult(
+                    id="tech-sitemap",
+                    name="Sitemap.xml",
+                    status="ok",
+                    message=(
+                        f"✅ Найден sitemap index{source} с {parser.sitemaps_total} картами, "
+                        f"содержит {count_text} URL"
+                    ),
+                ),
+                collector.sample,
+            )
+        elif count:
+            return (
+                CheckResult(
+                    id="tech-sitemap",
+                    name="Sitemap.xml",
+                    status="ok",
+                    message=f"✅ Файл найден{source}, содержит {count_text} URL",
+                ),
+                collector.sample,
+            )
+        elif parser.is_index:
+            return (
+                CheckResult(
+                    id="tech-sitemap",
+                    name="Sitemap.xml",
+                    status="problem",
+                    message=(
+                        f"❌ Найден sitemap index с {parser.sitemaps_total} картами, "
+                        f"но вложенные карты не содержат URL"
+                    ),
+                    severity="important",
+                ),
                 [],
             )
         else:
@@ -87,7 +363,7 @@ async def check_sitemap_xml(
                 [],
             )
 
-    except ElementTree.ParseError:
+    except (ElementTree.ParseError, zlib.error):
         return (
             CheckResult(
                 id="tech-sitemap",
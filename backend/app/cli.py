@@ -0,0 +1,189 @@
+"""Offline batch runner: check a list of sites without the API.
+
+Reads site URLs (one per line, ``#`` lines are comments) from a file or
+stdin, runs the same checks as the API and writes one JSON line per site. Sites
+that already have a completed line in the output file are skipped, so an
+interrupted run continues where it stopped when started again.
+
+Usage (from backend/):
+    python -m app.cli urls.txt --output reports.jsonl [--workers 10]
+    cat urls.txt | python -m app.cli --output reports.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+from app.batch import run_batch
+from app.database import settings
+from app.http_client import close_http_client, init_http_client
+from app.parse_pool import close_parse_pool, init_parse_pool
+from app.schemas import validate_site_url
+from app.utils.urls import normalize_site_url
+
+logger = logging.getLogger(__name__)
+
+
+def read_site_urls(lines: Iterable[str]) -> list[str]:
+    """Parse URL list, skipping blank lines, comments and invalid URLs.
+
+    Args:
+        lines: Lines of the URL list
+
+    Returns:
+        Site URLs in input order
+    """
+    site_urls = []
+    for number, line in enumerate(lines, 1):
+        site_url = line.strip()
+        if not site_url or site_url.startswith("#"):
+            continue
+        try:
+            validate_site_url(site_url)
+        except ValueError as e:
+            logger.warning(f"Line {number}: skipping {site_url!r}: {e}")
+            continue
+        site_urls.append(site_url)
+    return site_urls
+
+
+def completed_sites(path: Path) -> set[str]:
+    """Collect sites already checked successfully in an output file.
+
+    Lines that are not valid JSON (e.g. the last line of an interrupted run)
+    are ignored, failed sites are checked again.
+
+    Args:
+        path: JSONL output of a previous run
+
+    Returns:
+        Normalized URLs of completed sites
+    """
+    if not path.exists():
+        return set()
+
+    done = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("status") == "completed":
+                done.add(normalize_site_url(record["site_url"]))
+    return done
+
+
+def _open_output(path: Path) -> TextIO:
+    """Open output file for appending, finishing a line cut off by a crash."""
+    ends_cleanly = True
+    if path.exists() and path.stat().st_size:
+        with path.open("rb") as f:
+            f.seek(-1, 2)
+            ends_cleanly = f.read(1) == b"\n"
+    out = path.open("a", encoding="utf-8")
+    if not ends_cleanly:
+        out.write("\n")
+    return out
+
+
+async def run(
+    site_urls: list[str],
+    out: TextIO,
+    workers: int,
+    per_host_workers: int,
+) -> dict[str, Any]:
+    """Check sites and write one JSON line per site as soon as it finishes.
+
+    Args:
+        site_urls: Websites to check
+        out: Stream the JSON lines are written to
+        workers: Max sites checked at once
+        per_host_workers: Max sites of one host checked at once
+
+    Returns:
+        Batch summary (counters and throughput)
+    """
+    summary: dict[str, Any] = {}
+    await init_http_client()
+    await init_parse_pool()
+    try:
+        async for line in run_batch(
+            site_urls,
+            telegram_id=0,
+            concurrency=workers,
+            per_host_concurrency=per_host_workers,
+        ):
+            if line["type"] == "summary":
+                summary = line
+                continue
+            line.pop("type")
+            out.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            logger.info(f"{line['site_url']}: {line['status']} in {line['elapsed_ms']} ms")
+    finally:
+        await close_parse_pool()
+        await close_http_client()
+    return summary
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run checks for a URL list.
+
+    Returns:
+        Exit code: 0 if every site was checked, 1 if some checks failed
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "input", nargs="?", default="-", help="File with site URLs, one per line (default: stdin)"
+    )
+    parser.add_argument(
+        "-o", "--output", help="JSONL file to append reports to (default: stdout, no resume)"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=settings.batch_concurrency,
+        help="Sites checked at once",
+    )
+    parser.add_argument(
+        "--per-host-workers",
+        type=int,
+        default=settings.batch_per_host_concurrency,
+        help="Sites of one host checked at once",
+    )
+    args = parser.parse_args(argv)
+
+    # Progress goes to stderr, reports may go to stdout
+    logging.basicConfig(
+        level=logging.INFO, stream=sys.stderr, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    if args.input == "-":
+        site_urls = read_site_urls(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            site_urls = read_site_urls(f)
+
+    if args.output is None:
+        summary = asyncio.run(run(site_urls, sys.stdout, args.workers, args.per_host_workers))
+    else:
+        output = Path(args.output)
+        done = completed_sites(output)
+        pending = [url for url in site_urls if normalize_site_url(url) not in done]
+        logger.info(f"{len(site_urls) - len(pending)} sites already done, {len(pending)} to check")
+        with _open_output(output) as out:
+            summary = asyncio.run(run(pending, out, args.workers, args.per_host_workers))
+
+    logger.info(f"Done: {json.dumps(summary)}")
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """Database connection and session management."""
 
 from collections.abc import AsyncGenerator
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -14,6 +15,78 @@ class Settings(BaseSettings):
     environment: str = "development"
     log_level: str = "INFO"
 
+    # Accept localhost/private site URLs; only for local benchmarks (benchmarks/api_load.py)
+    allow_private_site_urls: bool = False
+
+    # Rate limits of check requests (sliding window, no database queries)
+    rate_limit_enabled: bool = True
+    rate_limit_user_checks: int = 5  # Per Telegram user per window, 0 = no limit
+    rate_limit_host_checks: int = 30  # Per checked site per window, 0 = no limit
+    rate_limit_batch_sites: int = 1000  # Batch sites per user per window, 0 = no limit
+    rate_limit_window_sec: float = 3600.0
+    rate_limit_redis_url: Optional[str] = None  # Shared counters for several instances
+
+    # Max wall time of one check run; checks not done by then count as failed
+    check_deadline_sec: float = 20.0
+    # Time budgets of checks end this long before the deadline, so their
+    # partial results are built before the scheduler cuts them off
+    check_deadline_margin_sec: float = 1.0
+
+    # Checks left out of every run, comma-separated IDs (e.g. "tech-analytics,meta-schema")
+    disabled_checks: str = ""
+
+    # Sitemap.xml reading (sitemap index children are followed)
+    sitemap_max_urls: int = 50_000  # Stop reading sitemaps after this many URLs
+    sitemap_index_concurrency: int = 4  # Child sitemaps downloaded at once
+    sitemap_budget_sec: float = 10.0  # Overall time budget for reading sitemaps
+
+    # Schema.org page sampling
+    schema_sample_concurrency: int = 5  # Max simultaneous requests per host
+    schema_sample_budget_sec: float = 20.0  # Overall time budget for sampled pages
+
+    # Background check jobs (POST /api/check/jobs)
+    job_workers: int = 4  # Checks executed concurrently per process
+    job_queue_size: int = 100  # Max jobs waiting for a worker
+    job_expire_sec: float = 600.0  # Jobs unfinished for longer are reported failed
+
+    # Batch checks (POST /api/check/batch)
+    batch_concurrency: int = 10  # Sites checked at once when the request doesn't say
+    batch_per_host_concurrency: int = 2  # Sites of one host checked at once
+
+    # Write-behind saving of /api/check results
+    persist_batch_size: int = 100  # Max rows saved in one transaction
+    persist_queue_size: int = 1000  # Max rows waiting; requests wait when full
+
+    # Report cache (same site checked again within TTL is served from memory)
+    report_cache_ttl_sec: int = 3600  # 0 disables the cache
+    report_cache_size: int = 1000  # Max cached sites per process
+
+    # Parsed robots.txt cache (shared by the checks of all runs of a site)
+    robots_cache_ttl_sec: int = 3600  # 0 disables the cache
+    robots_cache_size: int = 1000  # Max cached sites per process
+
+    # Politeness towards checked sites (limits per host across all runs of the process)
+    host_politeness_enabled: bool = True
+    host_max_concurrency: int = 4  # Requests in flight to one host
+    host_requests_per_sec: float = 10.0  # Requests started per second; 0 disables
+    host_burst: int = 5  # Requests started at once before the rate applies
+    host_max_crawl_delay_sec: float = 0.25  # Robots.txt Crawl-delay is capped to this; 0 ignores it
+    host_max_retries: int = 1  # Retries of a GET answered 429/503 with Retry-After
+    host_max_retry_after_sec: float = 10.0  # Longer Retry-After waits are not retried
+
+    # Event loop lag measurement for /metrics
+    loop_lag_interval_sec: float = 0.5
+
+    # HTML parsing in worker processes (keeps the event loop free on big pages)
+    parse_workers: int = 2  # 0 parses on the event loop
+    parse_offload_min_bytes: int = 64 * 1024  # Smaller pages are parsed in place
+
+    # Outbound HTTP connection pool (shared by all checks of all requests)
+    http2_enabled: bool = True  # Needs the h2 package (httpx[http2])
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_sec: float = 30.0
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
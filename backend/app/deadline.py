@@ -0,0 +1,40 @@
+"""Time budget shared by everything done within one check run."""
+
+import time
+
+
+class Deadline:
+    """Point in time by which a check run must finish.
+
+    Passed to the fetch layer and to checks: every request gets the smaller
+    of its own timeout and the time left, so one slow site can't make the run
+    exceed its budget.
+    """
+
+    def __init__(self, budget: float) -> None:
+        """Start counting down.
+
+        Args:
+            budget: Seconds from now until the deadline
+        """
+        self.budget = budget
+        self._expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (0 when expired)."""
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+    def timeout(self, limit: float, margin: float = 0.0) -> float:
+        """Get timeout for an operation with its own ``limit`` in seconds.
+
+        Args:
+            limit: Own time limit of the operation
+            margin: Seconds to keep before the deadline (e.g. to build a
+                partial result once the operation's budget runs out)
+        """
+        return min(limit, max(self.remaining() - margin, 0.0))
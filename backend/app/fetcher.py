@@ -0,0 +1,147 @@
+"""Shared per-run page fetch layer."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Optional, Union
+
+import httpx
+
+from app.deadline import Deadline
+from app.http_client import CLIENT_OPTIONS
+from app.metrics import record_fetch
+
+# Browser-like headers used for every request made through the fetcher, so
+# that all checks see the same page version regardless of which one asked first
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+}
+
+
+class PageFetcher:
+    """HTTP fetch layer shared by all checks of a single run.
+
+    Exposes the same ``get`` signature as ``httpx.AsyncClient`` so checks can
+    use it as a drop-in client. GET requests are coalesced by URL: the first
+    caller starts the download, concurrent and later callers await the same
+    task and receive the same response object (body and headers kept once).
+    Request options of the first caller win (headers, timeout). A download
+    whose callers were all cancelled is cancelled too.
+
+    With a run deadline, request timeouts are cut to the time left and
+    requests started after the deadline fail right away.
+
+    Time spent waiting for responses is added to the timings of the calling
+    check; downloaded bytes to the check that started the download.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, deadline: Optional[Deadline] = None) -> None:
+        """Initialize fetcher.
+
+        Args:
+            client: Async HTTP client used for the actual requests
+            deadline: Optional deadline of the run
+        """
+        self._client = client
+        self._deadline = deadline
+        self._requests: dict[str, asyncio.Task[httpx.Response]] = {}
+        self._waiters: dict[str, int] = {}
+        self.requests_made = 0
+        self.requests_coalesced = 0
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Fetch URL once per run and share the response.
+
+        Args:
+            url: URL to fetch
+            **kwargs: Options passed to ``httpx.AsyncClient.get`` on first fetch
+
+        Returns:
+            HTTP response (the same object for every caller of this URL)
+
+        Raises:
+            httpx.HTTPError: If the underlying request failed
+            httpx.TimeoutException: If the run deadline has passed
+        """
+        task = self._requests.get(url)
+        started_download = task is None
+        if task is None:
+            self._apply_deadline(kwargs)
+            headers = {**DEFAULT_HEADERS, **(kwargs.pop("headers", None) or {})}
+            task = asyncio.ensure_future(self._client.get(url, headers=headers, **kwargs))
+            self._requests[url] = task
+            self.requests_made += 1
+        else:
+            self.requests_coalesced += 1
+
+        start = time.perf_counter()
+        nbytes = 0
+        self._waiters[url] = self._waiters.get(url, 0) + 1
+        try:
+            # Shield so a cancelled caller does not cancel the fetch for the others
+            response = await asyncio.shield(task)
+            if started_download:
+                nbytes = response.num_bytes_downloaded
+        except asyncio.CancelledError:
+            if self._waiters[url] == 1 and not task.done():
+                # Nobody else needs the response: stop the download
+                task.cancel()
+                if self._requests.get(url) is task:
+                    del self._requests[url]
+            raise
+        finally:
+            self._waiters[url] -= 1
+            if not self._waiters[url]:
+                del self._waiters[url]
+            record_fetch(time.perf_counter() - start, nbytes)
+        return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Stream a response body without keeping it in memory.
+
+        Streamed requests are not shared: the body is consumed by the caller.
+
+        Args:
+            method: HTTP method
+            url: URL to fetch
+            **kwargs: Options passed to ``httpx.AsyncClient.stream``
+
+        Yields:
+            HTTP response
+
+        Raises:
+            httpx.TimeoutException: If the run deadline has passed
+        """
+        self._apply_deadline(kwargs)
+        headers = {**DEFAULT_HEADERS, **(kwargs.pop("headers", None) or {})}
+        self.requests_made += 1
+
+        start = time.perf_counter()
+        response: Optional[httpx.Response] = None
+        try:
+            async with self._client.stream(method, url, headers=headers, **kwargs) as response:
+                yield response
+        finally:
+            # Includes reading the body, which the caller does inside the block
+            nbytes = response.num_bytes_downloaded if response is not None else 0
+            record_fetch(time.perf_counter() - start, nbytes)
+
+    def _apply_deadline(self, kwargs: dict[str, Any]) -> None:
+        """Cut request timeout to the time left until the run deadline."""
+        if self._deadline is None:
+            return
+        if self._deadline.expired:
+            raise httpx.TimeoutException("Check run deadline exceeded")
+        own_timeout = kwargs.get("timeout", CLIENT_OPTIONS["timeout"])
+        kwargs["timeout"] = self._deadline.timeout(own_timeout)
+
+
+# Anything the checks can call ``get`` on
+HttpClient = Union[httpx.AsyncClient, PageFetcher]
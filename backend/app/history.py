@@ -0,0 +1,306 @@
+"""Report history of a site: past scores and run-to-run differences.
+
+Check requests are stored with the normalized site URL, so the history of a
+site is one range of the ``(site_url, created_at)`` index. Pages are read with
+keyset pagination (``created_at, id`` of the last row as the cursor) and
+history rows carry scores only; full check lists are loaded just for the two
+runs being compared. Requests served by the same run (report cache hits,
+requests joined to a run in flight) are listed once, as the first of them.
+"""
+
+import base64
+import re
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import exists, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import CheckRequest, CheckResult
+from app.utils.urls import normalize_site_url
+
+# Check statuses from worst to best; "error" means the check couldn't run
+STATUS_RANK = {"problem": 0, "partial": 1, "ok": 2}
+
+# Start time of the run a stored report came from: requests served from the
+# report cache or joined to a run in flight store a copy with the same value
+RUN_STARTED_AT = CheckResult.report_data["metadata"]["checked_at"].as_string()
+
+# Columns of a history row (no JSON)
+SUMMARY_COLUMNS = (
+    CheckRequest.id,
+    CheckRequest.created_at,
+    CheckResult.score,
+    CheckResult.problems_critical,
+    CheckResult.problems_important,
+    CheckResult.checks_ok,
+)
+
+
+def site_key(site: str) -> str:
+    """Turn ``example.ru`` or a site URL into the stored (normalized) site URL.
+
+    Args:
+        site: Host name (``https`` is assumed) or site URL
+
+    Returns:
+        Normalized site URL
+    """
+    # Proxies may merge the slashes of a URL in the path ("https:/example.ru")
+    site = re.sub(r"^(https?):/+", r"\1://", site, flags=re.IGNORECASE)
+    if "://" not in site:
+        site = f"https://{site}"
+    return normalize_site_url(site)
+
+
+def encode_cursor(created_at: datetime, check_request_id: int) -> str:
+    """Build opaque cursor pointing after a history row."""
+    raw = f"{created_at.isoformat()}|{check_request_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Parse cursor built by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, check_request_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(check_request_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _summary(row: Any) -> dict[str, Any]:
+    """Convert history row to API representation."""
+    return {
+        "check_request_id": row.id,
+        "checked_at": row.created_at.isoformat() + "Z",
+        "score": float(row.score),
+        "problems_critical": row.problems_critical,
+        "problems_important": row.problems_important,
+        "checks_ok": row.checks_ok,
+    }
+
+
+def _first_of_run() -> Any:
+    """Condition: no earlier request of the site got its report from the same run."""
+    earlier_request = aliased(CheckRequest)
+    earlier_result = aliased(CheckResult)
+    earlier_started_at = earlier_result.report_data["metadata"]["checked_at"].as_string()
+    return ~exists(
+        select(earlier_request.id)
+        .join(earlier_result, earlier_result.check_request_id == earlier_request.id)
+        .where(
+            earlier_request.site_url == CheckRequest.site_url,
+            earlier_started_at == RUN_STARTED_AT,
+            tuple_(earlier_request.created_at, earlier_request.id)
+            < tuple_(CheckRequest.created_at, CheckRequest.id),
+        )
+    )
+
+
+def _history_query(site_url: str, before: Optional[tuple[datetime, int]] = None) -> Any:
+    """Completed runs of a site, newest first, optionally after a cursor."""
+    query = (
+        select(*SUMMARY_COLUMNS)
+        .join(CheckResult, CheckResult.check_request_id == CheckRequest.id)
+        .where(CheckRequest.site_url == site_url)
+        .order_by(CheckRequest.created_at.desc(), CheckRequest.id.desc())
+    )
+    if before is not None:
+        created_at, check_request_id = before
+        query = query.where(
+            tuple_(CheckRequest.created_at, CheckRequest.id)
+            < tuple_(literal(created_at), literal(check_request_id))
+        )
+    return query
+
+
+async def get_history(
+    db: AsyncSession, site_url: str, limit: int = 20, cursor: Optional[str] = None
+) -> dict[str, Any]:
+    """Get one page of past scores of a site, newest first.
+
+    Each run is listed once: copies of its report stored for cache hits and
+    joined requests are left out.
+
+    Args:
+        db: Database session
+        site_url: Normalized site URL
+        limit: Max runs per page
+        cursor: ``next_cursor`` of the previous page
+
+    Returns:
+        Dictionary matching SiteHistorySchema
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    before = decode_cursor(cursor) if cursor else None
+    query = _history_query(site_url, before).where(_first_of_run())
+    # One extra row tells whether there is a next page
+    rows = (await db.execute(query.limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return {
+        "site_url": site_url,
+        "items": [_summary(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def diff_checks(
+    base_checks: list[dict[str, Any]], target_checks: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Compare check results of two runs check by check.
+
+    Args:
+        base_checks: Serialized checks of the earlier run
+        target_checks: Serialized checks of the later run
+
+    Returns:
+        One entry per check ID (order of the later run, then checks missing
+        from it) with ``change``: improved, worsened, unchanged, unknown
+        (an error on either side), added or removed
+    """
+    base_by_id = {check["id"]: check for check in base_checks}
+    target_ids = {check["id"] for check in target_checks}
+    diff = []
+
+    for check in target_checks:
+        before = base_by_id.get(check["id"])
+        base_status = before["status"] if before else None
+        target_status = check["status"]
+        if before is None:
+            change = "added"
+        elif base_status == target_status:
+            change = "unchanged"
+        elif base_status not in STATUS_RANK or target_status not in STATUS_RANK:
+            change = "unknown"
+        elif STATUS_RANK[target_status] > STATUS_RANK[base_status]:
+            change = "improved"
+        else:
+            change = "worsened"
+        diff.append(
+            {
+                "id": check["id"],
+                "name": check["name"],
+                "base_status": base_status,
+                "target_status": target_status,
+                "change": change,
+                "message": check["message"],
+            }
+        )
+
+    for check in base_checks:
+        if check["id"] not in target_ids:
+            diff.append(
+                {
+                    "id": check["id"],
+                    "name": check["name"],
+                    "base_status": check["status"],
+                    "target_status": None,
+                    "change": "removed",
+                    "message": check["message"],
+                }
+            )
+    return diff
+
+
+async def _pick_runs(
+    db: AsyncSession,
+    site_url: str,
+    base_id: Optional[int],
+    target_id: Optional[int],
+    since: Optional[datetime],
+) -> Optional[tuple[int, int]]:
+    """Resolve IDs of the runs to compare (see get_diff)."""
+    target_query = _history_query(site_url).add_columns(RUN_STARTED_AT.label("run_started_at"))
+    if target_id is not None:
+        target_query = target_query.where(CheckRequest.id == target_id)
+    target = (await db.execute(target_query.limit(1))).first()
+    if target is None:
+        return None
+
+    if base_id is None:
+        if since is not None:
+            # Last run at or before the given time
+            query = _history_query(site_url).where(CheckRequest.created_at <= since)
+        else:
+            query = _history_query(site_url, (target.created_at, target.id))
+        if target.run_started_at is not None:
+            # Skip copies of the target's own report (cache hits, joined requests)
+            query = query.where(
+                or_(RUN_STARTED_AT.is_(None), RUN_STARTED_AT != target.run_started_at)
+            )
+        previous = (await db.execute(query.limit(1))).first()
+        if previous is None:
+            return None
+        base_id = previous.id
+
+    return base_id, target.id
+
+
+async def get_diff(
+    db: AsyncSession,
+    site_url: str,
+    base_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+) -> Optional[dict[str, Any]]:
+    """Compare two completed runs of a site.
+
+    Without IDs the latest run is compared with the one before it (or with
+    the last run at or before ``since``). Rows holding a copy of the later
+    run's report (served from the report cache or by joining the same run)
+    are skipped when picking the earlier run.
+
+    Args:
+        db: Database session
+        site_url: Normalized site URL
+        base_id: Check request ID of the earlier run
+        target_id: Check request ID of the later run
+        since: Pick the earlier run as the last one at or before this time
+
+    Returns:
+        Dictionary matching SiteDiffSchema, or None if the runs don't exist
+    """
+    ids = await _pick_runs(db, site_url, base_id, target_id, since)
+    if ids is None:
+        return None
+
+    # Full check lists of these two runs only
+    rows = (
+        await db.execute(
+            select(*SUMMARY_COLUMNS, CheckResult.detailed_checks)
+            .join(CheckResult, CheckResult.check_request_id == CheckRequest.id)
+            .where(CheckRequest.site_url == site_url, CheckRequest.id.in_(ids))
+        )
+    ).all()
+    by_id = {row.id: row for row in rows}
+    base, target = by_id.get(ids[0]), by_id.get(ids[1])
+    if base is None or target is None:
+        return None
+
+    checks = diff_checks(base.detailed_checks, target.detailed_checks)
+    changes = {"improved": 0, "worsened": 0, "unchanged": 0}
+    for check in checks:
+        if check["change"] in changes:
+            changes[check["change"]] += 1
+
+    return {
+        "site_url": site_url,
+        "base": _summary(base),
+        "target": _summary(target),
+        "score_delta": round(float(target.score) - float(base.score), 1),
+        "summary": changes,
+        "checks": checks,
+    }
@@ -0,0 +1,137 @@
+"""Application-wide HTTP connection pool for outbound checks."""
+
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+import httpx
+
+from app.database import settings
+from app.politeness import PoliteTransport
+
+logger = logging.getLogger(__name__)
+
+# Options of every client used by checks
+CLIENT_OPTIONS: dict[str, Any] = {"timeout": 10.0, "follow_redirects": True}
+
+
+@dataclass
+class ConnectionStats:
+    """Counters showing how well pooled connections are reused."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    http2_requests: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus share of requests served over an existing connection."""
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            **asdict(self),
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+        }
+
+
+stats = ConnectionStats()
+
+# Shared transport (connection pool); None until init_http_client() is called
+_transport: Optional[httpx.AsyncBaseTransport] = None
+
+
+async def _trace(event_name: str, info: dict[str, Any]) -> None:
+    """httpcore trace callback counting new connections and TLS handshakes."""
+    if event_name == "connection.connect_tcp.complete":
+        stats.connections_opened += 1
+    elif event_name == "connection.start_tls.complete":
+        stats.tls_handshakes += 1
+    elif event_name == "http2.send_request_headers.started":
+        stats.http2_requests += 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    """Attach trace callback to every outgoing request."""
+    request.extensions["trace"] = _trace
+
+
+async def _on_response(response: httpx.Response) -> None:
+    """Count requests that got a response."""
+    stats.requests += 1
+
+
+def _polite(transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+    """Route requests through the per-host scheduler (unless disabled)."""
+    if not settings.host_politeness_enabled:
+        return transport
+    return PoliteTransport(
+        transport,
+        max_retries=settings.host_max_retries,
+        max_retry_after=settings.host_max_retry_after_sec,
+    )
+
+
+def _http2_available() -> bool:
+    """Check that the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def init_http_client() -> None:
+    """Create the shared connection pool (call on application startup)."""
+    global _transport
+
+    http2 = settings.http2_enabled and _http2_available()
+    if settings.http2_enabled and not http2:
+        logger.warning("HTTP/2 disabled: install httpx[http2] (h2 package) to enable it")
+
+    pool = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_sec,
+        ),
+    )
+    _transport = _polite(pool)
+
+
+async def close_http_client() -> None:
+    """Close the shared connection pool (call on application shutdown)."""
+    global _transport
+
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
+
+
+@asynccontextmanager
+async def http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Get HTTP client for one check run.
+
+    Within the application every run gets its own client (own cookie jar) on
+    top of the shared connection pool, so TCP connections and TLS sessions are
+    reused across checks, phases and requests. Outside of it (scripts, tests)
+    a standalone client is created and closed after the run. Either way
+    requests obey the per-host limits of ``app.politeness``.
+
+    Yields:
+        Async HTTP client
+    """
+    if _transport is None:
+        transport = _polite(httpx.AsyncHTTPTransport())
+        async with httpx.AsyncClient(transport=transport, **CLIENT_OPTIONS) as client:
+            yield client
+        return
+
+    # Not closed on exit: closing a client closes its transport, i.e. the pool
+    yield httpx.AsyncClient(
+        transport=_transport,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+        **CLIENT_OPTIONS,
+    )
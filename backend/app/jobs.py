@@ -0,0 +1,276 @@
+"""In-process background job queue for check runs."""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from app.checks.base import CheckResult
+from app.database import AsyncSessionLocal, settings
+from app.models import CheckRequest
+from app.persistence import ResultWriter, result_writer
+from app.rate_limit import RateLimitError
+from app.runner import build_result_row, get_report, serialize_check
+
+logger = logging.getLogger(__name__)
+
+# Progress event: ("check", detailed check) for each finished check, then
+# ("report", full response) or ("error", error body); None ends the stream
+JobEvent = Optional[tuple[str, dict[str, Any]]]
+
+# Statuses of jobs not done yet
+UNFINISHED = ("pending", "running")
+
+# Error of jobs dropped on shutdown
+JOB_CANCELLED = {
+    "error": {
+        "code": "job_cancelled",
+        "message": "Проверка прервана перезапуском сервиса. Запустите её снова.",
+    }
+}
+
+# Error of jobs lost without a shutdown (see JobQueue.expired)
+JOB_EXPIRED = {
+    "error": {
+        "code": "job_expired",
+        "message": "Проверка не была завершена. Запустите её снова.",
+    }
+}
+
+
+class JobQueue:
+    """Queue of check jobs executed by a pool of worker tasks.
+
+    A job is a ``CheckRequest`` row created with status ``pending``. Workers
+    move it to ``running``, execute the checks and hand the row with its
+    ``CheckResult`` and status ``completed`` (or ``failed``) to the result
+    writer, which saves it in the background like results of ``/check``;
+    subscribers get the report without waiting for the database. Results of
+    checks that already finished are kept in memory while the job runs, so
+    clients polling the job see partial results, and subscribers receive
+    them as progress events. Both are only available in the process that
+    runs the job; status and the final report always come from the database
+    (until the writer has saved a finished job, polls still see it running).
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        maxsize: int = 100,
+        session_factory: Any = AsyncSessionLocal,
+        expire_after: float = 600.0,
+        writer: ResultWriter = result_writer,
+    ) -> None:
+        """Initialize job queue.
+
+        Args:
+            workers: Number of concurrent worker tasks
+            maxsize: Max number of queued (not yet started) jobs
+            session_factory: Factory for database sessions used by workers
+            expire_after: Jobs unfinished for longer are considered lost (seconds)
+            writer: Background writer saving finished jobs
+        """
+        self.workers = workers
+        self.maxsize = maxsize
+        self.expire_after = expire_after
+        self._queue: asyncio.Queue[tuple[int, str, bool]] = asyncio.Queue(maxsize=maxsize)
+        self._session_factory = session_factory
+        self._writer = writer
+        self._tasks: list[asyncio.Task[None]] = []
+        self._partial: dict[int, list[CheckResult]] = {}
+        self._listeners: dict[int, list[asyncio.Queue[JobEvent]]] = {}
+
+    async def start(self) -> None:
+        """Start worker tasks (no-op if already running)."""
+        self._start_workers()
+
+    def _start_workers(self) -> None:
+        """Create queue and worker tasks in the running event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop worker tasks.
+
+        Jobs interrupted or still queued are marked ``failed`` in the database
+        (they would stay unfinished forever otherwise) and their subscribers
+        receive an error event.
+        """
+        unfinished = list(self._partial)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while not self._queue.empty():
+            job_id, _, _ = self._queue.get_nowait()
+            self._queue.task_done()
+            unfinished.append(job_id)
+        if unfinished:
+            await self._fail_unfinished(unfinished)
+
+    async def _fail_unfinished(self, job_ids: list[int]) -> None:
+        """Mark jobs that won't run (any more) as failed."""
+        logger.warning(f"Stopping with {len(job_ids)} unfinished jobs: {job_ids}")
+        try:
+            async with self._session_factory() as db:
+                for job_id in job_ids:
+                    check_request = await db.get(CheckRequest, job_id)
+                    if check_request is not None and check_request.status in UNFINISHED:
+                        check_request.status = "failed"
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Marking unfinished jobs failed: {e}", exc_info=True)
+
+        for job_id in job_ids:
+            self._publish(job_id, ("error", JOB_CANCELLED))
+            self._publish(job_id, None)
+            self._listeners.pop(job_id, None)
+
+    def submit(self, job_id: int, site_url: str, force_refresh: bool = False) -> None:
+        """Enqueue a check job.
+
+        Args:
+            job_id: ID of the pending CheckRequest row
+            site_url: Website URL to check
+            force_refresh: Ignore cached report and run the checks
+
+        Raises:
+            asyncio.QueueFull: If the queue is full
+        """
+        # Workers are normally started with the app; start them lazily otherwise
+        self._start_workers()
+        self._queue.put_nowait((job_id, site_url, force_refresh))
+
+    def partial_results(self, job_id: int) -> Optional[list[CheckResult]]:
+        """Get results of checks finished so far.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            List of finished check results, or None if the job is not running here
+        """
+        results = self._partial.get(job_id)
+        return list(results) if results is not None else None
+
+    def expired(self, check_request: CheckRequest) -> bool:
+        """Whether an unfinished job will never complete.
+
+        A job not running here that is still unfinished ``expire_after``
+        seconds after it was created was lost (e.g. its process crashed).
+
+        Args:
+            check_request: CheckRequest row of the job
+
+        Returns:
+            True if the job should be reported as failed
+        """
+        if check_request.status not in UNFINISHED or check_request.id in self._partial:
+            return False
+        created_at = check_request.created_at
+        if created_at is None:
+            return False
+        age: float = (datetime.utcnow() - created_at).total_seconds()
+        return age > self.expire_after
+
+    def subscribe(self, job_id: int) -> "asyncio.Queue[JobEvent]":
+        """Subscribe to progress events of a job.
+
+        Subscribe before submitting the job to receive every event.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Queue receiving JobEvent items, terminated by None
+        """
+        listener: asyncio.Queue[JobEvent] = asyncio.Queue()
+        self._listeners.setdefault(job_id, []).append(listener)
+        return listener
+
+    def unsubscribe(self, job_id: int, listener: "asyncio.Queue[JobEvent]") -> None:
+        """Stop receiving progress events of a job."""
+        listeners = self._listeners.get(job_id, [])
+        if listener in listeners:
+            listeners.remove(listener)
+        if not listeners:
+            self._listeners.pop(job_id, None)
+
+    def _publish(self, job_id: int, event: JobEvent) -> None:
+        """Send event to all subscribers of a job."""
+        for listener in self._listeners.get(job_id, []):
+            listener.put_nowait(event)
+
+    async def _worker(self) -> None:
+        """Take jobs from the queue and run them one by one."""
+        while True:
+            job_id, site_url, force_refresh = await self._queue.get()
+            try:
+                await self._process(job_id, site_url, force_refresh)
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: int, site_url: str, force_refresh: bool) -> None:
+        """Run checks for a job and save the result."""
+        results: list[CheckResult] = []
+        self._partial[job_id] = results
+
+        async def on_result(result: CheckResult) -> None:
+            results.append(result)
+            self._publish(job_id, ("check", serialize_check(result)))
+
+        try:
+            async with self._session_factory() as db:
+                check_request = await db.get(CheckRequest, job_id)
+                if check_request is None:
+                    logger.warning(f"Job {job_id} not found in database")
+                    return
+
+                check_request.status = "running"
+                await db.commit()
+
+            event: tuple[str, dict[str, Any]]
+            try:
+                response = await get_report(site_url, force_refresh, on_result=on_result)
+                check_request.result = build_result_row(job_id, response)
+                check_request.status = "completed"
+                event = ("report", response)
+            except RateLimitError as e:
+                logger.info(f"Job {job_id} rejected: {e}")
+                check_request.status = "failed"
+                event = ("error", e.error_body())
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                check_request.status = "failed"
+                event = (
+                    "error",
+                    {
+                        "error": {
+                            "code": "internal_error",
+                            "message": "Произошла внутренняя ошибка",
+                        }
+                    },
+                )
+            # Saved in the background, so the report isn't held up by the database
+            await self._writer.submit(check_request)
+            self._publish(job_id, event)
+        except asyncio.CancelledError:
+            # Shutdown (see stop): tell subscribers before the stream ends
+            self._publish(job_id, ("error", JOB_CANCELLED))
+            raise
+        finally:
+            self._partial.pop(job_id, None)
+            self._publish(job_id, None)
+            self._listeners.pop(job_id, None)
+
+
+job_queue = JobQueue(
+    workers=settings.job_workers,
+    maxsize=settings.job_queue_size,
+    expire_after=settings.job_expire_sec,
+)
@@ -1,18 +1,49 @@
 """Main FastAPI application entry point."""
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.http_client import close_http_client, init_http_client
+from app.http_client import stats as http_stats
+from app.jobs import job_queue
+from app.metrics import loop_lag_monitor, metrics
+from app.parse_pool import close_parse_pool, init_parse_pool
+from app.parse_pool import stats as parse_stats
+from app.persistence import result_writer
 from app.routes.check import router as check_router
 from app.routes.session import router as session_router
+from app.routes.sites import router as sites_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start shared resources on startup and release them on shutdown."""
+    await init_http_client()
+    await init_parse_pool()
+    await loop_lag_monitor.start()
+    await result_writer.start()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await result_writer.stop()  # Save results still queued
+    await close_parse_pool()
+    await loop_lag_monitor.stop()
+    await close_http_client()
+
 
 app = FastAPI(
-    title="SEO Checker API", description="API for checking website SEO health", version="1.0.0"
+    title="SEO Checker API",
+    description="API for checking website SEO health",
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -25,6 +56,7 @@ app.add_middleware(
 
 app.include_router(check_router)
 app.include_router(session_router)
+app.include_router(sites_router)
 
 
 @app.get("/")
@@ -47,4 +79,18 @@ async def health(db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
         "status": "ok" if db_status == "ok" else "degraded",
         "version": "1.0.0",
         "checks": {"database": db_status},
+        "http_pool": http_stats.as_dict(),
+        "parse_pool": parse_stats.as_dict(),
+        "persistence": {
+            "pending": result_writer.pending,
+            "saved": result_writer.rows_saved,
+            "failed": result_writer.rows_failed,
+        },
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Process metrics in the Prometheus text format."""
+    loop_lag_monitor.collect()
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
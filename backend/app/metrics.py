@@ -0,0 +1,332 @@
+"""Process metrics in the Prometheus text format.
+
+Counters and histograms are kept in memory and rendered at ``/metrics``.
+Per-check timings are collected while a check runs: the fetch layer and the
+page parser add to the timings of the check they run for (found through a
+context variable, so shared helpers need no extra arguments).
+"""
+
+import asyncio
+import math
+import time
+from collections.abc import Iterator, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.database import settings
+
+# Seconds; from a cached robots.txt to a check cut off by the run deadline
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Format sample value (integers without a fraction)."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format label set, e.g. ``{check="tech-robots",status="ok"}``."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        """Initialize counter.
+
+        Args:
+            name: Metric name
+            help_text: Description shown in ``# HELP``
+            labels: Label names
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increase counter of a label set."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current value of a label set."""
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        """Sample lines of the text format."""
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set value of a label set."""
+        self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize histogram.
+
+        Args:
+            name: Metric name
+            help_text: Description shown in ``# HELP``
+            labels: Label names
+            buckets: Upper bounds of the buckets (``+Inf`` is added)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: bucket counts (not cumulative), sum, count
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record a value for a label set."""
+        series = self._series.get(labels)
+        if series is None:
+            series = ([0] * len(self.buckets), [0.0, 0.0])
+            self._series[labels] = series
+        counts, totals = series
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, *labels: str) -> int:
+        """Number of observations of a label set."""
+        series = self._series.get(labels)
+        return int(series[1][1]) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        """Sample lines of the text format."""
+        names = self.label_names + ("le",)
+        for labels, (counts, totals) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(names, labels + (_format_value(bound),))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _labels(self.label_names, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(totals[0])}"
+            yield f"{self.name}_count{label_text} {_format_value(totals[1])}"
+
+
+class MetricsRegistry:
+    """All metrics of the process."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._metrics: list[Any] = []
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        metric = Gauge(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+check_duration = metrics.histogram("seo_check_duration_seconds", "Wall time of a check", ["check"])
+check_fetch = metrics.histogram(
+    "seo_check_fetch_seconds", "Time a check waited for HTTP responses", ["check"]
+)
+check_parse = metrics.histogram(
+    "seo_check_parse_seconds", "Time a check waited for parsed pages", ["check"]
+)
+check_bytes = metrics.counter(
+    "seo_check_downloaded_bytes_total", "Bytes downloaded for a check", ["check"]
+)
+check_results = metrics.counter(
+    "seo_check_results_total",
+    "Finished checks by status (timeout: cut off by the deadline, exception: crashed)",
+    ["check", "status"],
+)
+run_duration = metrics.histogram("seo_run_duration_seconds", "Wall time of a full check run")
+report_cache_requests = metrics.counter(
+    "seo_report_cache_requests_total",
+    "Report requests by source: cache hit, joined in-flight run or new run (miss)",
+    ["result"],
+)
+host_wait = metrics.histogram(
+    "seo_host_wait_seconds",
+    "Time outbound requests waited for a per-host slot",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+host_throttled = metrics.counter(
+    "seo_host_throttled_total",
+    "Answers asking to slow down (429/503 with Retry-After) by action taken",
+    ["action"],
+)
+loop_lag = metrics.histogram(
+    "seo_event_loop_lag_seconds",
+    "Delay of event loop wake-ups",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+loop_lag_max = metrics.gauge(
+    "seo_event_loop_lag_max_seconds", "Max event loop lag since the previous scrape"
+)
+
+
+@dataclass
+class CheckTimings:
+    """Where one check spent its time."""
+
+    total_sec: float = 0.0
+    fetch_sec: float = 0.0
+    parse_sec: float = 0.0
+    bytes_downloaded: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Timings in milliseconds for the response metadata."""
+        return {
+            "total_ms": round(self.total_sec * 1000, 1),
+            "fetch_ms": round(self.fetch_sec * 1000, 1),
+            "parse_ms": round(self.parse_sec * 1000, 1),
+            "bytes_downloaded": self.bytes_downloaded,
+        }
+
+
+# Timings of the check running in the current task (None outside of checks)
+current_timings: ContextVar[Optional[CheckTimings]] = ContextVar("current_timings", default=None)
+
+
+def record_fetch(elapsed: float, nbytes: int = 0) -> None:
+    """Add fetch time (and bytes of a new download) to the running check."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.fetch_sec += elapsed
+        timings.bytes_downloaded += nbytes
+
+
+def record_parse(elapsed: float) -> None:
+    """Add parse time to the running check."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.parse_sec += elapsed
+
+
+def observe_check(check_id: str, status: str, timings: CheckTimings) -> None:
+    """Record a finished check in the process metrics.
+
+    Args:
+        check_id: Check ID
+        status: Result status, ``timeout`` or ``exception``
+        timings: Timings collected while the check ran
+    """
+    check_duration.observe(timings.total_sec, check_id)
+    check_fetch.observe(timings.fetch_sec, check_id)
+    check_parse.observe(timings.parse_sec, check_id)
+    check_bytes.inc(check_id, amount=timings.bytes_downloaded)
+    check_results.inc(check_id, status)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs a task scheduled to wake up.
+
+    A blocked loop (CPU-heavy code, blocking I/O) delays every request served
+    by the process by the same amount.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        """Initialize monitor.
+
+        Args:
+            interval: Seconds between measurements
+        """
+        self.interval = interval
+        self._task: Optional[asyncio.Task[None]] = None
+        self._max = 0.0
+
+    async def start(self) -> None:
+        """Start measuring in the running event loop (no-op if running)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def collect(self) -> None:
+        """Publish max lag since the previous call (call before rendering)."""
+        loop_lag_max.set(self._max)
+        self._max = 0.0
+
+    async def _run(self) -> None:
+        """Sleep for the interval and record how late the wake-up was."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            loop_lag.observe(lag)
+            self._max = max(self._max, lag)
+
+
+loop_lag_monitor = LoopLagMonitor(settings.loop_lag_interval_sec)
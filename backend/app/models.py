@@ -8,6 +8,7 @@ from sqlalchemy import (
     BigInteger,
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -59,9 +60,15 @@ class CheckRequest(Base):  # type: ignore[misc]
     """User-initiated SEO check request."""
 
     __tablename__ = "check_requests"
+    __table_args__ = (
+        # Requests of a user / checks of a site in a time range; the first one
+        # also serves lookups by telegram_id alone
+        Index("ix_check_requests_telegram_id_created_at", "telegram_id", "created_at"),
+        Index("ix_check_requests_site_url_created_at", "site_url", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    telegram_id = Column(BigInteger, nullable=False, index=True)
+    telegram_id = Column(BigInteger, nullable=False)
     username = Column(String(255), nullable=True)
     site_url = Column(String(500), nullable=False)
     status = Column(String(50), default="pending")
@@ -88,7 +95,7 @@ class CheckResult(Base):  # type: ignore[misc]
 
     id = Column(Integer, primary_key=True, index=True)
     check_request_id = Column(
-        Integer, ForeignKey("check_requests.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("check_requests.id", ondelete="CASCADE"), nullable=False, index=True
     )
     score: Column[float] = Column(DECIMAL(3, 1), nullable=False)
     problems_critical = Column(Integer, default=0)
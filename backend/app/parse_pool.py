@@ -0,0 +1,126 @@
+"""Worker processes for CPU-heavy HTML parsing.
+
+Building a DOM of a multi-megabyte page takes long enough to stall every
+other request served by the same event loop. Big pages are therefore parsed
+in a process pool; the workers send back compact picklable summaries instead
+of the tree.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, TypeVar
+
+from app.database import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class ParseStats:
+    """Counters of where pages were parsed."""
+
+    offloaded: int = 0
+    inline: int = 0
+    restarts: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus configured worker count."""
+        return {"workers": _workers if _executor is not None else 0, **asdict(self)}
+
+
+stats = ParseStats()
+
+# Worker pool; None until init_parse_pool() is called (or when disabled)
+_executor: Optional[ProcessPoolExecutor] = None
+_workers = 0
+
+
+def _create_executor(workers: int) -> ProcessPoolExecutor:
+    """Create pool of fresh interpreter processes.
+
+    ``spawn`` rather than ``fork``: forking a process running an event loop and
+    connection pools copies their state (and locks held by other threads).
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _warm_up() -> None:
+    """Import parsing code in a worker ahead of the first page."""
+    import app.checks.document  # noqa: F401
+
+
+async def init_parse_pool(workers: Optional[int] = None) -> None:
+    """Start parsing worker processes (call on application startup).
+
+    Args:
+        workers: Number of processes; ``settings.parse_workers`` if not given,
+            0 keeps parsing on the event loop
+    """
+    global _executor, _workers
+
+    workers = settings.parse_workers if workers is None else workers
+    if workers <= 0 or _executor is not None:
+        return
+
+    _executor = _create_executor(workers)
+    _workers = workers
+    # Start the processes now instead of on the first big page
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(_executor, _warm_up) for _ in range(workers)))
+
+
+async def close_parse_pool() -> None:
+    """Stop parsing worker processes (call on application shutdown)."""
+    global _executor
+
+    if _executor is not None:
+        executor, _executor = _executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+async def run_parser(func: Callable[[bytes], T], data: bytes) -> T:
+    """Run a parsing function on a document.
+
+    Documents of ``settings.parse_offload_min_bytes`` and more are parsed in
+    a worker process; smaller ones (and all of them when the pool is not
+    started) are parsed in place, where sending them to a worker would cost
+    more than parsing.
+
+    Args:
+        func: Module-level function taking the document bytes and returning
+            a picklable result
+        data: Document bytes
+
+    Returns:
+        Result of ``func(data)``
+
+    Raises:
+        RuntimeError: If the worker process died while parsing
+    """
+    global _executor
+
+    if _executor is None or len(data) < settings.parse_offload_min_bytes:
+        stats.inline += 1
+        return func(data)
+
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(_executor, func, data)
+    except BrokenProcessPool as e:
+        # A dead worker breaks the whole pool: replace it for the next pages
+        logger.error(f"Parse worker died, restarting {_workers} workers")
+        broken, _executor = _executor, _create_executor(_workers)
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        stats.restarts += 1
+        raise RuntimeError("Parse worker died") from e
+
+    stats.offloaded += 1
+    return result
@@ -0,0 +1,142 @@
+"""Write-behind persistence of finished checks."""
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+from app.database import AsyncSessionLocal, settings
+from app.models import CheckRequest
+
+logger = logging.getLogger(__name__)
+
+
+class ResultWriter:
+    """Saves finished check requests (with results) in the background.
+
+    Request handlers hand over ready rows and return the response right away;
+    a single writer task saves whatever rows have piled up in one transaction.
+    The queue is bounded: when it is full, ``submit`` waits for the writer
+    instead of dropping rows. A batch the database keeps rejecting is saved
+    row by row, so one bad row doesn't lose the others. Rows still queued on
+    shutdown are flushed by ``stop``.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        maxsize: int = 1000,
+        retries: int = 3,
+        session_factory: Any = AsyncSessionLocal,
+    ) -> None:
+        """Initialize writer.
+
+        Args:
+            batch_size: Max rows saved in one transaction
+            maxsize: Max rows waiting to be saved
+            retries: Attempts to save a batch before giving up on it
+            session_factory: Factory for database sessions
+        """
+        self.batch_size = batch_size
+        self.maxsize = maxsize
+        self.retries = retries
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue[Optional[CheckRequest]] = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task[None]] = None
+        self.rows_saved = 0
+        self.rows_failed = 0
+
+    @property
+    def pending(self) -> int:
+        """Rows waiting to be saved."""
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """Start writer task (no-op if already running)."""
+        self._start()
+
+    def _start(self) -> None:
+        """Create queue and writer task in the running event loop."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Save all queued rows and stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, check_request: CheckRequest) -> None:
+        """Queue a finished check request for saving.
+
+        Args:
+            check_request: New CheckRequest row, with ``result`` set if the
+                check completed
+        """
+        # The writer is normally started with the app; start it lazily otherwise
+        self._start()
+        await self._queue.put(check_request)
+
+    async def _run(self) -> None:
+        """Save queued rows in batches until stopped."""
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+
+            # Rows that arrived while the previous batch was being saved
+            batch = [row]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                row = self._queue.get_nowait()
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[CheckRequest]) -> None:
+        """Save rows in one transaction, retrying on errors.
+
+        If the batch still fails, its rows are saved one by one, so only the
+        rows the database rejects are dropped.
+        """
+        for attempt in range(1, self.retries + 1):
+            try:
+                await self._save(batch)
+                self.rows_saved += len(batch)
+                return
+            except Exception as e:
+                logger.warning(
+                    f"Saving {len(batch)} check requests failed (attempt {attempt}): {e}"
+                )
+                if attempt < self.retries:
+                    await asyncio.sleep(0.5 * attempt)
+
+        if len(batch) == 1:
+            self.rows_failed += 1
+            logger.error(f"Dropped check request after {self.retries} attempts")
+            return
+
+        for row in batch:
+            try:
+                await self._save([row])
+                self.rows_saved += 1
+            except Exception as e:
+                self.rows_failed += 1
+                logger.error(f"Dropped check request of {row.site_url}: {e}")
+
+    async def _save(self, rows: list[CheckRequest]) -> None:
+        """Save rows in one transaction."""
+        async with self._session_factory() as db:
+            db.add_all(rows)
+            await db.commit()
+
+
+result_writer = ResultWriter(
+    batch_size=settings.persist_batch_size, maxsize=settings.persist_queue_size
+)
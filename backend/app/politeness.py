@@ -0,0 +1,352 @@
+"""Per-host politeness for all outbound requests of the process.
+
+Every request to a checked site goes through ``PoliteTransport``, which asks
+``host_scheduler`` for a slot first. Limits apply per host across all checks,
+runs and batches of the process:
+
+- at most ``host_max_concurrency`` requests in flight (a slot is held until
+  the response body is read or closed);
+- at most ``host_requests_per_sec`` requests started per second, with bursts
+  of ``host_burst``; a robots.txt ``Crawl-delay`` lowers the rate further
+  (one request per delay, capped at ``host_max_crawl_delay_sec``);
+- after a 429/503 answer with ``Retry-After`` the host gets no requests until
+  that time, and an idempotent request is retried once the wait is over.
+
+A request never waits for its host longer than its pool timeout (which the
+run's fetcher cuts to the time left until the run deadline): if its turn
+would come later, it fails right away with ``httpx.PoolTimeout``.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from app.database import settings
+from app.metrics import host_throttled, host_wait
+
+# Answers asking the client to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# Back-off after a 429 without Retry-After (seconds)
+DEFAULT_RETRY_AFTER = 1.0
+
+# Methods safe to send again after a throttled answer
+RETRY_METHODS = ("GET", "HEAD")
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse ``Retry-After`` header (delay in seconds or HTTP date).
+
+    Args:
+        value: Header value
+        now: Current Unix time (for dates; defaults to ``time.time()``)
+
+    Returns:
+        Seconds to wait (0 or more), or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None or when.tzinfo is None:
+        return None
+    return max(when.timestamp() - (time.time() if now is None else now), 0.0)
+
+
+@dataclass
+class _Host:
+    """Limits state of one host."""
+
+    semaphore: asyncio.Semaphore
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+    users: int = 0  # Requests holding or waiting for a slot
+
+
+class HostScheduler:
+    """Per-host concurrency and request-rate limits shared by the process.
+
+    The rate limit is a token bucket per host. Waiting requests reserve their
+    start time in arrival order, so a busy host is served first come, first
+    served. Idle hosts are swept out periodically.
+    """
+
+    # Sweep idle hosts every this many acquire() calls
+    SWEEP_EVERY = 1000
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        requests_per_sec: float = 10.0,
+        burst: int = 5,
+        max_crawl_delay: float = 0.25,
+        max_crawl_delays: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            max_concurrency: Requests in flight to one host
+            requests_per_sec: Requests started per second per host (0: no limit)
+            burst: Requests started at once before the rate applies
+            max_crawl_delay: Robots.txt Crawl-delay is capped to this (seconds)
+            max_crawl_delays: Max hosts whose Crawl-delay is remembered
+            clock: Source of current time in seconds
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_sec = requests_per_sec
+        self.burst = max(burst, 1)
+        self.max_crawl_delay = max_crawl_delay
+        self.max_crawl_delays = max_crawl_delays
+        self._clock = clock
+        self._hosts: dict[str, _Host] = {}
+        self._crawl_delays: OrderedDict[str, float] = OrderedDict()
+        self._calls = 0
+
+    def set_crawl_delay(self, host: str, delay: Optional[float]) -> None:
+        """Remember robots.txt Crawl-delay of a host (None forgets it)."""
+        if not delay or self.max_crawl_delay <= 0:
+            self._crawl_delays.pop(host, None)
+            return
+        self._crawl_delays[host] = min(delay, self.max_crawl_delay)
+        self._crawl_delays.move_to_end(host)
+        while len(self._crawl_delays) > self.max_crawl_delays:
+            self._crawl_delays.popitem(last=False)
+
+    def block(self, host: str, seconds: float) -> None:
+        """Hold new requests to a host for some time (e.g. after Retry-After)."""
+        state = self._state(host)
+        state.blocked_until = max(state.blocked_until, self._clock() + seconds)
+
+    async def acquire(self, host: str, timeout: Optional[float] = None) -> float:
+        """Wait for a slot to send one request to a host.
+
+        Every call must be paired with ``release`` once the response is done.
+
+        Args:
+            host: Host name
+            timeout: Max seconds to wait (None: as long as it takes)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            httpx.PoolTimeout: If the slot wouldn't be free within ``timeout``
+        """
+        self._calls += 1
+        if self._calls % self.SWEEP_EVERY == 0:
+            self._sweep()
+
+        state = self._state(host)
+        state.users += 1
+        start = self._clock()
+        give_up = None if timeout is None else start + timeout
+        try:
+            try:
+                await asyncio.wait_for(state.semaphore.acquire(), timeout)
+            except asyncio.TimeoutError as e:
+                raise httpx.PoolTimeout(f"No free slot for {host} within {timeout:.1f}s") from e
+            try:
+                delay = self._reserve(host, state)
+                if give_up is not None and self._clock() + delay > give_up:
+                    # Don't sleep past the caller's deadline; give the token back
+                    state.tokens = min(state.tokens + 1, self._limits(host)[1])
+                    raise httpx.PoolTimeout(f"{host} is throttled for {delay:.1f}s more")
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    # A Retry-After may have arrived while waiting
+                    delay = state.blocked_until - self._clock()
+                    if give_up is not None and self._clock() + delay > give_up:
+                        raise httpx.PoolTimeout(f"{host} is throttled for {delay:.1f}s more")
+            except BaseException:
+                state.semaphore.release()
+                raise
+        except BaseException:
+            state.users -= 1
+            raise
+        return self._clock() - start
+
+    def release(self, host: str) -> None:
+        """Free the slot taken by ``acquire``."""
+        state = self._hosts[host]
+        state.users -= 1
+        state.semaphore.release()
+
+    def in_flight(self, host: str) -> int:
+        """Requests to a host holding a slot."""
+        state = self._hosts.get(host)
+        if state is None:
+            return 0
+        return self.max_concurrency - state.semaphore._value
+
+    def reset(self) -> None:
+        """Forget all hosts (for tests)."""
+        self._hosts.clear()
+        self._crawl_delays.clear()
+
+    def _limits(self, host: str) -> tuple[float, float]:
+        """Rate (requests per second, 0: unlimited) and burst for a host."""
+        crawl_delay = self._crawl_delays.get(host)
+        if crawl_delay:
+            rate = 1 / crawl_delay
+            if self.requests_per_sec > 0:
+                rate = min(rate, self.requests_per_sec)
+            return rate, 1.0
+        return self.requests_per_sec, float(self.burst)
+
+    def _reserve(self, host: str, state: _Host) -> float:
+        """Take a token and get the delay until the request may start."""
+        now = self._clock()
+        rate, burst = self._limits(host)
+        delay = 0.0
+        if rate > 0:
+            state.tokens = min(burst, state.tokens + (now - state.updated) * rate)
+            state.updated = now
+            state.tokens -= 1
+            if state.tokens < 0:
+                delay = -state.tokens / rate
+        return max(delay, state.blocked_until - now)
+
+    def _state(self, host: str) -> _Host:
+        """Get or create state of a host."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = _Host(asyncio.Semaphore(self.max_concurrency), self.burst, self._clock())
+            self._hosts[host] = state
+        return state
+
+    def _sweep(self) -> None:
+        """Drop hosts nobody waits for whose limits have fully recovered."""
+        now = self._clock()
+        for host, state in list(self._hosts.items()):
+            rate, burst = self._limits(host)
+            refilled = rate <= 0 or state.tokens + (now - state.updated) * rate >= burst
+            if state.users == 0 and refilled and state.blocked_until <= now:
+                del self._hosts[host]
+
+
+host_scheduler = HostScheduler(
+    max_concurrency=settings.host_max_concurrency,
+    requests_per_sec=settings.host_requests_per_sec,
+    burst=settings.host_burst,
+    max_crawl_delay=settings.host_max_crawl_delay_sec,
+    max_crawl_delays=settings.robots_cache_size,
+)
+
+
+class _SlotStream(httpx.AsyncByteStream):
+    """Response body that frees the host slot when closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                release, self._release = self._release, None
+                release()
+
+
+class PoliteTransport(httpx.AsyncBaseTransport):
+    """Transport sending requests through the host scheduler.
+
+    Wraps the real transport, so redirects and every check of every run are
+    limited alike. Throttled GET/HEAD requests are retried after
+    ``Retry-After`` if the wait fits into ``max_retry_after`` and the
+    request's own read timeout.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        scheduler: Optional[HostScheduler] = None,
+        max_retries: int = 1,
+        max_retry_after: float = 10.0,
+    ) -> None:
+        """Initialize transport.
+
+        Args:
+            transport: Transport doing the actual requests
+            scheduler: Host scheduler (defaults to the process-wide one)
+            max_retries: Retries of a throttled request
+            max_retry_after: Longer Retry-After waits are not retried
+        """
+        self._transport = transport
+        self._scheduler = scheduler or host_scheduler
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request once the host has a free slot."""
+        host = request.url.host
+        attempt = 0
+        # The fetcher cuts timeouts to the run deadline, so this keeps the
+        # wait for the host within it too
+        wait_timeout = request.extensions.get("timeout", {}).get("pool")
+        while True:
+            waited = await self._scheduler.acquire(host, wait_timeout)
+            host_wait.observe(waited)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except BaseException:
+                self._scheduler.release(host)
+                raise
+
+            retry_after = self._retry_after(response)
+            if retry_after is None:
+                break
+            self._scheduler.block(host, min(retry_after, self.max_retry_after))
+            if attempt >= self.max_retries or not self._can_retry(request, retry_after):
+                host_throttled.inc("gave_up")
+                break
+            host_throttled.inc("retried")
+            await response.aclose()
+            self._scheduler.release(host)
+            attempt += 1
+
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_SlotStream(response.stream, lambda: self._scheduler.release(host)),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        """Seconds the host asked to wait, or None if the answer isn't throttled."""
+        if response.status_code not in THROTTLE_STATUSES:
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is None and response.status_code == 429:
+            return DEFAULT_RETRY_AFTER
+        return retry_after
+
+    def _can_retry(self, request: httpx.Request, retry_after: float) -> bool:
+        """Whether a throttled request is worth sending again."""
+        if request.method not in RETRY_METHODS or retry_after > self.max_retry_after:
+            return False
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        return read_timeout is None or retry_after < read_timeout
@@ -0,0 +1,338 @@
+"""Sliding-window rate limiting of check requests.
+
+Decisions are made in memory (or in Redis when several API instances must
+share counters) and never touch the database.
+"""
+
+import math
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from typing import Any, Optional, Protocol
+from urllib.parse import urlsplit
+
+from app.database import settings
+
+
+class RateLimitError(Exception):
+    """Request is over a quota."""
+
+    def __init__(self, scope: str, limit: int, retry_after: float) -> None:
+        """Initialize error.
+
+        Args:
+            scope: Quota that was hit: ``user``, ``batch`` or ``host``
+            limit: Requests allowed per window
+            retry_after: Seconds until the next request is allowed
+        """
+        super().__init__(f"Rate limit exceeded ({scope}), retry after {retry_after:.0f}s")
+        self.scope = scope
+        self.limit = limit
+        self.retry_after = retry_after
+
+    def error_body(self) -> dict[str, Any]:
+        """API error body describing the exceeded quota."""
+        if self.scope == "host":
+            message = "Этот сайт уже проверяли слишком часто. Попробуйте позже."
+        elif self.scope == "batch":
+            message = (
+                f"Вы превысили лимит сайтов в пакетных проверках ({self.limit} в час). "
+                "Попробуйте позже."
+            )
+        else:
+            message = f"Вы превысили лимит проверок ({self.limit} в час). Попробуйте позже."
+        return {
+            "error": {
+                "code": "rate_limit_exceeded",
+                "message": message,
+                "retry_after_sec": math.ceil(self.retry_after),
+            }
+        }
+
+
+class RateLimitBackend(Protocol):
+    """Storage of request timestamps per key."""
+
+    async def acquire(self, key: str, limit: int, window: float, hit: str) -> float:
+        """Record a request if the key has quota left.
+
+        Args:
+            key: Quota key
+            limit: Requests allowed per window
+            window: Window length in seconds
+            hit: Unique ID of the request, for ``release``
+
+        Returns:
+            0 if recorded, else seconds until the oldest request leaves the window
+        """
+        ...
+
+    async def release(self, key: str, hit: str) -> None:
+        """Forget a request recorded for the key."""
+        ...
+
+    async def reset(self) -> None:
+        """Forget all requests."""
+        ...
+
+
+class InMemoryBackend:
+    """Sliding-window log kept in process memory.
+
+    Stores at most ``limit`` timestamps per key. Keys whose requests all left
+    the window are swept out periodically. Also serves as the fake backend in
+    tests (the clock can be replaced).
+    """
+
+    # Sweep idle keys every this many acquire() calls
+    SWEEP_EVERY = 1000
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize backend.
+
+        Args:
+            clock: Source of current time in seconds
+        """
+        self._clock = clock
+        self._hits: dict[str, deque[tuple[float, str]]] = {}
+        self._windows: dict[str, float] = {}
+        self._calls = 0
+
+    async def acquire(self, key: str, limit: int, window: float, hit: str) -> float:
+        """Record a request if the key has quota left."""
+        now = self._clock()
+        self._calls += 1
+        if self._calls % self.SWEEP_EVERY == 0:
+            self._sweep(now)
+
+        hits = self._hits.setdefault(key, deque())
+        self._windows[key] = window
+        while hits and hits[0][0] <= now - window:
+            hits.popleft()
+
+        if len(hits) >= limit:
+            return hits[0][0] + window - now if hits else window
+        hits.append((now, hit))
+        return 0.0
+
+    async def release(self, key: str, hit: str) -> None:
+        """Forget a request recorded for the key."""
+        hits = self._hits.get(key, deque())
+        for entry in hits:
+            if entry[1] == hit:
+                hits.remove(entry)
+                break
+
+    async def reset(self) -> None:
+        """Forget all requests."""
+        self._hits.clear()
+        self._windows.clear()
+
+    def _sweep(self, now: float) -> None:
+        """Drop keys without requests in their window."""
+        for key in list(self._hits):
+            hits = self._hits[key]
+            if not hits or hits[-1][0] <= now - self._windows.get(key, 0.0):
+                del self._hits[key]
+                self._windows.pop(key, None)
+
+
+class RedisBackend:
+    """Sliding-window log in Redis sorted sets, shared by all API instances.
+
+    Every request is a sorted set member named after its hit ID, so any
+    instance can release it. Needs the optional ``redis`` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "seo-checker:rate:") -> None:
+        """Connect to Redis.
+
+        Args:
+            url: Redis URL, e.g. ``redis://localhost:6379/0``
+            prefix: Prefix of keys used by the limiter
+
+        Raises:
+            RuntimeError: If the redis package is not installed
+        """
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but redis is not installed") from e
+
+        self._redis: Any = redis.from_url(url)
+        self._prefix = prefix
+
+    async def acquire(self, key: str, limit: int, window: float, hit: str) -> float:
+        """Record a request if the key has quota left."""
+        redis_key = self._prefix + key
+        now = time.time()
+
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.zremrangebyscore(redis_key, 0, now - window)
+        pipe.zadd(redis_key, {hit: now})
+        pipe.zcard(redis_key)
+        pipe.zrange(redis_key, 0, 0, withscores=True)
+        pipe.expire(redis_key, int(window) + 1)
+        _, _, count, oldest, _ = await pipe.execute()
+
+        if count > limit:
+            await self._redis.zrem(redis_key, hit)
+            return max(float(oldest[0][1]) + window - now, 0.001) if oldest else window
+        return 0.0
+
+    async def release(self, key: str, hit: str) -> None:
+        """Forget a request recorded for the key."""
+        await self._redis.zrem(self._prefix + key, hit)
+
+    async def reset(self) -> None:
+        """Forget all requests."""
+        async for redis_key in self._redis.scan_iter(match=self._prefix + "*"):
+            await self._redis.delete(redis_key)
+
+
+class RateLimiter:
+    """Per-user and per-target-host quotas of check requests.
+
+    The user quota is charged for every check request, a batch counting as
+    one; sites of batches have their own per-user quota. The host quota is
+    charged by the runner only when checks of a site actually run, so cached
+    reports and requests joining a run in progress don't use it up.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        user_limit: int = 5,
+        host_limit: int = 30,
+        window: float = 3600.0,
+        batch_limit: int = 1000,
+    ) -> None:
+        """Initialize limiter.
+
+        Args:
+            backend: Storage of request timestamps
+            user_limit: Checks one Telegram user may run per window (0 = no limit)
+            host_limit: Checks of one site allowed per window (0 = no limit)
+            window: Window length in seconds
+            batch_limit: Sites one user may check in batches per window (0 = no limit)
+        """
+        self.backend = backend
+        self.user_limit = user_limit
+        self.host_limit = host_limit
+        self.batch_limit = batch_limit
+        self.window = window
+
+    async def check_user(self, telegram_id: int) -> list[str]:
+        """Count a check request against the user's quota.
+
+        Nothing is counted if the request is rejected.
+
+        Args:
+            telegram_id: Telegram user ID
+
+        Returns:
+            Hit IDs to pass to ``refund_user`` (empty if users are not limited)
+
+        Raises:
+            RateLimitError: If the quota is used up
+        """
+        return await self._acquire_all("user", f"user:{telegram_id}", self.user_limit, 1)
+
+    async def check_batch(self, telegram_id: int, sites: int) -> list[str]:
+        """Count a batch: one request of the user, ``sites`` sites of the batch quota.
+
+        Either both are counted or, if one of them is used up, neither.
+
+        Args:
+            telegram_id: Telegram user ID
+            sites: Sites in the batch
+
+        Returns:
+            Hit IDs of the user's request (for ``refund_user``)
+
+        Raises:
+            RateLimitError: If the user or batch quota is used up
+        """
+        hits = await self.check_user(telegram_id)
+        try:
+            await self._acquire_all("batch", f"batch:{telegram_id}", self.batch_limit, sites)
+        except RateLimitError:
+            await self.refund_user(telegram_id, hits)
+            raise
+        return hits
+
+    async def refund_user(self, telegram_id: int, hits: list[str]) -> None:
+        """Give back requests counted by ``check_user`` (e.g. the site was over quota).
+
+        Args:
+            telegram_id: Telegram user ID
+            hits: Hit IDs returned by ``check_user``
+        """
+        for hit in hits:
+            await self.backend.release(f"user:{telegram_id}", hit)
+
+    async def check_host(self, site_url: str) -> None:
+        """Count a run of checks against the site's quota.
+
+        Args:
+            site_url: Website URL to check
+
+        Raises:
+            RateLimitError: If the quota is used up
+        """
+        if self.host_limit <= 0:
+            return
+        host = (urlsplit(site_url).hostname or site_url).lower()
+        retry_after = await self.backend.acquire(
+            f"host:{host}", self.host_limit, self.window, uuid.uuid4().hex
+        )
+        if retry_after:
+            raise RateLimitError("host", self.host_limit, retry_after)
+
+    async def reset(self) -> None:
+        """Forget all counted requests."""
+        await self.backend.reset()
+
+    async def _acquire_all(self, scope: str, key: str, limit: int, count: int) -> list[str]:
+        """Record ``count`` requests of a key, or none if fewer are left."""
+        if limit <= 0:
+            return []
+        if count > limit:
+            raise RateLimitError(scope, limit, self.window)
+        hits: list[str] = []
+        for _ in range(count):
+            hit = uuid.uuid4().hex
+            retry_after = await self.backend.acquire(key, limit, self.window, hit)
+            if retry_after:
+                for taken in hits:
+                    await self.backend.release(key, taken)
+                raise RateLimitError(scope, limit, retry_after)
+            hits.append(hit)
+        return hits
+
+
+def create_rate_limiter(redis_url: Optional[str] = None) -> RateLimiter:
+    """Create limiter from settings.
+
+    Args:
+        redis_url: Redis URL for a shared backend; in-memory if not set
+
+    Returns:
+        Rate limiter
+    """
+    backend: RateLimitBackend
+    if redis_url:
+        backend = RedisBackend(redis_url)
+    else:
+        backend = InMemoryBackend()
+    return RateLimiter(
+        backend,
+        user_limit=settings.rate_limit_user_checks,
+        host_limit=settings.rate_limit_host_checks,
+        window=settings.rate_limit_window_sec,
+        batch_limit=settings.rate_limit_batch_sites,
+    )
+
+
+rate_limiter = create_rate_limiter(settings.rate_limit_redis_url)
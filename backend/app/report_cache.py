@@ -0,0 +1,71 @@
+"""In-process cache of recent SEO reports."""
+
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.database import settings
+
+
+class ReportCache:
+    """LRU cache of report responses with a time-to-live.
+
+    Keys are normalized site URLs. Entries older than ``ttl`` seconds are
+    treated as missing; the least recently used entry is evicted when the
+    cache is full. A ``ttl`` of 0 disables caching.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_size: int = 1000) -> None:
+        """Initialize cache.
+
+        Args:
+            ttl: Time-to-live of an entry in seconds
+            max_size: Max number of cached reports
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Get a fresh cached report.
+
+        Args:
+            key: Normalized site URL
+
+        Returns:
+            Copy of the cached report, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, report = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return copy.deepcopy(report)
+
+    def set(self, key: str, report: dict[str, Any]) -> None:
+        """Store a report.
+
+        Args:
+            key: Normalized site URL
+            report: Report response to cache
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(report))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+
+report_cache = ReportCache(ttl=settings.report_cache_ttl_sec, max_size=settings.report_cache_size)
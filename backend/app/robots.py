@@ -0,0 +1,329 @@
+"""Robots.txt parsing, rule matching and a per-site cache of parsed files.
+
+Rules follow RFC 9309 (the Google/Yandex dialect): a group of
+``User-agent`` lines is followed by ``Allow``/``Disallow`` rules, ``*``
+matches any characters and a trailing ``$`` anchors the end of the path.
+The most specific (longest) matching rule wins, ``Allow`` wins a tie.
+``Sitemap`` lines are global, ``Crawl-delay`` belongs to its group.
+
+Rules are compiled once per file: patterns without wildcards are plain
+prefix checks, the rest become regular expressions. Parsed files are kept in
+``robots_cache`` with a time-to-live, so all stages of a run (and other runs
+for the same site) share one download and one parse.
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.database import settings
+from app.fetcher import HttpClient
+from app.politeness import host_scheduler
+
+# Product token of our crawler (see SITEMAP_HEADERS User-Agent)
+ROBOTS_AGENT = "SEOChecker"
+
+# Bytes of robots.txt that are parsed (Google ignores the rest too)
+MAX_ROBOTS_BYTES = 500 * 1024
+
+# Request timeout of a robots.txt download (seconds)
+ROBOTS_TIMEOUT = 5.0
+
+
+@dataclass(frozen=True)
+class RobotsRule:
+    """One ``Allow``/``Disallow`` line of a group."""
+
+    allow: bool
+    pattern: str
+    regex: Optional["re.Pattern[str]"] = None  # None: plain prefix match
+
+    def matches(self, path: str) -> bool:
+        """Whether the rule applies to a path (with query)."""
+        if self.regex is None:
+            return path.startswith(self.pattern)
+        return self.regex.match(path) is not None
+
+
+def _compile_rule(allow: bool, pattern: str) -> RobotsRule:
+    """Compile a path pattern."""
+    if "*" not in pattern and not pattern.endswith("$"):
+        return RobotsRule(allow, pattern)
+    anchored = pattern.endswith("$")
+    body = pattern[:-1] if anchored else pattern
+    regex = ".*".join(re.escape(part) for part in body.split("*"))
+    return RobotsRule(allow, pattern, re.compile(regex + ("$" if anchored else "")))
+
+
+@dataclass(frozen=True)
+class AgentRules:
+    """Rules of the group that applies to one user agent."""
+
+    # Most specific first, Allow before Disallow of the same length
+    rules: tuple[RobotsRule, ...] = ()
+    crawl_delay: Optional[float] = None
+
+    def allowed(self, path: str) -> bool:
+        """Whether a path (with query) may be fetched."""
+        if path == "/robots.txt":
+            return True
+        for rule in self.rules:
+            if rule.matches(path):
+                return rule.allow
+        return True
+
+
+@dataclass
+class _Group:
+    """Group being parsed."""
+
+    agents: list[str] = field(default_factory=list)
+    rules: list[RobotsRule] = field(default_factory=list)
+    crawl_delay: Optional[float] = None
+
+
+class RobotsRules:
+    """Parsed robots.txt."""
+
+    def __init__(
+        self, groups: Optional[dict[str, AgentRules]] = None, sitemaps: tuple[str, ...] = ()
+    ) -> None:
+        """Initialize rules.
+
+        Args:
+            groups: Rules by lowercased user agent token (``*`` for the rest)
+            sitemaps: ``Sitemap`` URLs in file order
+        """
+        self.groups = groups or {}
+        self.sitemaps = sitemaps
+
+    @property
+    def user_agents(self) -> list[str]:
+        """User agents with a group, lowercased."""
+        return list(self.groups)
+
+    def agent(self, user_agent: str = ROBOTS_AGENT) -> AgentRules:
+        """Get rules for a user agent (its own group, else ``*``, else none)."""
+        token = user_agent.lower()
+        return self.groups.get(token) or self.groups.get("*") or AgentRules()
+
+    def can_fetch(self, url: str, user_agent: str = ROBOTS_AGENT) -> bool:
+        """Whether a URL may be fetched by a user agent.
+
+        Args:
+            url: Absolute URL or path
+            user_agent: Product token, e.g. ``Yandex`` or ``Googlebot``
+
+        Returns:
+            False if the most specific matching rule disallows the path
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        return self.agent(user_agent).allowed(path)
+
+
+def parse_robots_txt(text: str) -> RobotsRules:
+    """Parse robots.txt content.
+
+    Unknown directives and malformed lines are skipped.
+
+    Args:
+        text: File content
+
+    Returns:
+        Compiled rules
+    """
+    groups: list[_Group] = []
+    sitemaps: list[str] = []
+    current: Optional[_Group] = None
+
+    for raw_line in text[:MAX_ROBOTS_BYTES].lstrip("﻿").splitlines():
+        line = raw_line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+
+        if key == "user-agent":
+            # Consecutive User-agent lines share a group
+            if current is None or current.rules or current.crawl_delay is not None:
+                current = _Group()
+                groups.append(current)
+            if value:
+                current.agents.append(value.lower())
+        elif key == "sitemap":
+            if value:
+                sitemaps.append(value)
+        elif current is None:
+            continue  # Rules before the first User-agent belong to no group
+        elif key in ("allow", "disallow"):
+            if value:  # Empty Disallow allows everything
+                current.rules.append(_compile_rule(key == "allow", value))
+        elif key == "crawl-delay":
+            try:
+                current.crawl_delay = max(float(value), 0.0)
+            except ValueError:
+                pass
+
+    # Groups naming the same agent are merged
+    merged: dict[str, _Group] = {}
+    for group in groups:
+        for agent in group.agents:
+            target = merged.setdefault(agent, _Group())
+            target.rules.extend(group.rules)
+            if group.crawl_delay is not None:
+                target.crawl_delay = group.crawl_delay
+
+    compiled = {
+        agent: AgentRules(
+            rules=tuple(sorted(group.rules, key=lambda r: (-len(r.pattern), not r.allow))),
+            crawl_delay=group.crawl_delay,
+        )
+        for agent, group in merged.items()
+    }
+    return RobotsRules(compiled, tuple(dict.fromkeys(sitemaps)))
+
+
+@dataclass(frozen=True)
+class RobotsFile:
+    """Result of downloading robots.txt."""
+
+    url: str
+    status_code: int
+    rules: RobotsRules = field(default_factory=RobotsRules)  # Empty unless found
+
+    @property
+    def found(self) -> bool:
+        """Whether the file exists."""
+        return self.status_code == 200
+
+
+async def fetch_robots(
+    url: str, client: HttpClient, timeout: float = ROBOTS_TIMEOUT
+) -> RobotsFile:
+    """Download and parse robots.txt.
+
+    Args:
+        url: Robots.txt URL
+        client: HTTP client
+        timeout: Request timeout in seconds
+
+    Returns:
+        Parsed file (allow-all rules if it is missing)
+
+    Raises:
+        httpx.HTTPError: If the download fails
+    """
+    response = await client.get(url, timeout=timeout)
+    if response.status_code != 200:
+        return RobotsFile(url, response.status_code)
+    return RobotsFile(url, 200, parse_robots_txt(response.text))
+
+
+class RobotsCache:
+    """LRU cache of parsed robots.txt files with a time-to-live.
+
+    Concurrent requests for the same file share one download, made with the
+    client of the caller that started it. Every caller waits for it only as
+    long as its own timeout allows, and downloads the file with its own
+    client if the shared download fails (e.g. the first caller's run hit its
+    deadline). Server errors and failed downloads are not cached. The
+    Crawl-delay of every downloaded file is passed to the host scheduler.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_size: int = 1000) -> None:
+        """Initialize cache.
+
+        Args:
+            ttl: Time-to-live of an entry in seconds (0 disables caching)
+            max_size: Max number of cached files
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, RobotsFile]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[RobotsFile]] = {}
+
+    async def get(
+        self,
+        url: str,
+        client: HttpClient,
+        refresh: bool = False,
+        timeout: Optional[float] = None,
+    ) -> RobotsFile:
+        """Get parsed robots.txt, downloading it if not cached.
+
+        Args:
+            url: Robots.txt URL
+            client: HTTP client used on a cache miss
+            refresh: Download the file again even if it is cached
+            timeout: Max seconds to wait for the file (None: request timeout)
+
+        Returns:
+            Parsed file
+
+        Raises:
+            httpx.HTTPError: If the download fails or takes longer than ``timeout``
+        """
+        if refresh:
+            self._entries.pop(url, None)
+        entry = self._entries.get(url)
+        if entry is not None:
+            if time.monotonic() < entry[0]:
+                self._entries.move_to_end(url)
+                return entry[1]
+            del self._entries[url]
+
+        request_timeout = ROBOTS_TIMEOUT if timeout is None else min(timeout, ROBOTS_TIMEOUT)
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url, client, request_timeout))
+            self._inflight[url] = task
+            return await asyncio.shield(task)
+
+        try:
+            # Shield so one cancelled caller doesn't cancel the download for the others
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError as e:
+            raise httpx.TimeoutException(f"Timed out waiting for {url}") from e
+        except httpx.HTTPError:
+            # The download belonged to another run (its client, its deadline)
+            return await self._fetch(url, client, request_timeout)
+
+    async def _fetch(self, url: str, client: HttpClient, timeout: float) -> RobotsFile:
+        """Download file and cache it."""
+        try:
+            robots = await fetch_robots(url, client, timeout)
+        finally:
+            if self._inflight.get(url) is asyncio.current_task():
+                del self._inflight[url]
+        if robots.status_code < 500:
+            self._set(url, robots)
+            host = urlsplit(url).hostname
+            if host:
+                host_scheduler.set_crawl_delay(host, robots.rules.agent().crawl_delay)
+        return robots
+
+    def _set(self, url: str, robots: RobotsFile) -> None:
+        """Store a file."""
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        self._entries[url] = (time.monotonic() + self.ttl, robots)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+
+robots_cache = RobotsCache(ttl=settings.robots_cache_ttl_sec, max_size=settings.robots_cache_size)
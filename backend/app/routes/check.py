@@ -1,230 +1,399 @@
 """API routes for SEO checks."""
 
 import asyncio
-from datetime import datetime, timedelta
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Any
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.checks.analytics import check_analytics
-from app.checks.check_canonical import check_canonical
-from app.checks.check_html_sitemap import check_html_sitemap
-from app.checks.check_opengraph import check_opengraph
-# from app.checks.check_page_speed import check_page_speed  # TODO: Add back with Docker or PageSpeed API
-from app.checks.check_schema import check_schema_microdata
-from app.checks.headings import check_headings
-from app.checks.meta_tags import check_meta_tags
-from app.checks.noindex import check_noindex
-from app.checks.robots_txt import check_robots_txt
-from app.checks.sitemap_xml import check_sitemap_xml
-from app.database import get_db
+from app.batch import run_batch, unique_sites
+from app.checks.registry import enabled_checks
+from app.database import get_db, settings
+from app.jobs import JOB_EXPIRED, JobEvent, job_queue
 from app.models import CheckRequest, CheckResult
-from app.report_builder import build_report
-from app.schemas import CheckRequestSchema, CheckResponseSchema
+from app.persistence import result_writer
+from app.rate_limit import RateLimitError, rate_limiter
+from app.runner import (
+    build_request_row,
+    get_report,
+    response_from_row,
+    serialize_check,
+)
+from app.schemas import (
+    BatchCheckRequestSchema,
+    CheckRequestSchema,
+    CheckResponseSchema,
+    JobCreatedSchema,
+    JobStatusSchema,
+)
+from app.utils.urls import normalize_site_url
 
 router = APIRouter(prefix="/api", tags=["checks"])
 
 
-async def check_rate_limit(telegram_id: int, session: AsyncSession) -> None:
-    """Check if user exceeded rate limit (5 checks per hour).
+def rate_limit_exceeded(e: RateLimitError) -> HTTPException:
+    """Build 429 error for an exceeded quota.
+
+    Args:
+        e: Rate limit error
+
+    Returns:
+        HTTPException to raise
+    """
+    return HTTPException(status_code=429, detail=e.error_body())
+
+
+async def check_rate_limit(telegram_id: int, batch_sites: int = 0) -> list[str]:
+    """Check if user exceeded rate limit.
+
+    The checked site's quota is charged later, by the runner, and only if
+    the checks actually run (not for cached reports or joined runs).
 
     Args:
         telegram_id: Telegram user ID
-        session: Database session
+        batch_sites: Sites of a batch request (counted against the batch quota)
+
+    Returns:
+        Hit IDs for ``rate_limiter.refund_user`` (empty if not counted)
 
     Raises:
         HTTPException: If rate limit exceeded
     """
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
+    if not settings.rate_limit_enabled:
+        return []
 
-    count = await session.scalar(
-        select(func.count())
-        .select_from(CheckRequest)
-        .where(CheckRequest.telegram_id == telegram_id)
-        .where(CheckRequest.created_at > one_hour_ago)
-    )
+    try:
+        if batch_sites:
+            return await rate_limiter.check_batch(telegram_id, batch_sites)
+        return await rate_limiter.check_user(telegram_id)
+    except RateLimitError as e:
+        raise rate_limit_exceeded(e) from e
+
+
+@router.post("/check", response_model=CheckResponseSchema)
+async def check_site(request: CheckRequestSchema) -> dict[str, Any]:
+    """Run SEO checks for a website.
+
+    The request and its result are saved in the background after the
+    response is built (see ResultWriter), not on the request path.
+
+    Args:
+        request: Check request with site_url and telegram_id
+
+    Returns:
+        Complete SEO report with score, categories, priorities, and detailed checks
+
+    Raises:
+        HTTPException: If validation fails or rate limit exceeded
+    """
+    # Check rate limit
+    hits = await check_rate_limit(request.telegram_id)
 
-    if count and count >= 5:
+    created_at = datetime.utcnow()
+    try:
+        response_data = await get_report(request.site_url, request.force_refresh)
+    except RateLimitError as e:
+        # The site is over its quota: this request doesn't count for the user
+        await rate_limiter.refund_user(request.telegram_id, hits)
+        raise rate_limit_exceeded(e) from e
+    except Exception as e:
+        # Save CheckRequest as failed
+        await result_writer.submit(
+            build_request_row(
+                request.telegram_id, request.site_url, created_at, None, request.session_id
+            )
+        )
         raise HTTPException(
-            status_code=429,
+            status_code=500,
             detail={
                 "error": {
-                    "code": "rate_limit_exceeded",
-                    "message": "Вы превысили лимит проверок (5 в час). Попробуйте позже.",
-                    "retry_after_sec": 3600,
+                    "code": "internal_error",
+                    "message": "Произошла внутренняя ошибка",
                 }
             },
+        ) from e
+
+    # Save CheckRequest with its CheckResult
+    await result_writer.submit(
+        build_request_row(
+            request.telegram_id, request.site_url, created_at, response_data, request.session_id
         )
+    )
 
+    return response_data
 
-@router.post("/check", response_model=CheckResponseSchema)
-async def check_site(
-    request: CheckRequestSchema, db: AsyncSession = Depends(get_db)
-) -> dict[str, Any]:
-    """Run SEO checks for a website.
+
+@router.post("/check/batch")
+async def check_batch(request: BatchCheckRequestSchema) -> StreamingResponse:
+    """Check many sites and stream results as NDJSON, one line per site.
+
+    Sites are checked concurrently (``concurrency``, up to
+    ``BATCH_CONCURRENCY`` by default) with at most
+    ``BATCH_PER_HOST_CONCURRENCY`` sites of one host at a time. Lines come in
+    completion order: ``{"type": "result", "site_url", "status", "elapsed_ms",
+    "report" | "error"}``, then a final ``{"type": "summary", ...}`` with
+    counters and ``sites_per_minute``. Every site is saved like /api/check.
+
+    The batch counts as one check against the user's rate limit, and its
+    sites against the user's ``RATE_LIMIT_BATCH_SITES`` quota; the whole
+    batch is rejected if fewer sites are left. Each site's own quota applies
+    when its checks run; a site over it gets a ``rate_limit_exceeded`` line.
 
     Args:
-        request: Check request with site_url and telegram_id
-        db: Database session
+        request: Batch request with site_urls and telegram_id
 
     Returns:
-        Complete SEO report with score, categories, priorities, and detailed checks
+        ``application/x-ndjson`` response
 
     Raises:
-        HTTPException: If validation fails or rate limit exceeded
+        HTTPException: If rate limit exceeded
     """
-    start_time = datetime.utcnow()
+    site_urls = unique_sites(request.site_urls)
+    await check_rate_limit(request.telegram_id, batch_sites=len(site_urls))
 
-    # Check rate limit
-    # TODO: Включить перед production релизом! (временно отключено для отладки)
-    # await check_rate_limit(request.telegram_id, db)
+    lines = run_batch(
+        site_urls,
+        request.telegram_id,
+        force_refresh=request.force_refresh,
+        concurrency=request.concurrency or settings.batch_concurrency,
+        per_host_concurrency=settings.batch_per_host_concurrency,
+        on_row=result_writer.submit,
+    )
 
-    # Save CheckRequest to database
+    async def ndjson() -> AsyncIterator[str]:
+        async for line in lines:
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _create_job(request: CheckRequestSchema, db: AsyncSession) -> CheckRequest:
+    """Save a pending CheckRequest row for a new job.
+
+    Args:
+        request: Check request with site_url and telegram_id
+        db: Database session
+
+    Returns:
+        Saved CheckRequest (its id is the job ID)
+    """
     check_request = CheckRequest(
         telegram_id=request.telegram_id,
-        site_url=request.site_url,
-        status="running",
+        site_url=normalize_site_url(request.site_url),
+        status="pending",
         session_id=request.session_id,
     )
     db.add(check_request)
     await db.commit()
     await db.refresh(check_request)
+    return check_request
 
+
+async def _submit_job(
+    check_request: CheckRequest, db: AsyncSession, force_refresh: bool = False
+) -> None:
+    """Put job into the queue.
+
+    Args:
+        check_request: Pending CheckRequest row
+        db: Database session
+        force_refresh: Ignore cached report and run the checks
+
+    Raises:
+        HTTPException: If the job queue is full
+    """
     try:
-        # Phase 1: Run basic checks in parallel
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            basic_checks = await asyncio.gather(
-                check_robots_txt(request.site_url, client),
-                check_sitemap_xml(request.site_url, client),  # Returns (CheckResult, urls)
-                check_analytics(request.site_url, client),
-                check_noindex(request.site_url, client),
-                check_meta_tags(request.site_url, client),
-                check_headings(request.site_url, client),
-                check_canonical(request.site_url, client),
-                check_opengraph(request.site_url, client),
-                check_html_sitemap(request.site_url, client),
-                return_exceptions=True,
-            )
-        
-        # Extract sitemap result and URLs
-        sitemap_result = None
-        sitemap_urls = []
-        other_results = []
-        
-        for result in basic_checks:
-            if isinstance(result, tuple):  # check_sitemap_xml returns (CheckResult, urls)
-                sitemap_result, sitemap_urls = result
-                other_results.append(sitemap_result)
-            elif not isinstance(result, Exception):
-                other_results.append(result)
-        
-        # Phase 2: Run advanced checks (Schema.org microdata)
-        # NOTE: check_page_speed (Playwright) temporarily disabled - requires Docker setup
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as schema_client:
-            advanced_checks = await asyncio.gather(
-                # check_page_speed(request.site_url),  # TODO: Re-enable with Docker or PageSpeed API
-                check_schema_microdata(
-                    request.site_url,
-                    sitemap_urls,
-                    schema_client
-                ),  # Schema check on 15 pages
-                return_exceptions=True,
-            )
-        
-        # Debug: log advanced checks
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Advanced checks results: {advanced_checks}")
-        for i, check in enumerate(advanced_checks):
-            if isinstance(check, Exception):
-                logger.error(f"Advanced check {i} failed with exception: {check}")
-        
-        # Combine all results
-        all_results = other_results + [
-            r for r in advanced_checks if not isinstance(r, Exception)
-        ]
-
-        # Filter out exceptions and convert to CheckResult
-        from app.checks.base import CheckResult as CheckResultData
-
-        valid_results: list[CheckResultData] = []
-        failed_count = 0
-
-        for result in all_results:
-            if isinstance(result, Exception):
-                failed_count += 1
-            elif isinstance(result, CheckResultData):
-                valid_results.append(result)
-
-        # Build report
-        report = build_report(valid_results)
-
-        # Calculate processing time
-        processing_time = int((datetime.utcnow() - start_time).total_seconds())
-
-        # Prepare detailed checks for response
-        detailed_checks = [
+        job_queue.submit(
+            check_request.id,  # type: ignore[arg-type]
+            check_request.site_url,  # type: ignore[arg-type]
+            force_refresh,
+        )
+    except asyncio.QueueFull as e:
+        check_request.status = "failed"  # type: ignore[assignment]
+        await db.commit()
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": {
+                    "code": "queue_full",
+                    "message": "Сервис перегружен. Попробуйте через минуту.",
+                    "retry_after_sec": 60,
+                }
+            },
+        ) from e
+
+
+@router.post("/check/jobs", response_model=JobCreatedSchema, status_code=202)
+async def create_check_job(
+    request: CheckRequestSchema, db: AsyncSession = Depends(get_db)
+) -> dict[str, Any]:
+    """Enqueue SEO checks for a website and return immediately.
+
+    Poll GET /api/check/{job_id} for status and results.
+
+    Args:
+        request: Check request with site_url and telegram_id
+        db: Database session
+
+    Returns:
+        Job ID and initial status
+
+    Raises:
+        HTTPException: If rate limit exceeded or the job queue is full
+    """
+    await check_rate_limit(request.telegram_id)
+    check_request = await _create_job(request, db)
+    await _submit_job(check_request, db, request.force_refresh)
+    return {"job_id": check_request.id, "status": "pending"}
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/check/stream")
+async def stream_check(
+    request: CheckRequestSchema, db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """Run SEO checks and stream progress as server-sent events.
+
+    Events:
+        job: ``{"job_id": ..., "status": "pending", "checks_total": ...,
+            "categories": {category: number of checks}}`` once the job is
+            queued, so clients can show progress per category
+        check: one DetailedCheckSchema per check, as soon as it finishes
+        report: full CheckResponseSchema when all checks are done
+        error: error body if the run failed
+
+    The run is a regular job, so it completes and is saved even if the client
+    disconnects; the result is then available via GET /api/check/{job_id}.
+
+    Args:
+        request: Check request with site_url and telegram_id
+        db: Database session
+
+    Returns:
+        ``text/event-stream`` response
+
+    Raises:
+        HTTPException: If rate limit exceeded or the job queue is full
+    """
+    await check_rate_limit(request.telegram_id)
+    check_request = await _create_job(request, db)
+    job_id: int = check_request.id  # type: ignore[assignment]
+    listener = job_queue.subscribe(job_id)
+    try:
+        await _submit_job(check_request, db, request.force_refresh)
+    except HTTPException:
+        job_queue.unsubscribe(job_id, listener)
+        raise
+
+    specs = enabled_checks()
+    categories: dict[str, int] = {}
+    for spec in specs:
+        categories[spec.category] = categories.get(spec.category, 0) + 1
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse(
+            "job",
             {
-                "id": check.id,
-                "name": check.name,
-                "status": check.status,
-                "message": check.message,
-                "category": check.category,
-                "severity": check.severity,
-            }
-            for check in valid_results
-        ]
-
-        # Prepare response data
-        response_data = {
-            "score": report["score"],
-            "problems_critical": report["summary"]["problems_critical"],
-            "problems_important": report["summary"]["problems_important"],
-            "checks_ok": report["summary"]["checks_ok"],
-            "categories": report["categories"],
-            "top_priorities": report["top_priorities"],
-            "detailed_checks": detailed_checks,
-            "metadata": {
-                "checked_at": start_time.isoformat() + "Z",
-                "processing_time_sec": processing_time,
-                "checks_total": len(basic_checks) + len(advanced_checks),
-                "checks_completed": len(valid_results),
-                "checks_failed": failed_count,
+                "job_id": job_id,
+                "status": "pending",
+                "checks_total": len(specs),
+                "categories": categories,
             },
-        }
-
-        # Save CheckResult to database
-        check_result = CheckResult(
-            check_request_id=check_request.id,
-            score=report["score"],
-            problems_critical=report["summary"]["problems_critical"],
-            problems_important=report["summary"]["problems_important"],
-            checks_ok=report["summary"]["checks_ok"],
-            report_data=report,
-            detailed_checks=detailed_checks,
-            processing_time_sec=processing_time,
         )
-        db.add(check_result)
+        finished = False
+        try:
+            while True:
+                event: JobEvent = await listener.get()
+                if event is None:
+                    break
+                name, data = event
+                finished = finished or name in ("report", "error")
+                yield _sse(name, data)
+            if not finished:
+                yield _sse(
+                    "error",
+                    {"error": {"code": "internal_error", "message": "Произошла внутренняя ошибка"}},
+                )
+        finally:
+            job_queue.unsubscribe(job_id, listener)
 
-        # Update CheckRequest status
-        check_request.status = "completed"  # type: ignore[assignment]
-        await db.commit()
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        return response_data
 
-    except Exception as e:
-        # Update CheckRequest status to failed
-        check_request.status = "failed"  # type: ignore[assignment]
-        await db.commit()
+@router.get("/check/{job_id}", response_model=JobStatusSchema)
+async def get_check_job(job_id: int, db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
+    """Get status of a check job with results finished so far.
+
+    A job lost without finishing (see ``JobQueue.expired``) is marked
+    ``failed`` on the first poll. A failed job comes with ``error``.
+
+    Args:
+        job_id: Job ID returned by POST /api/check/jobs
+        db: Database session
+
+    Returns:
+        Job status, partial results, the full report once completed, or
+        the error once failed
+
+    Raises:
+        HTTPException: If job not found
+    """
+    check_request = await db.get(CheckRequest, job_id)
+
+    if not check_request:
         raise HTTPException(
-            status_code=500,
+            status_code=404,
             detail={
                 "error": {
-                    "code": "internal_error",
-                    "message": "Произошла внутренняя ошибка",
+                    "code": "job_not_found",
+                    "message": "Job not found",
                 }
             },
-        ) from e
+        )
+
+    error = None
+    if job_queue.expired(check_request):
+        check_request.status = "failed"  # type: ignore[assignment]
+        await db.commit()
+        error = JOB_EXPIRED["error"]
+    elif check_request.status == "failed":
+        error = {"code": "job_failed", "message": "Проверка не удалась. Запустите её снова."}
+
+    report = None
+    if check_request.status == "completed":
+        check_result = await db.scalar(
+            select(CheckResult).where(CheckResult.check_request_id == job_id)
+        )
+        if check_result:
+            report = response_from_row(check_result)
+
+    if report is not None:
+        results = report["detailed_checks"]
+    else:
+        results = [serialize_check(c) for c in job_queue.partial_results(job_id) or []]
+
+    return {
+        "job_id": check_request.id,
+        "site_url": check_request.site_url,
+        "status": check_request.status,
+        "results": results,
+        "report": report,
+        "error": error,
+    }
@@ -0,0 +1,90 @@
+"""API routes for report history of a site."""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.history import get_diff, get_history, site_key
+from app.schemas import SiteDiffSchema, SiteHistorySchema
+
+router = APIRouter(prefix="/api/sites", tags=["sites"])
+
+
+@router.get("/{site:path}/history", response_model=SiteHistorySchema)
+async def site_history(
+    site: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Get past scores of a site, newest first.
+
+    Args:
+        site: Host name (e.g. ``example.ru``) or site URL
+        limit: Max runs per page
+        cursor: ``next_cursor`` of the previous page
+        db: Database session
+
+    Returns:
+        One page of completed runs
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        return await get_history(db, site_key(site), limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": {
+                    "code": "invalid_cursor",
+                    "message": "Некорректный курсор страницы",
+                }
+            },
+        ) from e
+
+
+@router.get("/{site:path}/diff", response_model=SiteDiffSchema)
+async def site_diff(
+    site: str,
+    base: Optional[int] = None,
+    target: Optional[int] = None,
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Compare two completed runs of a site check by check.
+
+    Without parameters the latest run is compared with the previous one.
+
+    Args:
+        site: Host name (e.g. ``example.ru``) or site URL
+        base: Check request ID of the earlier run
+        target: Check request ID of the later run (default: latest)
+        since: Compare with the last run at or before this time (UTC)
+        db: Database session
+
+    Returns:
+        Score change and status change of every check
+
+    Raises:
+        HTTPException: If there are no such runs of the site
+    """
+    if since is not None and since.tzinfo is not None:
+        # Timestamps are stored as naive UTC (datetime.UTC needs Python 3.11)
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)  # noqa: UP017
+    diff = await get_diff(db, site_key(site), base, target, since)
+    if diff is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": {
+                    "code": "runs_not_found",
+                    "message": "Нет двух завершённых проверок сайта для сравнения",
+                }
+            },
+        )
+    return diff
@@ -0,0 +1,380 @@
+"""Check pipeline: runs all SEO checks for a site and builds the response."""
+
+import asyncio
+import copy
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from app.checks.base import CheckResult
+from app.checks.registry import ResultCallback, enabled_checks, run_scheduled
+from app.database import settings
+from app.deadline import Deadline
+from app.fetcher import PageFetcher
+from app.http_client import http_client
+from app.metrics import CheckTimings, observe_check, report_cache_requests, run_duration
+from app.models import CheckRequest
+from app.models import CheckResult as CheckResultModel
+from app.rate_limit import rate_limiter
+from app.report_builder import build_report
+from app.report_cache import report_cache
+from app.utils.urls import normalize_site_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckRun:
+    """Outcome of running all checks for one site."""
+
+    site_url: str
+    started_at: datetime
+    results: list[CheckResult] = field(default_factory=list)
+    report: dict[str, Any] = field(default_factory=dict)
+    checks_total: int = 0
+    checks_failed: int = 0
+    processing_time_sec: int = 0
+    processing_time_ms: float = 0.0
+    timings: dict[str, CheckTimings] = field(default_factory=dict)
+
+
+async def run_checks(
+    site_url: str,
+    on_result: Optional[ResultCallback] = None,
+    deadline: Optional[Deadline] = None,
+    force_refresh: bool = False,
+) -> CheckRun:
+    """Run all SEO checks for a website.
+
+    The run finishes by the deadline: requests get at most the time left, and
+    checks not done by then are counted as failed.
+
+    Args:
+        site_url: Website URL to check
+        on_result: Optional async callback invoked with each check result
+            as soon as it is ready (used for progress reporting)
+        deadline: Run deadline (``CHECK_DEADLINE_SEC`` from now by default)
+        force_refresh: Don't reuse data cached by earlier runs (robots.txt)
+
+    Returns:
+        CheckRun with results and built report
+    """
+    run = CheckRun(site_url=site_url, started_at=datetime.utcnow())
+    start = time.perf_counter()
+    specs = enabled_checks()
+    if deadline is None:
+        deadline = Deadline(settings.check_deadline_sec)
+
+    # One fetcher per run: checks requesting the same URL (the homepage is
+    # needed by six of them) share a single download
+    async with http_client() as client:
+        fetcher = PageFetcher(client, deadline)
+        # Each check starts as soon as its inputs are ready (the schema check
+        # waits for sitemap URLs only)
+        results = await run_scheduled(
+            specs,
+            site_url,
+            fetcher,
+            on_result,
+            deadline,
+            timings=run.timings,
+            force_refresh=force_refresh,
+        )
+
+    logger.info(
+        f"Fetched {fetcher.requests_made} URLs "
+        f"({fetcher.requests_coalesced} requests served from shared fetch)"
+    )
+
+    for spec, result in zip(specs, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Check {spec.id} failed with exception: {result!r}")
+            run.checks_failed += 1
+            status = "timeout" if isinstance(result, TimeoutError) else "exception"
+        else:
+            run.results.append(result)
+            status = result.status
+        observe_check(spec.id, status, run.timings.get(spec.id) or CheckTimings())
+
+    run.checks_total = len(specs)
+    run.report = build_report(run.results)
+    elapsed = time.perf_counter() - start
+    run.processing_time_sec = int(elapsed)
+    run.processing_time_ms = round(elapsed * 1000, 1)
+    run_duration.observe(elapsed)
+    return run
+
+
+def serialize_check(check: CheckResult) -> dict[str, Any]:
+    """Convert check result to API representation.
+
+    Args:
+        check: Check result
+
+    Returns:
+        Dictionary matching DetailedCheckSchema
+    """
+    return {
+        "id": check.id,
+        "name": check.name,
+        "status": check.status,
+        "message": check.message,
+        "category": check.category,
+        "severity": check.severity,
+    }
+
+
+def build_response(run: CheckRun) -> dict[str, Any]:
+    """Build API response from a finished run.
+
+    Args:
+        run: Finished check run
+
+    Returns:
+        Dictionary matching CheckResponseSchema
+    """
+    report = run.report
+    return {
+        "score": report["score"],
+        "problems_critical": report["summary"]["problems_critical"],
+        "problems_important": report["summary"]["problems_important"],
+        "checks_ok": report["summary"]["checks_ok"],
+        "categories": report["categories"],
+        "top_priorities": report["top_priorities"],
+        "detailed_checks": [serialize_check(check) for check in run.results],
+        "metadata": {
+            "checked_at": run.started_at.isoformat() + "Z",
+            "processing_time_sec": run.processing_time_sec,
+            "processing_time_ms": run.processing_time_ms,
+            "checks_total": run.checks_total,
+            "checks_completed": len(run.results),
+            "checks_failed": run.checks_failed,
+            "from_cache": False,
+            "check_timings": {
+                check_id: timings.as_dict() for check_id, timings in run.timings.items()
+            },
+        },
+    }
+
+
+async def get_report(
+    site_url: str, force_refresh: bool = False, on_result: Optional[ResultCallback] = None
+) -> dict[str, Any]:
+    """Get SEO report for a website, reusing a recent one when available.
+
+    A report for the same normalized URL from within the cache TTL is
+    returned without touching the network (``metadata.from_cache`` is set).
+    Concurrent requests for the same site share one run (single-flight):
+    later callers attach to the run in progress, get the results finished so
+    far replayed to ``on_result`` and all receive the same report. A fully
+    successful report is cached. Only a new run counts against the site's
+    rate limit.
+
+    Args:
+        site_url: Website URL to check
+        force_refresh: Ignore cached report and run the checks
+        on_result: Optional async callback invoked with each check result
+
+    Returns:
+        Dictionary matching CheckResponseSchema
+
+    Raises:
+        RateLimitError: If a new run is needed but the site is over its quota
+    """
+    key = normalize_site_url(site_url)
+
+    if not force_refresh:
+        cached = report_cache.get(key)
+        if cached is not None:
+            report_cache_requests.inc("hit")
+            if on_result is not None:
+                for check in cached["detailed_checks"]:
+                    await on_result(CheckResult(**check))
+            cached["metadata"]["from_cache"] = True
+            return cached
+
+    # Attach to a run already in flight for this site, or start one
+    shared = _in_flight.get(key)
+    if shared is None:
+        shared = SharedRun()
+        shared.task = asyncio.ensure_future(_run_shared(key, site_url, shared, force_refresh))
+        _in_flight[key] = shared
+        report_cache_requests.inc("miss")
+    else:
+        report_cache_requests.inc("joined")
+        logger.info(f"Joining in-flight check of {key}")
+
+    if on_result is not None:
+        await shared.subscribe(on_result)
+
+    # Shield so one cancelled caller doesn't cancel the run for everyone else
+    response = await asyncio.shield(shared.task)
+    return copy.deepcopy(response)
+
+
+class SharedRun:
+    """Check run shared by all concurrent requests for the same site."""
+
+    task: "asyncio.Future[dict[str, Any]]"  # Set right after creation
+
+    def __init__(self) -> None:
+        """Initialize shared run."""
+        self.results: list[CheckResult] = []
+        self._callbacks: list[ResultCallback] = []
+
+    async def subscribe(self, on_result: ResultCallback) -> None:
+        """Receive results finished so far and every result that follows.
+
+        Args:
+            on_result: Async callback invoked with each check result
+        """
+        # Snapshot and register without awaiting in between, so no result
+        # is missed or delivered twice
+        finished = list(self.results)
+        self._callbacks.append(on_result)
+        for result in finished:
+            await self._deliver(on_result, result)
+
+    async def publish(self, result: CheckResult) -> None:
+        """Record a finished check and pass it to all subscribers."""
+        self.results.append(result)
+        for on_result in list(self._callbacks):
+            await self._deliver(on_result, result)
+
+    @staticmethod
+    async def _deliver(on_result: ResultCallback, result: CheckResult) -> None:
+        """Invoke one subscriber; its errors must not break the shared run."""
+        try:
+            await on_result(result)
+        except Exception as e:
+            logger.error(f"Result callback failed: {e!r}")
+
+
+# Runs in progress by normalized site URL (single-flight)
+_in_flight: dict[str, SharedRun] = {}
+
+
+async def _run_shared(
+    key: str, site_url: str, shared: SharedRun, force_refresh: bool = False
+) -> dict[str, Any]:
+    """Run checks once for all requests attached to ``shared``.
+
+    Only here, when checks really run, is the site's rate limit charged.
+
+    Raises:
+        RateLimitError: If the site was checked too often
+    """
+    try:
+        if settings.rate_limit_enabled:
+            await rate_limiter.check_host(site_url)
+        run = await run_checks(site_url, on_result=shared.publish, force_refresh=force_refresh)
+        response = build_response(run)
+        if run.checks_failed == 0:
+            report_cache.set(key, response)
+        return response
+    finally:
+        _in_flight.pop(key, None)
+
+
+def build_result_row(
+    check_request_id: Optional[int], response: dict[str, Any]
+) -> CheckResultModel:
+    """Build CheckResult database row from an API response.
+
+    The response metadata is stored inside ``report_data`` so the full response
+    can be rebuilt later (e.g. for polling job status).
+
+    Args:
+        check_request_id: ID of the CheckRequest row, or None if the row is
+            attached to a new CheckRequest via ``CheckRequest.result``
+        response: Response built by build_response()
+
+    Returns:
+        Unsaved CheckResult model
+    """
+    return CheckResultModel(
+        check_request_id=check_request_id,
+        score=response["score"],
+        problems_critical=response["problems_critical"],
+        problems_important=response["problems_important"],
+        checks_ok=response["checks_ok"],
+        report_data={
+            "score": response["score"],
+            "categories": response["categories"],
+            "top_priorities": response["top_priorities"],
+            "summary": {
+                "total_checks": response["metadata"]["checks_completed"],
+                "checks_ok": response["checks_ok"],
+                "problems_critical": response["problems_critical"],
+                "problems_important": response["problems_important"],
+            },
+            "metadata": response["metadata"],
+        },
+        detailed_checks=response["detailed_checks"],
+        processing_time_sec=response["metadata"]["processing_time_sec"],
+    )
+
+
+def build_request_row(
+    telegram_id: int,
+    site_url: str,
+    created_at: datetime,
+    response: Optional[dict[str, Any]],
+    session_id: Optional[UUID] = None,
+) -> CheckRequest:
+    """Build CheckRequest database row of a finished check.
+
+    Args:
+        telegram_id: Telegram user ID
+        site_url: Checked website URL
+        created_at: When the check was requested
+        response: Response built by build_response(), or None if the check failed
+        session_id: Optional web session ID
+
+    Returns:
+        Unsaved CheckRequest (status ``completed`` with result, or ``failed``)
+    """
+    check_request = CheckRequest(
+        telegram_id=telegram_id,
+        # Normalized, so the history of a site is one index range
+        site_url=normalize_site_url(site_url),
+        status="completed" if response is not None else "failed",
+        session_id=session_id,
+        created_at=created_at,
+    )
+    if response is not None:
+        check_request.result = build_result_row(None, response)
+    return check_request
+
+
+def response_from_row(row: CheckResultModel) -> dict[str, Any]:
+    """Rebuild API response from a saved CheckResult row.
+
+    Args:
+        row: Saved CheckResult
+
+    Returns:
+        Dictionary matching CheckResponseSchema
+    """
+    report = row.report_data
+    checked_at = row.created_at.isoformat() + "Z" if row.created_at else ""
+    metadata = report.get("metadata") or {
+        "checked_at": checked_at,
+        "processing_time_sec": row.processing_time_sec or 0,
+        "checks_total": len(row.detailed_checks),
+        "checks_completed": len(row.detailed_checks),
+        "checks_failed": 0,
+    }
+    return {
+        "score": float(row.score),
+        "problems_critical": row.problems_critical,
+        "problems_important": row.problems_important,
+        "checks_ok": row.checks_ok,
+        "categories": report["categories"],
+        "top_priorities": report["top_priorities"],
+        "detailed_checks": row.detailed_checks,
+        "metadata": metadata,
+    }
@@ -5,6 +5,44 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
+from app.database import settings
+
+
+def validate_site_url(v: str) -> str:
+    """Validate site URL.
+
+    Args:
+        v: Site URL
+
+    Returns:
+        The same URL
+
+    Raises:
+        ValueError: If the URL is not http(s) or points to a private address
+    """
+    # Must start with http:// or https://
+    if not v.startswith(("http://", "https://")):
+        raise ValueError("site_url must start with http:// or https://")
+
+    if settings.allow_private_site_urls:
+        return v
+
+    # Block localhost and private IPs (SSRF protection)
+    lower_url = v.lower()
+    blocked = [
+        "localhost",
+        "127.0.0.1",
+        "0.0.0.0",
+        "10.",
+        "192.168.",
+        "172.16.",
+    ]
+    for blocked_host in blocked:
+        if blocked_host in lower_url:
+            raise ValueError(f"site_url cannot contain {blocked_host}")
+
+    return v
+
 
 class CheckRequestSchema(BaseModel):
     """Request schema for POST /api/check."""
@@ -12,29 +50,31 @@ class CheckRequestSchema(BaseModel):
     site_url: str = Field(..., min_length=1, max_length=500)
     telegram_id: int = Field(..., gt=0)
     session_id: Optional[UUID] = None
+    force_refresh: bool = False  # Ignore cached report and run checks again
 
     @field_validator("site_url")
     @classmethod
     def validate_site_url(cls, v: str) -> str:
         """Validate site URL."""
-        # Must start with http:// or https://
-        if not v.startswith(("http://", "https://")):
-            raise ValueError("site_url must start with http:// or https://")
-
-        # Block localhost and private IPs (SSRF protection)
-        lower_url = v.lower()
-        blocked = [
-            "localhost",
-            "127.0.0.1",
-            "0.0.0.0",
-            "10.",
-            "192.168.",
-            "172.16.",
-        ]
-        for blocked_host in blocked:
-            if blocked_host in lower_url:
-                raise ValueError(f"site_url cannot contain {blocked_host}")
+        return validate_site_url(v)
+
 
+class BatchCheckRequestSchema(BaseModel):
+    """Request schema for POST /api/check/batch."""
+
+    site_urls: list[str] = Field(..., min_length=1, max_length=500)
+    telegram_id: int = Field(..., gt=0)
+    force_refresh: bool = False
+    concurrency: Optional[int] = Field(None, ge=1, le=50)  # Sites checked at once
+
+    @field_validator("site_urls")
+    @classmethod
+    def validate_site_urls(cls, v: list[str]) -> list[str]:
+        """Validate every site URL."""
+        for site_url in v:
+            if not 1 <= len(site_url) <= 500:
+                raise ValueError("site_url must be 1-500 characters long")
+            validate_site_url(site_url)
         return v
 
 
@@ -67,14 +107,26 @@ class DetailedCheckSchema(BaseModel):
     severity: Optional[Literal["critical", "important", "enhancement"]] = None
 
 
+class CheckTimingSchema(BaseModel):
+    """Where one check spent its time."""
+
+    total_ms: float
+    fetch_ms: float  # Waiting for HTTP responses (shared downloads included)
+    parse_ms: float  # Waiting for parsed pages
+    bytes_downloaded: int  # Downloads started by this check
+
+
 class MetadataSchema(BaseModel):
     """Check metadata."""
 
     checked_at: str
     processing_time_sec: int
+    processing_time_ms: Optional[float] = None  # Missing in reports saved before it existed
     checks_total: int
     checks_completed: int
     checks_failed: int
+    from_cache: bool = False
+    check_timings: dict[str, CheckTimingSchema] = Field(default_factory=dict)
 
 
 class CheckResponseSchema(BaseModel):
@@ -90,6 +142,65 @@ class CheckResponseSchema(BaseModel):
     metadata: MetadataSchema
 
 
+class JobCreatedSchema(BaseModel):
+    """Response schema for POST /api/check/jobs."""
+
+    job_id: int
+    status: Literal["pending"]
+
+
+class JobStatusSchema(BaseModel):
+    """Response schema for GET /api/check/{job_id}."""
+
+    job_id: int
+    site_url: str
+    status: Literal["pending", "running", "completed", "failed"]
+    results: list[DetailedCheckSchema]
+    report: Optional[CheckResponseSchema] = None
+    error: Optional[dict[str, Any]] = None  # Why a failed job has no report
+
+
+class SiteRunSchema(BaseModel):
+    """Scores of one completed run in the site history."""
+
+    check_request_id: int
+    checked_at: str
+    score: float
+    problems_critical: int
+    problems_important: int
+    checks_ok: int
+
+
+class SiteHistorySchema(BaseModel):
+    """Response schema for GET /api/sites/{site}/history."""
+
+    site_url: str
+    items: list[SiteRunSchema]
+    next_cursor: Optional[str] = None  # None on the last page
+
+
+class CheckDiffSchema(BaseModel):
+    """Change of one check between two runs."""
+
+    id: str
+    name: str
+    base_status: Optional[str] = None  # None if the check is new
+    target_status: Optional[str] = None  # None if the check was removed
+    change: Literal["improved", "worsened", "unchanged", "unknown", "added", "removed"]
+    message: str
+
+
+class SiteDiffSchema(BaseModel):
+    """Response schema for GET /api/sites/{site}/diff."""
+
+    site_url: str
+    base: SiteRunSchema
+    target: SiteRunSchema
+    score_delta: float
+    summary: dict[str, int]  # Checks improved, worsened, unchanged
+    checks: list[CheckDiffSchema]
+
+
 class ErrorResponseSchema(BaseModel):
     """Error response schema."""
 
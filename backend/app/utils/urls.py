@@ -0,0 +1,26 @@
+"""URL helpers."""
+
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_site_url(site_url: str) -> str:
+    """Normalize site URL for use as a cache key.
+
+    Lowercases scheme and host, drops the default port, trailing slashes
+    and the fragment. Query string is kept as is.
+
+    Args:
+        site_url: Website URL (http:// or https://)
+
+    Returns:
+        Normalized URL, e.g. ``https://example.ru/catalog``
+    """
+    parts = urlsplit(site_url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, host, path, parts.query, ""))
@@ -0,0 +1,308 @@
+"""Benchmark: /api/check latency, throughput and memory against local mock sites.
+
+Starts the mock site server (benchmarks/mock_site.py) and the API in a
+uvicorn subprocess, drives ``POST /api/check`` at a fixed concurrency and
+reports p50/p95/p99 latency, throughput and peak RSS of the API process
+(and of its parse workers). Results are saved as JSON, one file per commit,
+so runs can be compared with ``--baseline``.
+
+The API runs with ALLOW_PRIVATE_SITE_URLS=true, rate limits and per-host
+limits off. Results are saved if DATABASE_URL points to a database;
+otherwise saving fails in the background without affecting the responses.
+
+Usage (from backend/):
+    python -m benchmarks.api_load [--requests 200] [--concurrency 20] [--sites 20]
+        [--page-kb 300] [--latency-ms 50] [--sitemap-urls 2000] [--jsonld-blocks 3]
+        [--baseline benchmarks/results/api_load-<commit>.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from benchmarks.mock_site import MockSites, add_profile_arguments, profile_from_args, start_server
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+# Metrics compared with --baseline: name -> True if higher is better
+COMPARED = {
+    "throughput_rps": True,
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+    "peak_rss_mb": False,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    rank = max(int(len(values) * q / 100 + 0.999999) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def _rss_kb(pid: int) -> int:
+    """Resident set size of a process in KB (0 if unknown)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid: int) -> list[int]:
+    """Child process IDs (parse workers) of a process."""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+class RssSampler:
+    """Samples RSS of a process and its children in a background thread (Linux)."""
+
+    def __init__(self, pid: int, interval: float = 0.1) -> None:
+        """Initialize sampler.
+
+        Args:
+            pid: Process to watch
+            interval: Seconds between samples
+        """
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self.peak_total_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Record peaks until stopped."""
+        while not self._stop.is_set():
+            own = _rss_kb(self.pid)
+            total = own + sum(_rss_kb(child) for child in _children(self.pid))
+            self.peak_kb = max(self.peak_kb, own)
+            self.peak_total_kb = max(self.peak_total_kb, total)
+            self._stop.wait(self.interval)
+
+
+def start_api(port: int, log_path: Path) -> subprocess.Popen[bytes]:
+    """Start the API in a uvicorn subprocess and wait until it answers."""
+    env = {
+        **os.environ,
+        "ALLOW_PRIVATE_SITE_URLS": "true",
+        "RATE_LIMIT_ENABLED": "false",
+        "REPORT_CACHE_TTL_SEC": "0",
+        # All mock sites share one host; per-host limits would measure the throttle
+        "HOST_POLITENESS_ENABLED": "false",
+    }
+    log = log_path.open("wb")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1"]
+        + ["--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API exited with code {process.returncode}, see {log_path}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"API did not start in 60 s, see {log_path}")
+
+
+async def drive(
+    api_url: str, site_urls: list[str], requests: int, concurrency: int
+) -> tuple[list[float], dict[str, int], float]:
+    """Send check requests at a fixed concurrency.
+
+    Returns:
+        Latencies of successful requests (seconds, sorted), count per status
+        code and wall time
+    """
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            i = queue.get_nowait()
+            payload = {
+                "site_url": site_urls[i % len(site_urls)],
+                "telegram_id": i + 1,
+                "force_refresh": True,
+            }
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{api_url}/api/check", json=payload)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(elapsed)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=300.0, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+    return sorted(latencies), statuses, wall
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of the checked out commit (None outside of git)."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def _get(results: dict[str, Any], path: str) -> Optional[float]:
+    """Get nested value by dotted path."""
+    value: Any = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print change of key metrics against a baseline run."""
+    print(f"\nvs baseline {baseline.get('commit')} ({baseline.get('created_at')}):")
+    for path, higher_is_better in COMPARED.items():
+        new = _get(current["results"], path)
+        old = _get(baseline["results"], path)
+        if new is None or not old:
+            continue
+        change = (new - old) / old * 100
+        better = change > 0 if higher_is_better else change < 0
+        mark = "same" if abs(change) < 1 else "better" if better else "worse"
+        print(f"  {path:16} {old:10.1f} -> {new:10.1f}  {change:+6.1f}%  {mark}")
+
+
+def main() -> None:
+    """Run benchmark, print and save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5, help="Requests sent before measuring")
+    parser.add_argument("--sites", type=int, default=20, help="Distinct mock sites")
+    parser.add_argument("--site-port", type=int, default=8765)
+    parser.add_argument("--api-port", type=int, default=8766)
+    parser.add_argument("--output", help="Result file (default: results/api_load-<commit>.json)")
+    parser.add_argument("--baseline", help="Result file of an earlier run to compare with")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    profile = profile_from_args(args)
+    sites = MockSites(profile)
+    server, _ = start_server(sites, port=args.site_port)
+    site_urls = [f"http://127.0.0.1:{args.site_port}/s/{n}" for n in range(args.sites)]
+
+    log_path = Path(tempfile.gettempdir()) / "api_load_uvicorn.log"
+    api = start_api(args.api_port, log_path)
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    try:
+        if args.warmup:
+            asyncio.run(drive(api_url, site_urls, args.warmup, min(args.warmup, args.concurrency)))
+
+        sampler = RssSampler(api.pid)
+        sampler.start()
+        site_requests = sites.requests
+        latencies, statuses, wall = asyncio.run(
+            drive(api_url, site_urls, args.requests, args.concurrency)
+        )
+        sampler.stop()
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+        server.should_exit = True
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    result = {
+        "benchmark": "api_load",
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),  # noqa: UP017
+        "params": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "sites": args.sites,
+            "profile": asdict(profile),
+        },
+        "results": {
+            "requests_ok": len(latencies),
+            "status_codes": statuses,
+            "wall_sec": round(wall, 3),
+            "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies_ms, 50), 1),
+                "p95": round(percentile(latencies_ms, 95), 1),
+                "p99": round(percentile(latencies_ms, 99), 1),
+                "max": round(latencies_ms[-1], 1) if latencies_ms else 0.0,
+                "mean": round(sum(latencies_ms) / len(latencies_ms), 1) if latencies_ms else 0.0,
+            },
+            "peak_rss_mb": round(sampler.peak_kb / 1024, 1),
+            "peak_rss_with_workers_mb": round(sampler.peak_total_kb / 1024, 1),
+            "site_requests": sites.requests - site_requests,
+        },
+    }
+
+    print(json.dumps(result["results"], indent=2))
+    if args.baseline:
+        compare(result, json.loads(Path(args.baseline).read_text()))
+
+    output = Path(args.output or RESULTS_DIR / f"api_load-{result['commit'] or 'local'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+    print(f"\nSaved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Benchmark: query plans of check_requests hot lookups with and without indexes.
+
+Seeds a scratch schema with millions of check requests (one result each),
+runs the hot queries with EXPLAIN ANALYZE, creates the composite indexes of
+migration c7e8f9a0b1c2 and runs them again. Needs PostgreSQL (DATABASE_URL);
+application tables are not touched, the scratch schema is dropped at the end.
+
+Usage (from backend/):
+    python -m benchmarks.db_indexes [--rows 2000000] [--users 50000] [--sites 200000]
+"""
+
+import argparse
+import asyncio
+import re
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.database import database_url
+
+SCHEMA = "bench_indexes"
+
+CREATE_TABLES = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"""
+    CREATE TABLE {SCHEMA}.check_requests (
+        id serial PRIMARY KEY,
+        telegram_id bigint NOT NULL,
+        username varchar(255),
+        site_url varchar(500) NOT NULL,
+        status varchar(50),
+        session_id uuid,
+        created_at timestamp DEFAULT now(),
+        updated_at timestamp DEFAULT now()
+    )
+    """,
+    f"""
+    CREATE TABLE {SCHEMA}.check_results (
+        id serial PRIMARY KEY,
+        check_request_id integer NOT NULL
+            REFERENCES {SCHEMA}.check_requests (id) ON DELETE CASCADE,
+        score decimal(3, 1) NOT NULL,
+        problems_critical integer,
+        problems_important integer,
+        checks_ok integer,
+        report_data json NOT NULL,
+        detailed_checks json NOT NULL,
+        processing_time_sec integer,
+        created_at timestamp DEFAULT now()
+    )
+    """,
+]
+
+# Same indexes as before the migration (single-column telegram_id only)
+BASELINE_INDEXES = [
+    f"CREATE INDEX ON {SCHEMA}.check_requests (telegram_id)",
+]
+
+# Indexes after migration c7e8f9a0b1c2
+COMPOSITE_INDEXES = [
+    f"DROP INDEX {SCHEMA}.check_requests_telegram_id_idx",
+    f"CREATE INDEX ON {SCHEMA}.check_requests (telegram_id, created_at)",
+    f"CREATE INDEX ON {SCHEMA}.check_requests (site_url, created_at)",
+    f"CREATE INDEX ON {SCHEMA}.check_results (check_request_id)",
+]
+
+SEED = f"""
+INSERT INTO {SCHEMA}.check_requests (telegram_id, site_url, status, created_at)
+SELECT
+    (random() * :users)::bigint,
+    'https://site' || (random() * :sites)::int || '.ru',
+    'completed',
+    now() - random() * interval '365 days'
+FROM generate_series(1, :rows);
+
+INSERT INTO {SCHEMA}.check_results
+    (check_request_id, score, checks_ok, report_data, detailed_checks, created_at)
+SELECT id, (random() * 10)::decimal(3, 1), 7, '{{}}', '[]', created_at
+FROM {SCHEMA}.check_requests;
+"""
+
+# Hot lookups: name -> SQL (parameters are picked from the seeded data)
+QUERIES = {
+    "user checks in last hour (rate limit)": f"""
+        SELECT count(*) FROM {SCHEMA}.check_requests
+        WHERE telegram_id = :telegram_id AND created_at > now() - interval '1 hour'
+    """,
+    "user history, latest 20": f"""
+        SELECT id, site_url, created_at FROM {SCHEMA}.check_requests
+        WHERE telegram_id = :telegram_id ORDER BY created_at DESC LIMIT 20
+    """,
+    "site history, latest 20": f"""
+        SELECT id, status, created_at FROM {SCHEMA}.check_requests
+        WHERE site_url = :site_url ORDER BY created_at DESC LIMIT 20
+    """,
+    "latest report of a site": f"""
+        SELECT r.score, r.created_at FROM {SCHEMA}.check_requests q
+        JOIN {SCHEMA}.check_results r ON r.check_request_id = q.id
+        WHERE q.site_url = :site_url ORDER BY q.created_at DESC LIMIT 1
+    """,
+}
+
+
+async def execute_script(conn: AsyncConnection, statements: list[str]) -> None:
+    """Execute DDL statements one by one."""
+    for statement in statements:
+        await conn.execute(text(statement))
+
+
+async def explain(conn: AsyncConnection, sql: str, params: dict[str, object]) -> tuple[str, float]:
+    """Run query with EXPLAIN ANALYZE.
+
+    Returns:
+        Top plan node and execution time in milliseconds
+    """
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+    rows = result.scalars().all()
+    scans = [row.strip(" ->") for row in rows if "Scan" in row]
+    node = (scans[0] if scans else rows[0]).split("  (")[0]
+    match = re.search(r"Execution Time: ([\d.]+) ms", rows[-1])
+    return node, float(match[1]) if match else 0.0
+
+
+async def run_queries(conn: AsyncConnection, label: str, params: dict[str, object]) -> None:
+    """Print plan and timing of every hot query."""
+    print(f"\n== {label}")
+    for name, sql in QUERIES.items():
+        await explain(conn, sql, params)  # Warm up the cache
+        node, elapsed = await explain(conn, sql, params)
+        print(f"{name:40} {elapsed:9.3f} ms  {node}")
+
+
+async def run(rows: int, users: int, sites: int, keep: bool) -> None:
+    """Seed scratch tables and compare plans before/after the indexes."""
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await execute_script(conn, CREATE_TABLES + BASELINE_INDEXES)
+
+        print(f"Seeding {rows:,} check requests...")
+        start = time.perf_counter()
+        for statement in SEED.split(";"):
+            if statement.strip():
+                await conn.execute(
+                    text(statement), {"rows": rows, "users": users, "sites": sites}
+                )
+        await conn.execute(text(f"ANALYZE {SCHEMA}.check_requests"))
+        await conn.execute(text(f"ANALYZE {SCHEMA}.check_results"))
+        print(f"Seeded in {time.perf_counter() - start:.1f} s")
+
+        sample = (
+            await conn.execute(
+                text(
+                    f"SELECT telegram_id, site_url FROM {SCHEMA}.check_requests "
+                    "ORDER BY created_at DESC LIMIT 1"
+                )
+            )
+        ).one()
+        params = {"telegram_id": sample.telegram_id, "site_url": sample.site_url}
+
+        await run_queries(conn, "before (telegram_id index only)", params)
+
+        start = time.perf_counter()
+        await execute_script(conn, COMPOSITE_INDEXES)
+        await conn.execute(text(f"ANALYZE {SCHEMA}.check_requests"))
+        print(f"\nIndexes built in {time.perf_counter() - start:.1f} s")
+
+        await run_queries(conn, "after (composite indexes)", params)
+
+        if not keep:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+    await engine.dispose()
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--sites", type=int, default=200_000)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.users, args.sites, args.keep))
+
+
+if __name__ == "__main__":
+    main()
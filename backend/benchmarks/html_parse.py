@@ -0,0 +1,112 @@
+"""Benchmark: CPU time of HTML-based checks per run.
+
+Compares the old behaviour (every check downloads and parses the homepage
+itself with html.parser) with the shared fetch + parse-once lxml document.
+
+Usage (from backend/):
+    python -m benchmarks.html_parse [--runs 5] [--cards 2000]
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+
+from app.checks import document
+from app.checks.analytics import check_analytics
+from app.checks.check_canonical import check_canonical
+from app.checks.check_opengraph import check_opengraph
+from app.checks.headings import check_headings
+from app.checks.meta_tags import check_meta_tags
+from app.checks.noindex import check_noindex
+from app.fetcher import PageFetcher
+
+SITE_URL = "https://bench.example.ru"
+
+HTML_CHECKS: list[Callable[..., Any]] = [
+    check_analytics,
+    check_noindex,
+    check_meta_tags,
+    check_headings,
+    check_canonical,
+    check_opengraph,
+]
+
+
+def build_landing_page(cards: int) -> bytes:
+    """Build a synthetic heavy developer landing page.
+
+    Args:
+        cards: Number of apartment cards on the page
+
+    Returns:
+        HTML document bytes
+    """
+    card = (
+        '<div class="card" data-id="{i}"><a href="/flats/{i}/">'
+        '<img src="/img/{i}.webp" alt="Квартира {i}" loading="lazy"></a>'
+        "<h3>2-комнатная квартира, {i} м²</h3><ul><li>Этаж {i}</li>"
+        "<li>Корпус 3</li><li>Сдача 2027</li></ul>"
+        '<span class="price">{i} 000 000 ₽</span>'
+        '<button class="btn" onclick="fav({i})">В избранное</button></div>'
+    )
+    body = "".join(card.format(i=i) for i in range(cards))
+    return (
+        "<!DOCTYPE html><html><head>"
+        "<title>ЖК Бенчмарк — квартиры от застройщика в Москве</title>"
+        '<meta name="description" content="' + "Описание " * 15 + '">'
+        f'<link rel="canonical" href="{SITE_URL}/">'
+        '<meta property="og:title" content="ЖК"><meta property="og:image" content="/og.png">'
+        '<script src="https://mc.yandex.ru/metrika/tag.js"></script>'
+        "</head><body><h1>ЖК Бенчмарк</h1><h2>Планировки</h2>"
+        f'<div id="catalog">{body}</div></body></html>'
+    ).encode("utf-8")
+
+
+async def run_once(page: bytes, shared: bool) -> float:
+    """Run HTML checks once and return CPU seconds spent.
+
+    Args:
+        page: Homepage HTML
+        shared: Use shared fetch + parse-once document (new behaviour)
+
+    Returns:
+        Process CPU time in seconds
+    """
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=page))
+    async with httpx.AsyncClient(transport=transport) as client:
+        http: Any = PageFetcher(client) if shared else client
+        start = time.process_time()
+        await asyncio.gather(*(check(SITE_URL, http) for check in HTML_CHECKS))
+        return time.process_time() - start
+
+
+def measure(page: bytes, runs: int, shared: bool, parser: str) -> float:
+    """Average CPU time per run for one configuration."""
+    document.HTML_PARSER = parser
+    return sum(asyncio.run(run_once(page, shared)) for _ in range(runs)) / runs
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=2000)
+    args = parser.parse_args()
+
+    page = build_landing_page(args.cards)
+    print(f"Page size: {len(page) / 1024:.0f} KB, runs: {args.runs}")
+
+    before = measure(page, args.runs, shared=False, parser="html.parser")
+    after = measure(page, args.runs, shared=True, parser="lxml")
+
+    print(f"before (6 fetches, 6x html.parser): {before * 1000:8.1f} ms CPU/run")
+    print(f"after  (1 fetch, 1x lxml):          {after * 1000:8.1f} ms CPU/run")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
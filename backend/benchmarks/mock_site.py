@@ -0,0 +1,285 @@
+"""Local HTTP server with synthetic real-estate developer sites.
+
+Every site lives under its own path prefix (``/s/<n>``) and has a robots.txt,
+a sitemap.xml (a sitemap index above 50 000 URLs), an HTML sitemap and
+landing pages with apartment cards and JSON-LD blocks. Page sizes, response
+latency, sitemap size and JSON-LD density are configurable, content is
+deterministic for a given seed.
+
+Usage (from backend/):
+    python -m benchmarks.mock_site [--port 8765] [--page-kb 300] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import uvicorn
+
+# URLs per sitemap file (sitemaps.org limit)
+SITEMAP_FILE_URLS = 50_000
+
+Receive = Callable[[], Any]
+Send = Callable[[dict[str, Any]], Any]
+
+
+@dataclass(frozen=True)
+class SiteProfile:
+    """Shape of the synthetic sites."""
+
+    page_kb: int = 300  # Homepage size
+    inner_page_kb: int = 80  # Size of other pages
+    latency_ms: float = 50.0  # Delay before every response
+    jitter_ms: float = 20.0  # Random extra delay, up to
+    sitemap_urls: int = 2000  # Pages listed in sitemap.xml
+    jsonld_blocks: int = 3  # LD+JSON scripts per page
+    seed: int = 1
+
+
+CARD = (
+    '<div class="card" data-id="{i}"><a href="{base}/flats/{i}/">'
+    '<img src="/img/{i}.webp" alt="Квартира {i}" loading="lazy"></a>'
+    "<h3>2-комнатная квартира, {i} м²</h3><ul><li>Этаж {i}</li>"
+    "<li>Корпус 3</li><li>Сдача 2027</li></ul>"
+    '<span class="price">{i} 000 000 ₽</span>'
+    '<button class="btn" onclick="fav({i})">В избранное</button></div>'
+)
+
+JSONLD_TYPES = ["Organization", "ApartmentComplex", "BreadcrumbList", "Product", "Offer"]
+
+
+def build_page(base: str, path: str, size_kb: int, jsonld_blocks: int) -> bytes:
+    """Build landing page of about ``size_kb`` kilobytes.
+
+    Args:
+        base: Site URL (scheme, host and site prefix)
+        path: Page path within the site
+        size_kb: Target page size
+        jsonld_blocks: Number of LD+JSON scripts
+
+    Returns:
+        HTML document bytes
+    """
+    jsonld = "".join(
+        '<script type="application/ld+json">'
+        + json.dumps(
+            {
+                "@context": "https://schema.org",
+                "@type": JSONLD_TYPES[i % len(JSONLD_TYPES)],
+                "name": f"ЖК Бенчмарк {i}",
+                "url": f"{base}{path}",
+            },
+            ensure_ascii=False,
+        )
+        + "</script>"
+        for i in range(jsonld_blocks)
+    )
+    head = (
+        "<!DOCTYPE html><html><head>"
+        "<title>ЖК Бенчмарк — квартиры от застройщика в Москве</title>"
+        '<meta name="description" content="' + "Описание " * 15 + '">'
+        f'<link rel="canonical" href="{base}{path}">'
+        '<meta property="og:title" content="ЖК"><meta property="og:description" content="ЖК">'
+        '<meta property="og:image" content="/og.png">'
+        '<script src="https://mc.yandex.ru/metrika/tag.js"></script>'
+        f'{jsonld}</head><body><h1>ЖК Бенчмарк</h1><h2>Планировки</h2><div id="catalog">'
+    )
+    parts = [head]
+    size = len(head.encode("utf-8"))
+    i = 0
+    while size < size_kb * 1024:
+        card = CARD.format(i=i, base=base)
+        parts.append(card)
+        size += len(card.encode("utf-8"))
+        i += 1
+    parts.append("</div></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def build_sitemap(urls: list[str]) -> bytes:
+    """Build ``<urlset>`` document."""
+    entries = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+    ).encode()
+
+
+def build_sitemap_index(urls: list[str]) -> bytes:
+    """Build ``<sitemapindex>`` document."""
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}'
+        "</sitemapindex>"
+    ).encode()
+
+
+class MockSites:
+    """ASGI application serving the synthetic sites."""
+
+    def __init__(self, profile: SiteProfile) -> None:
+        """Initialize server app.
+
+        Args:
+            profile: Shape of the sites
+        """
+        self.profile = profile
+        self.requests = 0
+        self._random = random.Random(profile.seed)
+        # Generated documents by (site URL, kind); all inner pages of a site
+        # share one document, so generation cost doesn't grow with the sitemap
+        self._cache: dict[tuple[str, str], bytes] = {}
+
+    def _cached(self, base: str, kind: str, build: Callable[[], bytes]) -> bytes:
+        """Get generated document, building it on first use."""
+        key = (base, kind)
+        body = self._cache.get(key)
+        if body is None:
+            body = self._cache[key] = build()
+        return body
+
+    def respond(self, base: str, path: str) -> tuple[int, str, bytes]:
+        """Build response for a path within a site.
+
+        Args:
+            base: Site URL, e.g. ``http://127.0.0.1:8765/s/3``
+            path: Path within the site, e.g. ``/robots.txt``
+
+        Returns:
+            Status code, content type and body
+        """
+        profile = self.profile
+        if path == "/robots.txt":
+            body = f"User-agent: *\nDisallow: /admin/\nSitemap: {base}/sitemap.xml\n"
+            return 200, "text/plain", body.encode("utf-8")
+
+        if path == "/sitemap.xml" and profile.sitemap_urls > SITEMAP_FILE_URLS:
+            files = (profile.sitemap_urls + SITEMAP_FILE_URLS - 1) // SITEMAP_FILE_URLS
+            children = [f"{base}/sitemap-{k}.xml" for k in range(files)]
+            return 200, "application/xml", build_sitemap_index(children)
+
+        if path == "/sitemap.xml" or (path.startswith("/sitemap-") and path.endswith(".xml")):
+            k = 0 if path == "/sitemap.xml" else int(path[len("/sitemap-") : -len(".xml")])
+            start = k * SITEMAP_FILE_URLS
+            end = min(start + SITEMAP_FILE_URLS, profile.sitemap_urls)
+            body = self._cached(
+                base,
+                path,
+                lambda: build_sitemap([f"{base}/flats/{i}/" for i in range(start, end)]),
+            )
+            return 200, "application/xml", body
+
+        if path == "/sitemap/":
+            links = "".join(f'<a href="{base}/flats/{i}/">Квартира {i}</a>' for i in range(50))
+            return 200, "text/html", f"<html><body>{links}</body></html>".encode()
+
+        if path in ("", "/"):
+            body = self._cached(
+                base, "home", lambda: build_page(base, "/", profile.page_kb, profile.jsonld_blocks)
+            )
+            return 200, "text/html", body
+
+        if path.startswith("/flats/"):
+            body = self._cached(
+                base,
+                "inner",
+                lambda: build_page(base, path, profile.inner_page_kb, profile.jsonld_blocks),
+            )
+            return 200, "text/html", body
+
+        return 404, "text/html", b"<html><body>Not found</body></html>"
+
+    async def __call__(self, scope: dict[str, Any], receive: Receive, send: Send) -> None:
+        """Handle ASGI request."""
+        if scope["type"] != "http":
+            return
+
+        self.requests += 1
+        host = dict(scope["headers"]).get(b"host", b"127.0.0.1").decode()
+        parts = scope["path"].split("/", 3)  # "", "s", "<n>", rest
+        if len(parts) < 3 or parts[1] != "s":
+            status, content_type, body = 404, "text/plain", b"Not found"
+        else:
+            base = f"http://{host}/s/{parts[2]}"
+            path = "/" + parts[3] if len(parts) > 3 else ""
+            status, content_type, body = self.respond(base, path)
+
+        delay = self.profile.latency_ms + self._random.random() * self.profile.jitter_ms
+        await asyncio.sleep(delay / 1000)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", content_type.encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def start_server(
+    app: MockSites, host: str = "127.0.0.1", port: int = 8765
+) -> tuple[uvicorn.Server, threading.Thread]:
+    """Start server in a background thread and wait until it listens.
+
+    Returns:
+        Server (set ``should_exit`` to stop it) and its thread
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False)
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Mock site server failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return server, thread
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add SiteProfile options to a command line parser."""
+    defaults = SiteProfile()
+    parser.add_argument("--page-kb", type=int, default=defaults.page_kb)
+    parser.add_argument("--inner-page-kb", type=int, default=defaults.inner_page_kb)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--sitemap-urls", type=int, default=defaults.sitemap_urls)
+    parser.add_argument("--jsonld-blocks", type=int, default=defaults.jsonld_blocks)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def profile_from_args(args: argparse.Namespace) -> SiteProfile:
+    """Build SiteProfile from parsed options."""
+    return SiteProfile(
+        page_kb=args.page_kb,
+        inner_page_kb=args.inner_page_kb,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        sitemap_urls=args.sitemap_urls,
+        jsonld_blocks=args.jsonld_blocks,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    """Serve mock sites until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    app = MockSites(profile_from_args(args))
+    print(f"Serving sites at http://{args.host}:{args.port}/s/<n>")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: event-loop lag while big pages are parsed.
+
+Parses several multi-megabyte landing pages concurrently, once on the event
+loop and once in the parse worker pool, while a ticker task measures how late
+the loop wakes it up. Lag is what every other in-flight request would wait.
+
+Usage (from backend/):
+    python -m benchmarks.parse_pool [--pages 8] [--cards 8000] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app import parse_pool
+from app.checks.document import get_page
+from benchmarks.html_parse import build_landing_page
+
+# Ticker period in seconds
+TICK = 0.005
+
+
+class Response:
+    """Minimal response holding page bytes (a new object means a new parse)."""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+
+async def measure_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late each tick fires."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def run(page: bytes, pages: int, workers: int) -> tuple[float, list[float]]:
+    """Parse pages concurrently and return wall time and loop lags."""
+    await parse_pool.init_parse_pool(workers)
+    stop = asyncio.Event()
+    lags: list[float] = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(get_page(Response(page)) for _ in range(pages)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    await parse_pool.close_parse_pool()
+    return elapsed, lags
+
+
+def report(label: str, elapsed: float, lags: list[float]) -> None:
+    """Print wall time and lag percentiles in milliseconds."""
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{label:22} wall {elapsed * 1000:8.1f} ms   loop lag "
+        f"median {statistics.median(lags_ms):7.1f}  p99 {p99:7.1f}  max {lags_ms[-1]:7.1f} ms"
+    )
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--cards", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    page = build_landing_page(args.cards)
+    print(f"Page size: {len(page) / 1024 / 1024:.1f} MB, pages: {args.pages}")
+
+    report("event loop", *asyncio.run(run(page, args.pages, workers=0)))
+    report(f"pool ({args.workers} workers)", *asyncio.run(run(page, args.pages, args.workers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Add composite indexes for check_requests lookups
+
+Revision ID: c7e8f9a0b1c2
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e8f9a0b1c2'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY doesn't lock the table for writes, but can't run in a transaction
+    with op.get_context().autocommit_block():
+        # Requests of a user in a time range (rate limits, user history)
+        op.create_index(
+            'ix_check_requests_telegram_id_created_at',
+            'check_requests',
+            ['telegram_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Checks of a site in a time range (report history, recent report lookup)
+        op.create_index(
+            'ix_check_requests_site_url_created_at',
+            'check_requests',
+            ['site_url', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Result of a request (job status, history joins)
+        op.create_index(
+            op.f('ix_check_results_check_request_id'),
+            'check_results',
+            ['check_request_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # telegram_id alone is served by the composite index (leftmost column)
+        op.drop_index(
+            op.f('ix_check_requests_telegram_id'),
+            table_name='check_requests',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_check_requests_telegram_id'),
+            'check_requests',
+            ['telegram_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_check_results_check_request_id'),
+            table_name='check_results',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_check_requests_site_url_created_at',
+            table_name='check_requests',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_check_requests_telegram_id_created_at',
+            table_name='check_requests',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,47 @@
+"""Normalize site_url of existing check requests
+
+Revision ID: d4e5f6a7b8c9
+Revises: c7e8f9a0b1c2
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, None] = 'c7e8f9a0b1c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same as app.utils.urls.normalize_site_url for URLs without query and fragment:
+# lowercase scheme and host, drop the default port and trailing slashes of the path
+NORMALIZED_SITE_URL = r"""
+    regexp_replace(
+        lower(substring(site_url from '^[A-Za-z]+://[^/?#]*')),
+        '^(https://.*):443$|^(http://.*):80$',
+        '\1\2'
+    )
+    || rtrim(substring(site_url from '^[A-Za-z]+://[^/?#]*(.*)$'), '/')
+"""
+
+
+def upgrade() -> None:
+    # New rows are stored normalized (app.utils.urls.normalize_site_url), so
+    # site history is a plain equality lookup on ix_check_requests_site_url_created_at.
+    op.execute(
+        f"""
+        UPDATE check_requests
+        SET site_url = {NORMALIZED_SITE_URL}
+        WHERE site_url ~ '^[A-Za-z]+://'
+          AND site_url !~ '[?#]'
+        """
+    )
+
+
+def downgrade() -> None:
+    # Original spelling of the URLs is not kept
+    pass
@@ -8,6 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 from app.database import Base, get_db
 from app.main import app
+from app.politeness import host_scheduler
+from app.rate_limit import rate_limiter
+from app.robots import robots_cache
 
 # Test database URL (SQLite for simplicity)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -38,6 +41,24 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def reset_rate_limits() -> None:
+    """Start every test with empty rate limit counters."""
+    await rate_limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_robots_cache() -> None:
+    """Start every test without cached robots.txt files."""
+    robots_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_host_scheduler() -> None:
+    """Start every test without per-host limits state."""
+    host_scheduler.reset()
+
+
 @pytest.fixture
 def client(db_session: AsyncSession) -> Generator[TestClient, None, None]:
     """FastAPI test client with test database."""
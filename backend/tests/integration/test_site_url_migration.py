@@ -0,0 +1,77 @@
+"""Test of the site_url backfill migration against normalize_site_url.
+
+Needs PostgreSQL (the SQL uses its regular expressions): DATABASE_URL must
+point to a reachable server, otherwise the test is skipped.
+"""
+
+import importlib.util
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+from app.database import settings
+from app.utils.urls import normalize_site_url
+
+MIGRATION = (
+    Path(__file__).parents[2]
+    / "migrations"
+    / "versions"
+    / "d4e5f6a7b8c9_normalize_check_requests_site_url.py"
+)
+
+SAMPLES = [
+    "https://example.ru",
+    "https://example.ru/",
+    "HTTPS://Example.RU/Catalog/",
+    "https://example.ru:443",
+    "https://example.ru:443/catalog//",
+    "http://example.ru:80/",
+    "http://example.ru:443",
+    "https://example.ru:80",
+    "https://example.ru:8443/",
+    "http://EXAMPLE.ru:8080/Path/",
+    "https://xn--e1afmkfd.xn--p1ai/",
+]
+
+
+def load_migration() -> ModuleType:
+    """Import the migration module (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location("site_url_migration", MIGRATION)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+async def pg_connection() -> AsyncGenerator[Any, None]:
+    """Connection to the PostgreSQL server from DATABASE_URL."""
+    asyncpg = pytest.importorskip("asyncpg")
+    dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    if not dsn.startswith("postgresql://"):
+        pytest.skip("DATABASE_URL is not a PostgreSQL URL")
+    try:
+        connection = await asyncpg.connect(dsn, timeout=3)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+    yield connection
+    await connection.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("site_url", SAMPLES)
+async def test_backfill_matches_normalize_site_url(pg_connection: Any, site_url: str) -> None:
+    """Test the SQL backfill normalizes URLs like normalize_site_url."""
+    # Arrange
+    expression = load_migration().NORMALIZED_SITE_URL
+
+    # Act
+    normalized = await pg_connection.fetchval(
+        f"SELECT {expression} FROM (VALUES ($1::text)) AS check_requests(site_url)", site_url
+    )
+
+    # Assert
+    assert normalized == normalize_site_url(site_url)
@@ -0,0 +1,111 @@
+"""Unit tests for shared parsed HTML pages."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app import parse_pool
+from app.checks.document import get_page, summarize_html
+
+
+class MockResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, text: str = "") -> None:
+        self.status_code = 200
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers: dict = {}
+
+
+PAGE = """
+<html><head>
+<title> Квартиры от застройщика </title>
+<meta name="description" content=" Описание ">
+<meta name="robots" content="index, follow">
+<link rel="canonical" href="https://example.ru/">
+<meta property="og:title" content="ЖК"><meta name="og:image" content="/og.png">
+<script type="application/ld+json">{"@type": "Organization"}</script>
+<script type="application/ld+json">[{"@type": "BreadcrumbList"}, {"name": "x"}]</script>
+<script type="application/ld+json">{broken</script>
+</head><body><div id="root"><h1>ЖК</h1><h2>A</h2><h2>B</h2>
+<a href="/1">1</a><a href="/2">2</a></div></body></html>
+"""
+
+
+def test_summary_extracts_check_inputs() -> None:
+    """Test summary holds everything HTML checks read from the page."""
+    # Act
+    page = summarize_html(PAGE.encode("utf-8"))
+
+    # Assert
+    assert page.title == "Квартиры от застройщика"
+    assert page.meta_description == "Описание"
+    assert page.meta_robots == "index, follow"
+    assert page.canonical == "https://example.ru/"
+    assert page.og_tags == {"og:title", "og:image"}
+    assert page.has_app_root
+    assert (page.h1_count, page.h2_count, page.link_count) == (1, 2, 2)
+    assert page.schema_types == ("Organization", "BreadcrumbList", "Unknown")
+
+
+def test_summary_handles_malformed_html() -> None:
+    """Test malformed markup still produces an (empty) summary."""
+    # Act
+    page = summarize_html(b"Not HTML <><>")
+
+    # Assert
+    assert page.title == ""
+    assert page.meta_robots is None
+    assert page.canonical is None
+    assert page.h1_count == 0
+
+
+@pytest.mark.asyncio
+async def test_page_parsed_once_per_response() -> None:
+    """Test concurrent checks of the same response share one parse."""
+    # Arrange
+    response = MockResponse("<html><head><title>Example</title></head></html>")
+
+    # Act
+    with patch("app.checks.document.summarize_html", wraps=summarize_html) as summarize:
+        first, second = await asyncio.gather(get_page(response), get_page(response))
+        third = await get_page(response)
+
+    # Assert
+    assert first is second is third
+    assert first.title == "Example"
+    assert summarize.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_page_not_shared_between_responses() -> None:
+    """Test different responses get their own summary."""
+    # Arrange
+    first = MockResponse("<html><title>One</title></html>")
+    second = MockResponse("<html><title>Two</title></html>")
+
+    # Act & Assert
+    assert (await get_page(first)).title == "One"
+    assert (await get_page(second)).title == "Two"
+
+
+@pytest.mark.asyncio
+async def test_big_page_parsed_in_worker_process() -> None:
+    """Test pages over the size threshold are parsed by the process pool."""
+    # Arrange
+    response = MockResponse(PAGE)
+    await parse_pool.init_parse_pool(workers=1)
+    offloaded = parse_pool.stats.offloaded
+
+    # Act
+    try:
+        with patch.object(parse_pool.settings, "parse_offload_min_bytes", 0):
+            page = await get_page(response)
+    finally:
+        await parse_pool.close_parse_pool()
+
+    # Assert
+    assert parse_pool.stats.offloaded == offloaded + 1
+    assert page == summarize_html(PAGE.encode("utf-8"))
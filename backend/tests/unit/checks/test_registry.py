@@ -0,0 +1,258 @@
+"""Unit tests for check registry and scheduler."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+
+from app.checks.base import CheckResult
+from app.checks.registry import (
+    CheckContext,
+    CheckOutput,
+    CheckRegistry,
+    CheckSpec,
+    registry,
+    run_scheduled,
+)
+from app.database import settings
+from app.deadline import Deadline
+
+
+def make_result(check_id: str) -> CheckResult:
+    """Build a successful check result."""
+    return CheckResult(id=check_id, name=check_id, status="ok", message="✅")
+
+
+def test_builtin_checks_registered_in_report_order() -> None:
+    """Test all built-in checks are registered, schema check last."""
+    ids = [spec.id for spec in registry.specs()]
+
+    assert len(ids) == 10
+    assert ids[0] == "tech-robots"
+    assert ids[-1] == "meta-schema"
+
+
+def test_disabled_checks_are_skipped() -> None:
+    """Test checks can be left out by ID."""
+    ids = [spec.id for spec in registry.specs(disabled=["meta-schema", "tech-analytics"])]
+
+    assert "meta-schema" not in ids
+    assert "tech-analytics" not in ids
+    assert len(ids) == 8
+
+
+def test_register_rejects_unknown_input() -> None:
+    """Test a check can't depend on data nobody registered before produces."""
+    # Arrange
+    checks = CheckRegistry()
+
+    async def run(ctx: CheckContext) -> CheckOutput:
+        return make_result("a"), {}
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        checks.register(CheckSpec("a", "technical", run, inputs=("sitemap_urls",)))
+
+
+@pytest.mark.asyncio
+async def test_dependent_check_does_not_wait_for_unrelated_checks() -> None:
+    """Test a check starts once its producer is done, before slow unrelated checks."""
+    # Arrange
+    slow_done = asyncio.Event()
+    received: list[object] = []
+
+    async def slow(ctx: CheckContext) -> CheckOutput:
+        await slow_done.wait()
+        return make_result("slow"), {}
+
+    async def producer(ctx: CheckContext) -> CheckOutput:
+        return make_result("producer"), {"urls": ["https://example.ru/a"]}
+
+    async def consumer(ctx: CheckContext) -> CheckOutput:
+        received.append(ctx.inputs["urls"])
+        slow_done.set()  # would deadlock if the consumer waited for "slow"
+        return make_result("consumer"), {}
+
+    specs = [
+        CheckSpec("slow", "technical", slow),
+        CheckSpec("producer", "technical", producer, outputs=("urls",)),
+        CheckSpec("consumer", "content", consumer, inputs=("urls",)),
+    ]
+
+    # Act
+    results = await asyncio.wait_for(
+        run_scheduled(specs, "https://example.ru", client=None), timeout=1  # type: ignore[arg-type]
+    )
+
+    # Assert
+    assert [result.id for result in results] == ["slow", "producer", "consumer"]
+    assert received == [["https://example.ru/a"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_producer_passes_none_to_dependents() -> None:
+    """Test dependents still run with None input when the producer raises."""
+    # Arrange
+    received: list[object] = []
+
+    async def producer(ctx: CheckContext) -> CheckOutput:
+        raise RuntimeError("boom")
+
+    async def consumer(ctx: CheckContext) -> CheckOutput:
+        received.append(ctx.inputs["urls"])
+        return make_result("consumer"), {}
+
+    specs = [
+        CheckSpec("producer", "technical", producer, outputs=("urls",)),
+        CheckSpec("consumer", "content", consumer, inputs=("urls",)),
+    ]
+    reported: list[str] = []
+
+    async def on_result(result: CheckResult) -> None:
+        reported.append(result.id)
+
+    # Act
+    results = await run_scheduled(specs, "https://example.ru", None, on_result)  # type: ignore[arg-type]
+
+    # Assert
+    assert isinstance(results[0], RuntimeError)
+    assert results[1].id == "consumer"
+    assert received == [None]
+    assert reported == ["consumer"]
+
+
+@pytest.mark.asyncio
+async def test_checks_past_deadline_are_cut_off() -> None:
+    """Test checks still running at the deadline are cancelled and reported."""
+    # Arrange
+    async def fast(ctx: CheckContext) -> CheckOutput:
+        return make_result("fast"), {}
+
+    async def hanging(ctx: CheckContext) -> CheckOutput:
+        await asyncio.sleep(10)
+        return make_result("hanging"), {}
+
+    specs = [CheckSpec("fast", "technical", fast), CheckSpec("hanging", "technical", hanging)]
+
+    # Act
+    results = await asyncio.wait_for(
+        run_scheduled(specs, "https://example.ru", None, deadline=Deadline(0.05)),  # type: ignore[arg-type]
+        timeout=1,
+    )
+
+    # Assert
+    assert results[0].id == "fast"
+    assert isinstance(results[1], TimeoutError)
+
+
+class MockResponse:
+    """Mock HTTP response (full or streamed body)."""
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers: dict = {}
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        yield self.content
+
+
+class SlowSiteClient:
+    """Mock client of a site whose inner pages never load in time."""
+
+    PAGES = [f"https://example.ru/page{i}" for i in range(20)]
+
+    async def get(self, url: str, **kwargs: Any) -> MockResponse:
+        if url.endswith("/robots.txt"):
+            return MockResponse(404)
+        if url != "https://example.ru":
+            await asyncio.sleep(10)
+        return MockResponse(
+            200, '<script type="application/ld+json">{"@type": "Organization"}</script>'
+        )
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[MockResponse]:
+        entries = "".join(f"<url><loc>{page}</loc></url>" for page in self.PAGES)
+        yield MockResponse(
+            200,
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>',
+        )
+
+
+@pytest.mark.asyncio
+async def test_schema_budget_ends_before_run_deadline() -> None:
+    """Test schema sampling returns its partial result when the deadline is the limit."""
+    # Arrange: the 20 s schema budget is cut to the run deadline minus the margin
+    specs = [
+        spec
+        for spec in registry.specs()
+        if spec.id in ("tech-robots", "tech-sitemap", "meta-schema")
+    ]
+
+    # Act
+    results = await asyncio.wait_for(
+        run_scheduled(specs, "https://example.ru", SlowSiteClient(), deadline=Deadline(1.3)),  # type: ignore[arg-type]
+        timeout=3,
+    )
+
+    # Assert
+    schema = results[-1]
+    assert isinstance(schema, CheckResult)
+    assert schema.id == "meta-schema"
+    assert "не уложились во время: 14 из 15" in schema.message
+
+
+class SlowSitemapIndexClient(SlowSiteClient):
+    """Mock client of a site with a sitemap index whose children load slowly."""
+
+    CHILDREN = [f"https://example.ru/sitemap-{i}.xml" for i in range(12)]
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[MockResponse]:
+        if url == "https://example.ru/sitemap.xml":
+            entries = "".join(f"<sitemap><loc>{child}</loc></sitemap>" for child in self.CHILDREN)
+            body = (
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"{entries}</sitemapindex>"
+            )
+        else:
+            await asyncio.sleep(0.3)
+            body = (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"<url><loc>{url}.html</loc></url></urlset>"
+            )
+        yield MockResponse(200, body)
+
+
+@pytest.mark.asyncio
+async def test_slow_sitemap_index_keeps_sitemap_and_schema_results(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a sitemap index slower than the run keeps both the sitemap and schema results."""
+    # Arrange: children take 0.3 s, 4 at a time; the run has 1 s with a 0.2 s margin
+    monkeypatch.setattr(settings, "check_deadline_margin_sec", 0.2)
+    specs = [
+        spec
+        for spec in registry.specs()
+        if spec.id in ("tech-robots", "tech-sitemap", "meta-schema")
+    ]
+
+    client = SlowSitemapIndexClient()
+
+    # Act
+    results = await asyncio.wait_for(
+        run_scheduled(specs, "https://example.ru", client, deadline=Deadline(1.0)),  # type: ignore[arg-type]
+        timeout=3,
+    )
+
+    # Assert
+    sitemap, schema = results[1], results[2]
+    assert isinstance(sitemap, CheckResult)
+    assert sitemap.status == "partial"
+    assert "прочитан не полностью" in sitemap.message
+    assert isinstance(schema, CheckResult)
+    assert schema.id == "meta-schema"
@@ -107,3 +107,22 @@ async def test_robots_txt_timeout() -> None:
     assert result.id == "tech-robots"
     assert result.status == "error"
     assert "Ошибка проверки" in result.message or "Timeout" in result.message
+
+
+@pytest.mark.asyncio
+async def test_robots_txt_disallows_whole_site() -> None:
+    """Test robots.txt closing the whole site for all crawlers."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(
+        status_code=200,
+        text="User-agent: *\nDisallow: /\nSitemap: https://example.ru/sitemap.xml",
+    )
+
+    # Act
+    result = await check_robots_txt("https://example.ru", mock_client)
+
+    # Assert
+    assert result.status == "problem"
+    assert "Disallow: /" in result.message
+    assert result.severity == "critical"
@@ -0,0 +1,140 @@
+"""Unit tests for Schema.org microdata check."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.checks.check_schema import check_schema_microdata
+from app.robots import parse_robots_txt
+
+PAGE_WITH_SCHEMA = """
+<html><head>
+<script type="application/ld+json">{"@type": "Organization"}</script>
+<script type="application/ld+json">[{"@type": "BreadcrumbList"}]</script>
+</head><body></body></html>
+"""
+
+
+class MockResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers: dict = {}
+
+
+@pytest.mark.asyncio
+async def test_schema_found_on_sampled_pages() -> None:
+    """Test schema types are collected from all sampled pages."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(status_code=200, text=PAGE_WITH_SCHEMA)
+    sitemap_urls = [f"https://example.ru/page{i}" for i in range(20)]
+
+    # Act
+    result = await check_schema_microdata("https://example.ru", sitemap_urls, mock_client)
+
+    # Assert
+    assert result.id == "meta-schema"
+    assert result.status == "ok"
+    assert "Organization" in result.message
+    assert mock_client.get.call_count == 15
+
+
+@pytest.mark.asyncio
+async def test_schema_respects_per_host_concurrency() -> None:
+    """Test no more than the configured number of requests run per host."""
+    # Arrange
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_get(url: str, **kwargs: object) -> MockResponse:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return MockResponse(status_code=200, text=PAGE_WITH_SCHEMA)
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = slow_get
+    sitemap_urls = [f"https://example.ru/page{i}" for i in range(14)]
+
+    # Act
+    result = await check_schema_microdata(
+        "https://example.ru", sitemap_urls, mock_client, max_concurrency_per_host=3
+    )
+
+    # Assert
+    assert result.status == "ok"
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_schema_partial_result_when_budget_exceeded() -> None:
+    """Test slow pages are dropped (and their requests stopped) once the budget runs out."""
+    # Arrange
+    in_flight = 0
+
+    async def get(url: str, **kwargs: object) -> MockResponse:
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            if url != "https://example.ru":
+                await asyncio.sleep(10)
+            return MockResponse(status_code=200, text=PAGE_WITH_SCHEMA)
+        finally:
+            in_flight -= 1
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = get
+    sitemap_urls = [f"https://example.ru/page{i}" for i in range(14)]
+
+    # Act
+    result = await check_schema_microdata(
+        "https://example.ru", sitemap_urls, mock_client, time_budget=0.1
+    )
+
+    # Assert
+    assert result.status == "ok"
+    assert "14 из 15" in result.message
+    assert in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_schema_no_pages_loaded() -> None:
+    """Test error when no page could be loaded."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(status_code=500)
+
+    # Act
+    result = await check_schema_microdata("https://example.ru", [], mock_client)
+
+    # Assert
+    assert result.status == "error"
+
+
+@pytest.mark.asyncio
+async def test_schema_skips_urls_disallowed_by_robots() -> None:
+    """Test sitemap URLs closed in robots.txt are not fetched."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(status_code=200, text=PAGE_WITH_SCHEMA)
+    sitemap_urls = [f"https://example.ru/page{i}" for i in range(4)]
+    sitemap_urls += [f"https://example.ru/private/page{i}" for i in range(20)]
+    robots = parse_robots_txt("User-agent: *\nDisallow: /private/")
+
+    # Act
+    result = await check_schema_microdata(
+        "https://example.ru", sitemap_urls, mock_client, robots=robots
+    )
+
+    # Assert
+    assert result.status == "ok"
+    requested = [call.args[0] for call in mock_client.get.call_args_list]
+    assert len(requested) == 5
+    assert not any("/private/" in url for url in requested)
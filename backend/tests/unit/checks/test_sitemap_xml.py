@@ -1,26 +1,81 @@
 """Unit tests for sitemap.xml check."""
 
-from unittest.mock import AsyncMock
+import asyncio
+import gzip
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
 import pytest
 
 from app.checks.base import CheckResult
-from app.checks.sitemap_xml import check_sitemap_xml
+from app.checks.sitemap_xml import SAMPLE_SIZE, SitemapParser, check_sitemap_xml
+from app.robots import parse_robots_txt
 
 
 class MockResponse:
-    """Mock HTTP response."""
+    """Mock streamed HTTP response."""
 
-    def __init__(self, status_code: int, content: bytes = b"") -> None:
+    def __init__(self, status_code: int, content: bytes = b"", chunk_size: int = 64) -> None:
         self.status_code = status_code
         self.content = content
+        self.chunk_size = chunk_size
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.content), self.chunk_size):
+            yield self.content[start : start + self.chunk_size]
+
+
+class MockClient:
+    """Mock HTTP client serving streamed responses by URL."""
+
+    def __init__(self, responses: dict[str, MockResponse]) -> None:
+        self.responses = responses
+        self.requested: list[str] = []
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[MockResponse]:
+        self.requested.append(url)
+        yield self.responses.get(url, MockResponse(status_code=404))
+
+
+class SlowChildrenClient(MockClient):
+    """Mock client whose child sitemaps take ``delay`` seconds each."""
+
+    def __init__(self, responses: dict[str, MockResponse], delay: float) -> None:
+        super().__init__(responses)
+        self.delay = delay
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[MockResponse]:
+        if not url.endswith("/sitemap.xml"):
+            await asyncio.sleep(self.delay)
+        async with super().stream(method, url, **kwargs) as response:
+            yield response
+
+
+def make_urlset(urls: list[str]) -> bytes:
+    """Build <urlset> sitemap document."""
+    entries = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+    ).encode()
+
+
+def make_index(urls: list[str]) -> bytes:
+    """Build <sitemapindex> document."""
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+    ).encode()
 
 
 @pytest.mark.asyncio
 async def test_sitemap_xml_valid_with_urls() -> None:
     """Test valid sitemap with URLs."""
     # Arrange
-    mock_client = AsyncMock()
     sitemap_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
   <url>
@@ -31,10 +86,10 @@ async def test_sitemap_xml_valid_with_urls() -> None:
     <loc>https://example.ru/about</loc>
   </url>
 </urlset>"""
-    mock_client.get.return_value = MockResponse(status_code=200, content=sitemap_xml)
+    client = MockClient({"https://example.ru/sitemap.xml": MockResponse(200, sitemap_xml)})
 
     # Act
-    result = await check_sitemap_xml("https://example.ru", mock_client)
+    result, urls = await check_sitemap_xml("https://example.ru", client)
 
     # Assert
     assert isinstance(result, CheckResult)
@@ -43,62 +98,198 @@ async def test_sitemap_xml_valid_with_urls() -> None:
     assert result.status == "ok"
     assert "содержит" in result.message and "URL" in result.message
     assert result.severity is None
-    mock_client.get.assert_called_once_with("https://example.ru/sitemap.xml", timeout=10.0)
+    assert urls == ["https://example.ru/", "https://example.ru/about"]
+    assert client.requested == ["https://example.ru/sitemap.xml"]
 
 
 @pytest.mark.asyncio
 async def test_sitemap_xml_sitemap_index() -> None:
-    """Test sitemap index (multiple sitemaps)."""
+    """Test sitemap index: child sitemaps are read and their URLs counted."""
     # Arrange
-    mock_client = AsyncMock()
-    sitemap_index = b"""<?xml version="1.0" encoding="UTF-8"?>
-<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-  <sitemap>
-    <loc>https://example.ru/sitemap-posts.xml</loc>
-  </sitemap>
-  <sitemap>
-    <loc>https://example.ru/sitemap-pages.xml</loc>
-  </sitemap>
-</sitemapindex>"""
-    mock_client.get.return_value = MockResponse(status_code=200, content=sitemap_index)
+    client = MockClient(
+        {
+            "https://example.ru/sitemap.xml": MockResponse(
+                200,
+                make_index(
+                    ["https://example.ru/sitemap-posts.xml", "https://example.ru/sitemap-pages.xml"]
+                ),
+            ),
+            "https://example.ru/sitemap-posts.xml": MockResponse(
+                200, make_urlset(["https://example.ru/post-1", "https://example.ru/post-2"])
+            ),
+            "https://example.ru/sitemap-pages.xml": MockResponse(
+                200, make_urlset(["https://example.ru/about"])
+            ),
+        }
+    )
 
     # Act
-    result = await check_sitemap_xml("https://example.ru", mock_client)
+    result, urls = await check_sitemap_xml("https://example.ru", client)
 
     # Assert
     assert result.id == "tech-sitemap"
-    assert result.status == "partial"
+    assert result.status == "ok"
     assert "sitemap index" in result.message.lower()
+    assert "3 URL" in result.message
+    assert sorted(urls) == [
+        "https://example.ru/about",
+        "https://example.ru/post-1",
+        "https://example.ru/post-2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_index_with_unavailable_child() -> None:
+    """Test sitemap index with a missing child sitemap is partial."""
+    # Arrange
+    client = MockClient(
+        {
+            "https://example.ru/sitemap.xml": MockResponse(
+                200,
+                make_index(
+                    ["https://example.ru/sitemap-posts.xml", "https://example.ru/sitemap-gone.xml"]
+                ),
+            ),
+            "https://example.ru/sitemap-posts.xml": MockResponse(
+                200, make_urlset(["https://example.ru/post-1"])
+            ),
+        }
+    )
+
+    # Act
+    result, urls = await check_sitemap_xml("https://example.ru", client)
+
+    # Assert
+    assert result.status == "partial"
     assert result.severity == "enhancement"
+    assert urls == ["https://example.ru/post-1"]
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_gzip() -> None:
+    """Test gzip-compressed sitemap is decompressed while streaming."""
+    # Arrange
+    content = gzip.compress(make_urlset([f"https://example.ru/page-{i}" for i in range(500)]))
+    client = MockClient({"https://example.ru/sitemap.xml": MockResponse(200, content)})
+
+    # Act
+    result, urls = await check_sitemap_xml("https://example.ru", client)
+
+    # Assert
+    assert result.status == "ok"
+    assert "500 URL" in result.message
+    assert len(urls) == SAMPLE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_stops_at_url_cap() -> None:
+    """Test reading stops once the URL cap is reached."""
+    # Arrange
+    children = [f"https://example.ru/sitemap-{i}.xml" for i in range(5)]
+    responses = {"https://example.ru/sitemap.xml": MockResponse(200, make_index(children))}
+    for i, child in enumerate(children):
+        pages = [f"https://example.ru/{i}/page-{n}" for n in range(100)]
+        responses[child] = MockResponse(200, make_urlset(pages))
+    client = MockClient(responses)
+
+    # Act
+    result, urls = await check_sitemap_xml(
+        "https://example.ru", client, max_urls=150, index_concurrency=1
+    )
+
+    # Assert
+    assert result.status == "ok"
+    assert "не менее 150 URL" in result.message
+    assert len(client.requested) == 3  # index + two children
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_index_read_in_part_within_budget() -> None:
+    """Test index whose children don't fit the time budget gives a partial result."""
+    # Arrange: 12 children, 4 at a time, 0.3 s each; only the first 4 fit in 0.5 s
+    children = [f"https://example.ru/sitemap-{i}.xml" for i in range(12)]
+    responses = {"https://example.ru/sitemap.xml": MockResponse(200, make_index(children))}
+    for i, child in enumerate(children):
+        responses[child] = MockResponse(200, make_urlset([f"https://example.ru/{i}/page"]))
+    client = SlowChildrenClient(responses, delay=0.3)
+
+    # Act
+    result, urls = await asyncio.wait_for(
+        check_sitemap_xml("https://example.ru", client, index_concurrency=4, time_budget=0.5),
+        timeout=2,
+    )
+
+    # Assert
+    assert result.status == "partial"
+    assert "не менее 4 URL" in result.message
+    assert "прочитан не полностью" in result.message
+    assert len(urls) == 4
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_index_children_out_of_budget() -> None:
+    """Test index without any child read in time is an error, not a missing sitemap."""
+    # Arrange
+    children = [f"https://example.ru/sitemap-{i}.xml" for i in range(3)]
+    responses = {"https://example.ru/sitemap.xml": MockResponse(200, make_index(children))}
+    client = SlowChildrenClient(responses, delay=1.0)
+
+    # Act
+    result, urls = await check_sitemap_xml("https://example.ru", client, time_budget=0.1)
+
+    # Assert
+    assert result.status == "error"
+    assert "не хватило времени" in result.message
+    assert urls == []
+
+
+def test_sitemap_parser_ignores_extension_locs() -> None:
+    """Test <image:loc> inside an entry is not counted as a page."""
+    # Arrange
+    found: list[str] = []
+    parser = SitemapParser(found.append)
+    content = b"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://example.ru/</loc>
+    <image:image><image:loc>https://example.ru/logo.png</image:loc></image:image>
+  </url>
+</urlset>"""
+
+    # Act
+    parser.feed(content)
+    parser.close()
+
+    # Assert
+    assert found == ["https://example.ru/"]
 
 
 @pytest.mark.asyncio
 async def test_sitemap_xml_not_found() -> None:
     """Test sitemap.xml not found (404)."""
     # Arrange
-    mock_client = AsyncMock()
-    mock_client.get.return_value = MockResponse(status_code=404)
+    client = MockClient({})
 
     # Act
-    result = await check_sitemap_xml("https://example.ru", mock_client)
+    result, urls = await check_sitemap_xml("https://example.ru", client)
 
     # Assert
     assert result.id == "tech-sitemap"
     assert result.status == "problem"
     assert "не найден" in result.message
     assert result.severity == "critical"
+    assert urls == []
 
 
 @pytest.mark.asyncio
 async def test_sitemap_xml_invalid_xml() -> None:
     """Test invalid XML in sitemap."""
     # Arrange
-    mock_client = AsyncMock()
     invalid_xml = b"This is not XML at all!"
-    mock_client.get.return_value = MockResponse(status_code=200, content=invalid_xml)
+    client = MockClient({"https://example.ru/sitemap.xml": MockResponse(200, invalid_xml)})
 
     # Act
-    result = await check_sitemap_xml("https://example.ru", mock_client)
+    result, _ = await check_sitemap_xml("https://example.ru", client)
 
     # Assert
     assert result.id == "tech-sitemap"
@@ -111,17 +302,70 @@ async def test_sitemap_xml_invalid_xml() -> None:
 async def test_sitemap_xml_empty() -> None:
     """Test empty sitemap (no URLs)."""
     # Arrange
-    mock_client = AsyncMock()
     empty_sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
 </urlset>"""
-    mock_client.get.return_value = MockResponse(status_code=200, content=empty_sitemap)
+    client = MockClient({"https://example.ru/sitemap.xml": MockResponse(200, empty_sitemap)})
 
     # Act
-    result = await check_sitemap_xml("https://example.ru", mock_client)
+    result, _ = await check_sitemap_xml("https://example.ru", client)
 
     # Assert
     assert result.id == "tech-sitemap"
     assert result.status == "problem"
     assert "не содержит URL" in result.message
     assert result.severity == "important"
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_declared_in_robots() -> None:
+    """Test sitemaps declared in robots.txt are read instead of /sitemap.xml."""
+    # Arrange
+    client = MockClient(
+        {
+            "https://example.ru/maps/main.xml": MockResponse(
+                200, make_urlset(["https://example.ru/a", "https://example.ru/b"])
+            ),
+            "https://example.ru/maps/news.xml": MockResponse(
+                200, make_urlset(["https://example.ru/news/1"])
+            ),
+        }
+    )
+    robots = parse_robots_txt(
+        "User-agent: *\n"
+        "Sitemap: https://example.ru/maps/main.xml\n"
+        "Sitemap: https://example.ru/maps/news.xml\n"
+    )
+
+    # Act
+    result, urls = await check_sitemap_xml("https://example.ru", client, robots=robots)
+
+    # Assert
+    assert result.status == "ok"
+    assert "указан в robots.txt" in result.message
+    assert "3 URL" in result.message
+    assert sorted(urls) == [
+        "https://example.ru/a",
+        "https://example.ru/b",
+        "https://example.ru/news/1",
+    ]
+    assert "https://example.ru/sitemap.xml" not in client.requested
+
+
+@pytest.mark.asyncio
+async def test_sitemap_xml_falls_back_when_declared_missing() -> None:
+    """Test /sitemap.xml is tried when the declared sitemap is missing."""
+    # Arrange
+    client = MockClient(
+        {"https://example.ru/sitemap.xml": MockResponse(200, make_urlset(["https://example.ru/a"]))}
+    )
+    robots = parse_robots_txt("User-agent: *\nSitemap: https://example.ru/old.xml")
+
+    # Act
+    result, urls = await check_sitemap_xml("https://example.ru", client, robots=robots)
+
+    # Assert
+    assert result.status == "ok"
+    assert "robots.txt" not in result.message
+    assert urls == ["https://example.ru/a"]
+    assert client.requested == ["https://example.ru/old.xml", "https://example.ru/sitemap.xml"]
@@ -0,0 +1,168 @@
+"""Unit tests for batch site checks."""
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from app.batch import run_batch, unique_sites
+from app.models import CheckRequest
+from app.rate_limit import RateLimitError
+
+
+def make_response() -> dict[str, Any]:
+    """Build minimal report response."""
+    return {
+        "score": 7.0,
+        "problems_critical": 0,
+        "problems_important": 1,
+        "checks_ok": 7,
+        "categories": [],
+        "top_priorities": [],
+        "detailed_checks": [],
+        "metadata": {"checks_completed": 10, "processing_time_sec": 1},
+    }
+
+
+def test_unique_sites_drops_repeats() -> None:
+    """Test the same site given twice is checked once."""
+    sites = unique_sites(["https://a.ru", "https://A.ru/", "https://b.ru"])
+
+    assert sites == ["https://a.ru", "https://b.ru"]
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_global_and_per_host_limits() -> None:
+    """Test no more sites run at once than allowed, overall and per host."""
+    # Arrange
+    running: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def fake_report(site_url: str, force_refresh: bool = False) -> dict[str, Any]:
+        host = "same" if "same" in site_url else "other"
+        for key in (host, "all"):
+            running[key] = running.get(key, 0) + 1
+            peak[key] = max(peak.get(key, 0), running[key])
+        await asyncio.sleep(0.01)
+        for key in (host, "all"):
+            running[key] -= 1
+        return make_response()
+
+    sites = [f"https://same.ru/page-{i}" for i in range(4)]
+    sites += [f"https://other{i}.ru" for i in range(6)]
+
+    # Act
+    with patch("app.batch.get_report", side_effect=fake_report):
+        lines = [line async for line in run_batch(sites, 1, concurrency=3, per_host_concurrency=1)]
+
+    # Assert
+    assert peak["all"] <= 3
+    assert peak["same"] == 1
+    assert len(lines) == 11
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["completed"] == 10
+    assert lines[-1]["sites_per_minute"] > 0
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_failed_sites_and_saves_rows() -> None:
+    """Test a failing site yields an error line and every site is saved."""
+    # Arrange
+    rows: list[CheckRequest] = []
+
+    async def fake_report(site_url: str, force_refresh: bool = False) -> dict[str, Any]:
+        if "broken" in site_url:
+            raise RuntimeError("boom")
+        return make_response()
+
+    async def on_row(row: CheckRequest) -> None:
+        rows.append(row)
+
+    # Act
+    with patch("app.batch.get_report", side_effect=fake_report):
+        lines = [
+            line
+            async for line in run_batch(
+                ["https://ok.ru", "https://broken.ru"], 42, on_row=on_row
+            )
+        ]
+
+    # Assert
+    by_site = {line["site_url"]: line for line in lines if line["type"] == "result"}
+    assert by_site["https://ok.ru"]["status"] == "completed"
+    assert by_site["https://ok.ru"]["report"]["score"] == 7.0
+    assert by_site["https://broken.ru"]["status"] == "failed"
+    assert lines[-1]["failed"] == 1
+    assert sorted(row.status for row in rows) == ["completed", "failed"]
+    assert all(row.telegram_id == 42 for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_streamed_row_is_saved_when_client_leaves() -> None:
+    """Test a site already sent to the client is saved even if it disconnects."""
+    # Arrange
+    rows: list[CheckRequest] = []
+
+    async def fake_report(site_url: str, force_refresh: bool = False) -> dict[str, Any]:
+        if "slow" in site_url:
+            await asyncio.sleep(10)
+        return make_response()
+
+    async def on_row(row: CheckRequest) -> None:
+        await asyncio.sleep(0.01)
+        rows.append(row)
+
+    # Act
+    with patch("app.batch.get_report", side_effect=fake_report):
+        lines = run_batch(["https://fast.ru", "https://slow.ru"], 42, on_row=on_row)
+        first = await lines.__anext__()
+        await lines.aclose()
+        await asyncio.sleep(0.02)
+
+    # Assert
+    assert first["site_url"] == "https://fast.ru"
+    assert [row.site_url for row in rows] == ["https://fast.ru"]
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_site_over_rate_limit() -> None:
+    """Test a site over its quota gets a rate_limit_exceeded line."""
+
+    # Arrange
+    async def fake_report(site_url: str, force_refresh: bool = False) -> dict[str, Any]:
+        raise RateLimitError("host", 30, 120)
+
+    # Act
+    with patch("app.batch.get_report", side_effect=fake_report):
+        lines = [line async for line in run_batch(["https://busy.ru"], 42)]
+
+    # Assert
+    assert lines[0]["status"] == "failed"
+    assert lines[0]["error"]["code"] == "rate_limit_exceeded"
+    assert lines[0]["error"]["retry_after_sec"] == 120
+
+
+def test_batch_endpoint_accepts_more_sites_than_user_checks() -> None:
+    """Test a batch larger than the per-user check limit is not rejected."""
+    # Arrange
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.rate_limit import rate_limiter
+
+    async def fake_batch(site_urls: list[str], telegram_id: int, **kwargs: Any) -> Any:
+        for site_url in site_urls:
+            yield {"type": "result", "site_url": site_url, "status": "completed"}
+
+    sites = [f"https://site{i}.ru" for i in range(rate_limiter.user_limit + 1)]
+
+    # Act
+    with patch("app.routes.check.run_batch", side_effect=fake_batch):
+        response = TestClient(app).post(
+            "/api/check/batch", json={"site_urls": sites, "telegram_id": 77}
+        )
+
+    # Assert
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == len(sites)
@@ -0,0 +1,86 @@
+"""Unit tests for the offline batch runner."""
+
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from app.cli import completed_sites, main, read_site_urls
+
+
+def make_response() -> dict[str, Any]:
+    """Build minimal report response."""
+    return {
+        "score": 7.0,
+        "problems_critical": 0,
+        "problems_important": 1,
+        "checks_ok": 7,
+        "categories": [],
+        "top_priorities": [],
+        "detailed_checks": [],
+        "metadata": {"checks_completed": 10, "processing_time_sec": 1},
+    }
+
+
+def test_read_site_urls_skips_comments_and_invalid_urls() -> None:
+    """Test blank lines, comments and invalid URLs are skipped."""
+    lines = [
+        "# customers\n",
+        "https://a.ru\n",
+        "\n",
+        "a.ru\n",
+        "http://localhost\n",
+        "https://b.ru",
+    ]
+
+    assert read_site_urls(lines) == ["https://a.ru", "https://b.ru"]
+
+
+def test_completed_sites_ignores_failed_and_cut_off_lines(tmp_path: Path) -> None:
+    """Test only completed sites count as done."""
+    # Arrange
+    output = tmp_path / "reports.jsonl"
+    output.write_text(
+        '{"site_url": "https://A.ru/", "status": "completed"}\n'
+        '{"site_url": "https://b.ru", "status": "failed"}\n'
+        '{"site_url": "https://c.ru", "sta',
+        encoding="utf-8",
+    )
+
+    # Act
+    done = completed_sites(output)
+
+    # Assert
+    assert done == {"https://a.ru"}
+
+
+def test_main_resumes_from_existing_output(tmp_path: Path) -> None:
+    """Test sites completed by a previous run are not checked again."""
+    # Arrange
+    urls = tmp_path / "urls.txt"
+    urls.write_text("https://a.ru\nhttps://b.ru\nhttps://c.ru\n", encoding="utf-8")
+    output = tmp_path / "reports.jsonl"
+    output.write_text(
+        '{"site_url": "https://a.ru", "status": "completed"}\n'
+        '{"site_url": "https://b.ru", "status": "failed"}\n'
+        '{"site_url": "https://c.ru", "sta',
+        encoding="utf-8",
+    )
+    checked = []
+
+    async def fake_report(site_url: str, force_refresh: bool = False) -> dict[str, Any]:
+        checked.append(site_url)
+        return make_response()
+
+    # Act
+    with patch("app.batch.get_report", side_effect=fake_report):
+        exit_code = main([str(urls), "--output", str(output), "--workers", "2"])
+
+    # Assert
+    assert exit_code == 0
+    assert sorted(checked) == ["https://b.ru", "https://c.ru"]
+    lines = output.read_text(encoding="utf-8").splitlines()
+    new = [json.loads(line) for line in lines[3:]]
+    assert sorted(line["site_url"] for line in new) == ["https://b.ru", "https://c.ru"]
+    assert all(line["status"] == "completed" and line["report"]["score"] == 7.0 for line in new)
+    assert completed_sites(output) == {"https://a.ru", "https://b.ru", "https://c.ru"}
@@ -0,0 +1,171 @@
+"""Unit tests for shared page fetcher."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.deadline import Deadline
+from app.fetcher import PageFetcher
+
+
+class MockResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers: dict = {}
+        self.num_bytes_downloaded = len(self.content)
+
+
+@pytest.mark.asyncio
+async def test_fetcher_coalesces_concurrent_requests() -> None:
+    """Test concurrent GETs for the same URL hit the network once."""
+    # Arrange
+    mock_client = AsyncMock()
+
+    async def slow_get(url: str, **kwargs: object) -> MockResponse:
+        await asyncio.sleep(0.01)
+        return MockResponse(status_code=200, text=f"<html>{url}</html>")
+
+    mock_client.get.side_effect = slow_get
+    fetcher = PageFetcher(mock_client)
+
+    # Act
+    responses = await asyncio.gather(
+        *(fetcher.get("https://example.ru", timeout=10.0) for _ in range(6))
+    )
+
+    # Assert
+    assert mock_client.get.call_count == 1
+    assert all(r is responses[0] for r in responses)
+    assert fetcher.requests_made == 1
+    assert fetcher.requests_coalesced == 5
+
+
+@pytest.mark.asyncio
+async def test_fetcher_cancels_download_without_waiters() -> None:
+    """Test the shared download stops only when every caller was cancelled."""
+    # Arrange
+    mock_client = AsyncMock()
+    downloads_cancelled = 0
+
+    async def slow_get(url: str, **kwargs: object) -> MockResponse:
+        nonlocal downloads_cancelled
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            downloads_cancelled += 1
+            raise
+        return MockResponse(status_code=200)
+
+    mock_client.get.side_effect = slow_get
+    fetcher = PageFetcher(mock_client)
+    first = asyncio.ensure_future(fetcher.get("https://example.ru"))
+    second = asyncio.ensure_future(fetcher.get("https://example.ru"))
+    await asyncio.sleep(0)
+
+    # Act: one caller gives up, the other still gets the response
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+    response = await second
+    # Act: the only caller gives up
+    third = asyncio.ensure_future(fetcher.get("https://example.ru/page"))
+    await asyncio.sleep(0)
+    third.cancel()
+    await asyncio.gather(third, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    # Assert
+    assert response.status_code == 200
+    assert downloads_cancelled == 1
+    assert "https://example.ru/page" not in fetcher._requests
+
+
+@pytest.mark.asyncio
+async def test_fetcher_different_urls_fetched_separately() -> None:
+    """Test different URLs are not coalesced."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(status_code=200)
+    fetcher = PageFetcher(mock_client)
+
+    # Act
+    await fetcher.get("https://example.ru")
+    await fetcher.get("https://example.ru/robots.txt")
+    await fetcher.get("https://example.ru")
+
+    # Assert
+    assert mock_client.get.call_count == 2
+    assert fetcher.requests_coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_fetcher_merges_default_headers() -> None:
+    """Test caller headers override browser-like defaults."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(status_code=200)
+    fetcher = PageFetcher(mock_client)
+
+    # Act
+    await fetcher.get("https://example.ru/sitemap.xml", headers={"Accept": "application/xml"})
+
+    # Assert
+    headers = mock_client.get.call_args.kwargs["headers"]
+    assert headers["Accept"] == "application/xml"
+    assert "User-Agent" in headers
+
+
+@pytest.mark.asyncio
+async def test_fetcher_shares_errors() -> None:
+    """Test a failed fetch raises for every waiter."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = TimeoutError("timeout")
+    fetcher = PageFetcher(mock_client)
+
+    # Act
+    results = await asyncio.gather(
+        fetcher.get("https://example.ru"),
+        fetcher.get("https://example.ru"),
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert all(isinstance(r, TimeoutError) for r in results)
+    assert mock_client.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fetcher_cuts_timeout_to_deadline() -> None:
+    """Test request timeout is the smaller of its own and the time left."""
+    # Arrange
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(status_code=200)
+    fetcher = PageFetcher(mock_client, Deadline(2.0))
+
+    # Act
+    await fetcher.get("https://example.ru", timeout=10.0)
+    await fetcher.get("https://example.ru/robots.txt", timeout=1.0)
+
+    # Assert
+    timeouts = [call.kwargs["timeout"] for call in mock_client.get.call_args_list]
+    assert 1.9 < timeouts[0] <= 2.0
+    assert timeouts[1] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fetcher_fails_after_deadline() -> None:
+    """Test no request is started once the run deadline has passed."""
+    # Arrange
+    mock_client = AsyncMock()
+    fetcher = PageFetcher(mock_client, Deadline(0))
+
+    # Act & Assert
+    with pytest.raises(httpx.TimeoutException):
+        await fetcher.get("https://example.ru", timeout=10.0)
+    mock_client.get.assert_not_called()
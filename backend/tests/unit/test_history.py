@@ -0,0 +1,149 @@
+"""Unit tests for site report history."""
+
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.database import Base
+from app.history import decode_cursor, diff_checks, encode_cursor, get_history, site_key
+from app.models import CheckRequest, CheckResult
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid(type_: Any, compiler: Any, **kwargs: Any) -> str:
+    """Store PostgreSQL UUID columns as text in the SQLite test database."""
+    return "CHAR(32)"
+
+
+@pytest.fixture
+async def history_db() -> AsyncGenerator[AsyncSession, None]:
+    """In-memory database with the models' tables."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _add_run(db: AsyncSession, second: int, run_started_at: str, score: float) -> int:
+    """Store a completed check request whose report came from the given run."""
+    check_request = CheckRequest(
+        telegram_id=1,
+        site_url="https://example.ru",
+        status="completed",
+        created_at=datetime(2026, 10, 17, 12, 0, second),
+    )
+    db.add(check_request)
+    await db.flush()
+    db.add(
+        CheckResult(
+            check_request_id=check_request.id,
+            score=score,
+            report_data={"metadata": {"checked_at": run_started_at}},
+            detailed_checks=[],
+        )
+    )
+    await db.commit()
+    return int(check_request.id)
+
+
+def _check(check_id: str, status: str) -> dict:
+    """Build serialized check result."""
+    return {"id": check_id, "name": check_id, "status": status, "message": status}
+
+
+def test_site_key_accepts_host_and_url() -> None:
+    """Test host names and URL spellings map to the stored site URL."""
+    # Act & Assert
+    assert site_key("Example.ru") == "https://example.ru"
+    assert site_key("https://EXAMPLE.ru:443/") == "https://example.ru"
+    assert site_key("http://example.ru/catalog/") == "http://example.ru/catalog"
+    assert site_key("https:/example.ru") == "https://example.ru"
+
+
+def test_cursor_round_trip() -> None:
+    """Test cursor points back at the same row."""
+    # Arrange
+    created_at = datetime(2026, 10, 17, 12, 30, 5, 123456)
+
+    # Act
+    cursor = encode_cursor(created_at, 42)
+
+    # Assert
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["", "not a cursor", encode_cursor(datetime(2026, 1, 1), 1)[:-3]]
+)
+def test_decode_cursor_rejects_garbage(cursor: str) -> None:
+    """Test malformed cursors raise ValueError."""
+    # Act & Assert
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_diff_checks_classifies_changes() -> None:
+    """Test every check gets the direction of its status change."""
+    # Arrange
+    base = [
+        _check("robots", "problem"),
+        _check("sitemap", "ok"),
+        _check("title", "partial"),
+        _check("https", "error"),
+        _check("old", "ok"),
+    ]
+    target = [
+        _check("robots", "ok"),
+        _check("sitemap", "partial"),
+        _check("title", "partial"),
+        _check("https", "ok"),
+        _check("new", "problem"),
+    ]
+
+    # Act
+    diff = diff_checks(base, target)
+
+    # Assert
+    changes = {check["id"]: check["change"] for check in diff}
+    assert changes == {
+        "robots": "improved",
+        "sitemap": "worsened",
+        "title": "unchanged",
+        "https": "unknown",
+        "new": "added",
+        "old": "removed",
+    }
+    assert diff[-1] == {
+        "id": "old",
+        "name": "old",
+        "base_status": "ok",
+        "target_status": None,
+        "change": "removed",
+        "message": "ok",
+    }
+
+
+@pytest.mark.asyncio
+async def test_history_lists_each_run_once(history_db: AsyncSession) -> None:
+    """Test cache hits and joined requests don't repeat the run they got the report from."""
+    # Arrange: run A, a request joined to it, a cache hit of it, then run B
+    first = await _add_run(history_db, 1, "2026-10-17T12:00:01Z", 7.5)
+    await _add_run(history_db, 2, "2026-10-17T12:00:01Z", 7.5)
+    await _add_run(history_db, 30, "2026-10-17T12:00:01Z", 7.5)
+    latest = await _add_run(history_db, 45, "2026-10-17T12:00:45Z", 8.0)
+
+    # Act
+    page = await get_history(history_db, "https://example.ru", limit=1)
+    next_page = await get_history(history_db, "https://example.ru", cursor=page["next_cursor"])
+
+    # Assert
+    assert [item["check_request_id"] for item in page["items"]] == [latest]
+    assert [item["check_request_id"] for item in next_page["items"]] == [first]
+    assert next_page["next_cursor"] is None
@@ -0,0 +1,47 @@
+"""Unit tests for shared HTTP connection pool."""
+
+import pytest
+
+from app import http_client
+from app.http_client import ConnectionStats, close_http_client, init_http_client
+
+
+@pytest.mark.asyncio
+async def test_standalone_client_without_pool() -> None:
+    """Test a temporary client is used when the pool isn't initialized."""
+    async with http_client.http_client() as client:
+        assert not client.is_closed
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_runs_share_pooled_transport() -> None:
+    """Test clients of different runs share one transport and stay open."""
+    # Arrange
+    await init_http_client()
+
+    # Act
+    async with http_client.http_client() as first:
+        pass
+    async with http_client.http_client() as second:
+        pass
+
+    # Assert
+    assert first is not second  # separate cookie jars
+    assert first._transport is second._transport
+    assert not first.is_closed
+
+    await close_http_client()
+    assert http_client._transport is None
+
+
+def test_connection_stats_reuse_ratio() -> None:
+    """Test reuse ratio counts requests served over existing connections."""
+    stats = ConnectionStats(requests=10, connections_opened=2, tls_handshakes=2)
+
+    data = stats.as_dict()
+
+    assert data["connections_reused"] == 8
+    assert data["reuse_ratio"] == 0.8
+    assert ConnectionStats().as_dict()["reuse_ratio"] == 0.0
@@ -0,0 +1,249 @@
+"""Unit tests for background check job queue."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from unittest.mock import patch
+
+import pytest
+
+from app.checks.base import CheckResult
+from app.jobs import JobQueue
+from app.models import CheckRequest
+from app.report_cache import report_cache
+from app.runner import CheckRun, ResultCallback
+
+
+@pytest.fixture(autouse=True)
+def clear_report_cache() -> None:
+    """Start every test with an empty report cache."""
+    report_cache.clear()
+
+
+class FakeSession:
+    """Minimal async session holding CheckRequest rows in memory."""
+
+    def __init__(self, rows: dict[int, CheckRequest]) -> None:
+        self.rows = rows
+        self.added: list[Any] = []
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        return None
+
+    async def get(self, model: type, key: int) -> Optional[CheckRequest]:
+        return self.rows.get(key)
+
+    def add(self, obj: Any) -> None:
+        self.added.append(obj)
+
+    async def commit(self) -> None:
+        return None
+
+
+class FakeWriter:
+    """Result writer keeping submitted rows in memory."""
+
+    def __init__(self) -> None:
+        self.submitted: list[CheckRequest] = []
+
+    async def submit(self, check_request: CheckRequest) -> None:
+        self.submitted.append(check_request)
+
+
+def make_run(site_url: str, results: list[CheckResult]) -> CheckRun:
+    """Build a finished CheckRun."""
+    from app.report_builder import build_report
+
+    return CheckRun(
+        site_url=site_url,
+        started_at=datetime.utcnow(),
+        results=results,
+        report=build_report(results),
+        checks_total=len(results),
+    )
+
+
+@pytest.mark.asyncio
+async def test_job_runs_and_completes() -> None:
+    """Test job moves pending -> completed and saves result."""
+    # Arrange
+    rows = {1: CheckRequest(id=1, telegram_id=1, site_url="https://example.ru", status="pending")}
+    writer = FakeWriter()
+    queue = JobQueue(workers=1, session_factory=lambda: FakeSession(rows), writer=writer)  # type: ignore[arg-type]
+    check = CheckResult(id="tech-robots", name="Robots.txt", status="ok", message="✅")
+
+    async def fake_run(
+        site_url: str, on_result: ResultCallback, force_refresh: bool = False
+    ) -> CheckRun:
+        await on_result(check)
+        return make_run(site_url, [check])
+
+    # Act
+    with patch("app.runner.run_checks", side_effect=fake_run):
+        await queue.start()
+        queue.submit(1, "https://example.ru")
+        await asyncio.wait_for(queue._queue.join(), timeout=1)
+        await queue.stop()
+
+    # Assert
+    assert rows[1].status == "completed"
+    assert writer.submitted == [rows[1]]
+    assert rows[1].result.detailed_checks[0]["id"] == "tech-robots"
+    assert queue.partial_results(1) is None
+
+
+@pytest.mark.asyncio
+async def test_job_exposes_partial_results_while_running() -> None:
+    """Test results of finished checks are visible before the job completes."""
+    # Arrange
+    rows = {2: CheckRequest(id=2, telegram_id=1, site_url="https://example.ru", status="pending")}
+    queue = JobQueue(workers=1, session_factory=lambda: FakeSession(rows), writer=FakeWriter())  # type: ignore[arg-type]
+    check = CheckResult(id="tech-robots", name="Robots.txt", status="ok", message="✅")
+    release = asyncio.Event()
+
+    async def fake_run(
+        site_url: str, on_result: ResultCallback, force_refresh: bool = False
+    ) -> CheckRun:
+        await on_result(check)
+        await release.wait()
+        return make_run(site_url, [check])
+
+    # Act
+    with patch("app.runner.run_checks", side_effect=fake_run):
+        queue.submit(2, "https://example.ru")
+        for _ in range(10):
+            await asyncio.sleep(0)
+        partial = queue.partial_results(2)
+        status_while_running = rows[2].status
+        release.set()
+        await asyncio.wait_for(queue._queue.join(), timeout=1)
+        await queue.stop()
+
+    # Assert
+    assert status_while_running == "running"
+    assert partial == [check]
+    assert rows[2].status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_job_marked_failed_on_error() -> None:
+    """Test job is marked failed when the run raises."""
+    # Arrange
+    rows = {3: CheckRequest(id=3, telegram_id=1, site_url="https://example.ru", status="pending")}
+    queue = JobQueue(workers=1, session_factory=lambda: FakeSession(rows), writer=FakeWriter())  # type: ignore[arg-type]
+
+    # Act
+    with patch("app.runner.run_checks", side_effect=RuntimeError("boom")):
+        queue.submit(3, "https://example.ru")
+        await asyncio.wait_for(queue._queue.join(), timeout=1)
+        await queue.stop()
+
+    # Assert
+    assert rows[3].status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_submit_raises_when_queue_full() -> None:
+    """Test submit raises QueueFull when no capacity is left."""
+    # Arrange
+    queue = JobQueue(workers=0, maxsize=1)
+    queue._tasks = [asyncio.create_task(asyncio.sleep(0))]  # pretend workers are running
+    queue.submit(1, "https://example.ru")
+
+    # Act & Assert
+    with pytest.raises(asyncio.QueueFull):
+        queue.submit(2, "https://example.ru")
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_receives_progress_events() -> None:
+    """Test subscribers get each check, then the report, then end of stream."""
+    # Arrange
+    rows = {4: CheckRequest(id=4, telegram_id=1, site_url="https://example.ru", status="pending")}
+    queue = JobQueue(workers=1, session_factory=lambda: FakeSession(rows), writer=FakeWriter())  # type: ignore[arg-type]
+    checks = [
+        CheckResult(id="tech-robots", name="Robots.txt", status="ok", message="✅"),
+        CheckResult(id="tech-sitemap", name="Sitemap.xml", status="ok", message="✅"),
+    ]
+
+    async def fake_run(
+        site_url: str, on_result: ResultCallback, force_refresh: bool = False
+    ) -> CheckRun:
+        for check in checks:
+            await on_result(check)
+        return make_run(site_url, checks)
+
+    # Act
+    with patch("app.runner.run_checks", side_effect=fake_run):
+        listener = queue.subscribe(4)
+        queue.submit(4, "https://example.ru")
+        events = []
+        while (event := await asyncio.wait_for(listener.get(), timeout=1)) is not None:
+            events.append(event)
+        await queue.stop()
+
+    # Assert
+    assert [name for name, _ in events] == ["check", "check", "report"]
+    assert events[0][1]["id"] == "tech-robots"
+    assert events[2][1]["score"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_unfinished_jobs() -> None:
+    """Test jobs running or queued at shutdown don't stay unfinished."""
+    # Arrange
+    rows = {
+        job_id: CheckRequest(
+            id=job_id, telegram_id=1, site_url="https://example.ru", status="pending"
+        )
+        for job_id in (5, 6)
+    }
+    queue = JobQueue(workers=1, session_factory=lambda: FakeSession(rows), writer=FakeWriter())  # type: ignore[arg-type]
+
+    async def hanging_report(
+        site_url: str, force_refresh: bool, on_result: ResultCallback
+    ) -> dict[str, Any]:
+        await asyncio.sleep(10)
+        raise AssertionError("not reached")
+
+    # Act
+    with patch("app.jobs.get_report", side_effect=hanging_report):
+        running_listener = queue.subscribe(5)
+        queued_listener = queue.subscribe(6)
+        queue.submit(5, "https://example.ru")
+        queue.submit(6, "https://other.ru")
+        for _ in range(10):
+            await asyncio.sleep(0)
+        status_before = rows[5].status
+        await queue.stop()
+
+    # Assert
+    assert status_before == "running"
+    assert rows[5].status == "failed"
+    assert rows[6].status == "failed"
+    for listener in (running_listener, queued_listener):
+        event = listener.get_nowait()
+        assert event is not None and event[1]["error"]["code"] == "job_cancelled"
+        assert listener.get_nowait() is None
+        assert listener.empty()
+
+
+def test_lost_job_expires() -> None:
+    """Test an old unfinished job not running here is reported as lost."""
+    # Arrange
+    queue = JobQueue(expire_after=600)
+    old = datetime.utcnow() - timedelta(seconds=601)
+    lost = CheckRequest(id=7, site_url="https://example.ru", status="pending", created_at=old)
+    done = CheckRequest(id=8, site_url="https://example.ru", status="completed", created_at=old)
+    fresh = CheckRequest(
+        id=9, site_url="https://example.ru", status="running", created_at=datetime.utcnow()
+    )
+
+    # Assert
+    assert queue.expired(lost)
+    assert not queue.expired(done)
+    assert not queue.expired(fresh)
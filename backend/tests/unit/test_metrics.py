@@ -0,0 +1,98 @@
+"""Unit tests for process metrics."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.checks.base import CheckResult
+from app.checks.document import get_page
+from app.checks.registry import CheckContext, CheckOutput, CheckSpec, run_scheduled
+from app.fetcher import PageFetcher
+from app.metrics import CheckTimings, LoopLagMonitor, MetricsRegistry, loop_lag
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    """Test histogram samples follow the Prometheus text format."""
+    # Arrange
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("check_seconds", "Check time", ["check"], buckets=(0.1, 1.0))
+
+    # Act
+    histogram.observe(0.05, "tech-robots")
+    histogram.observe(0.5, "tech-robots")
+    histogram.observe(3.0, "tech-robots")
+    text = metrics.render()
+
+    # Assert
+    assert "# TYPE check_seconds histogram" in text
+    assert 'check_seconds_bucket{check="tech-robots",le="0.1"} 1' in text
+    assert 'check_seconds_bucket{check="tech-robots",le="1"} 2' in text
+    assert 'check_seconds_bucket{check="tech-robots",le="+Inf"} 3' in text
+    assert 'check_seconds_sum{check="tech-robots"} 3.55' in text
+    assert 'check_seconds_count{check="tech-robots"} 3' in text
+
+
+def test_counter_escapes_label_values() -> None:
+    """Test quotes and backslashes in label values are escaped."""
+    # Arrange
+    metrics = MetricsRegistry()
+    counter = metrics.counter("results_total", "Results", ["status"])
+
+    # Act
+    counter.inc('bad "value"\\')
+    counter.inc('bad "value"\\', amount=2)
+
+    # Assert
+    assert 'results_total{status="bad \\"value\\"\\\\"} 3' in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_collects_fetch_and_parse_timings() -> None:
+    """Test each check gets the time it waited for the shared fetch and parse."""
+    # Arrange
+    page = b"<html><head><title>Example</title></head></html>"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, stream=httpx.ByteStream(page))
+
+    async def html_check(ctx: CheckContext) -> CheckOutput:
+        response = await ctx.client.get(ctx.site_url)
+        parsed = await get_page(response)
+        return CheckResult(id="a", name="a", status="ok", message=parsed.title), {}
+
+    specs = [CheckSpec("a", "technical", html_check), CheckSpec("b", "content", html_check)]
+    timings: dict[str, CheckTimings] = {}
+
+    # Act
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await run_scheduled(specs, "https://example.ru", PageFetcher(client), timings=timings)
+
+    # Assert
+    assert set(timings) == {"a", "b"}
+    for check_timings in timings.values():
+        assert check_timings.fetch_sec >= 0.015
+        assert check_timings.total_sec >= check_timings.fetch_sec + check_timings.parse_sec
+    # The page was downloaded once, by the check that asked first
+    assert timings["a"].bytes_downloaded + timings["b"].bytes_downloaded == len(page)
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocked_loop() -> None:
+    """Test blocking the event loop shows up as lag."""
+    # Arrange
+    monitor = LoopLagMonitor(interval=0.01)
+    observed = loop_lag.count()
+    await monitor.start()
+    await asyncio.sleep(0.02)
+
+    # Act
+    time.sleep(0.1)  # Blocks the loop
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    # Assert
+    assert loop_lag.count() > observed
+    assert monitor._max >= 0.05
@@ -0,0 +1,152 @@
+"""Unit tests for write-behind persistence."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.models import CheckRequest
+from app.persistence import ResultWriter
+
+
+class FakeSession:
+    """Async session recording committed batches."""
+
+    def __init__(self, batches: list[list[Any]], fail: int = 0) -> None:
+        self.batches = batches
+        self.fail = fail
+        self._pending: list[Any] = []
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        return None
+
+    def add_all(self, rows: list[Any]) -> None:
+        self._pending = list(rows)
+
+    async def commit(self) -> None:
+        self.batches.append(self._pending)
+
+
+def make_request(n: int) -> CheckRequest:
+    """Build a finished CheckRequest row."""
+    return CheckRequest(telegram_id=n, site_url=f"https://example{n}.ru", status="completed")
+
+
+@pytest.mark.asyncio
+async def test_rows_are_saved_in_batches() -> None:
+    """Test queued rows are saved together, at most batch_size per transaction."""
+    # Arrange
+    batches: list[list[Any]] = []
+    writer = ResultWriter(batch_size=3, session_factory=lambda: FakeSession(batches))
+    await writer.start()
+
+    # Act
+    for n in range(7):
+        await writer.submit(make_request(n))
+    await writer.stop()
+
+    # Assert
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert writer.rows_saved == 7
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_queued_rows() -> None:
+    """Test rows still queued on shutdown are saved."""
+    # Arrange
+    batches: list[list[Any]] = []
+    writer = ResultWriter(session_factory=lambda: FakeSession(batches))
+
+    # Act
+    await writer.submit(make_request(1))
+    await writer.submit(make_request(2))
+    await writer.stop()
+
+    # Assert
+    assert sum(len(batch) for batch in batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_when_queue_is_full() -> None:
+    """Test a full queue applies back-pressure instead of dropping rows."""
+    # Arrange
+    batches: list[list[Any]] = []
+    release = asyncio.Event()
+
+    class SlowSession(FakeSession):
+        async def commit(self) -> None:
+            await release.wait()
+            await super().commit()
+
+    writer = ResultWriter(batch_size=1, maxsize=1, session_factory=lambda: SlowSession(batches))
+    await writer.submit(make_request(1))  # being saved
+    await asyncio.sleep(0)
+    await writer.submit(make_request(2))  # fills the queue
+
+    # Act
+    blocked = asyncio.ensure_future(writer.submit(make_request(3)))
+    await asyncio.sleep(0.01)
+    was_blocked = not blocked.done()
+    release.set()
+    await blocked
+    await writer.stop()
+
+    # Assert
+    assert was_blocked
+    assert writer.rows_saved == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried() -> None:
+    """Test a batch is retried after a database error."""
+    # Arrange
+    batches: list[list[Any]] = []
+    attempts = 0
+
+    def session_factory() -> FakeSession:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("database is down")
+        return FakeSession(batches)
+
+    writer = ResultWriter(retries=2, session_factory=session_factory)
+
+    # Act
+    await writer.submit(make_request(1))
+    await writer.stop()
+
+    # Assert
+    assert attempts == 2
+    assert writer.rows_saved == 1
+    assert writer.rows_failed == 0
+
+
+@pytest.mark.asyncio
+async def test_bad_row_does_not_drop_batch() -> None:
+    """Test a batch that keeps failing is saved row by row without the bad row."""
+    # Arrange
+    batches: list[list[Any]] = []
+
+    class PickySession(FakeSession):
+        async def commit(self) -> None:
+            if any(row.telegram_id == 2 for row in self._pending):
+                raise ValueError("value too long")
+            await super().commit()
+
+    writer = ResultWriter(retries=1, session_factory=lambda: PickySession(batches))
+
+    # Act
+    for n in range(1, 4):
+        await writer.submit(make_request(n))
+    await writer.stop()
+
+    # Assert
+    saved = [row.telegram_id for batch in batches for row in batch]
+    assert saved == [1, 3]
+    assert writer.rows_saved == 2
+    assert writer.rows_failed == 1
@@ -0,0 +1,208 @@
+"""Unit tests for per-host request scheduling."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.politeness import HostScheduler, PoliteTransport, host_scheduler, parse_retry_after
+from app.robots import RobotsCache
+
+
+class MockResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+
+
+def make_client(
+    transport: httpx.AsyncBaseTransport, scheduler: HostScheduler, **kwargs: float
+) -> httpx.AsyncClient:
+    """Build client sending requests through the scheduler."""
+    return httpx.AsyncClient(transport=PoliteTransport(transport, scheduler, **kwargs))
+
+
+def test_parse_retry_after() -> None:
+    """Test Retry-After in seconds and as an HTTP date."""
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500.0) == 10.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412500.0) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limited_per_host() -> None:
+    """Test requests to one host wait for a slot, other hosts don't."""
+    # Arrange
+    scheduler = HostScheduler(max_concurrency=2, requests_per_sec=0)
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    # Act
+    async with make_client(httpx.MockTransport(handler), scheduler) as client:
+        responses = await asyncio.gather(
+            *(client.get(f"https://a.ru/{i}") for i in range(6)),
+            *(client.get(f"https://b.ru/{i}") for i in range(2)),
+        )
+
+    # Assert
+    assert all(response.status_code == 200 for response in responses)
+    assert peak == {"a.ru": 2, "b.ru": 2}
+    assert scheduler.in_flight("a.ru") == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_per_host() -> None:
+    """Test requests beyond the burst are spread out at the host rate."""
+    # Arrange
+    scheduler = HostScheduler(max_concurrency=10, requests_per_sec=50, burst=2)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+    # Act
+    start = time.perf_counter()
+    async with make_client(transport, scheduler) as client:
+        await asyncio.gather(*(client.get(f"https://a.ru/{i}") for i in range(6)))
+    elapsed = time.perf_counter() - start
+
+    # Assert: 2 at once, then 4 more at 20 ms intervals
+    assert elapsed >= 0.075
+
+
+def test_crawl_delay_lowers_rate() -> None:
+    """Test Crawl-delay caps the rate and burst, within the configured max."""
+    # Arrange
+    scheduler = HostScheduler(requests_per_sec=10, burst=5, max_crawl_delay=1.0)
+
+    # Act
+    scheduler.set_crawl_delay("slow.ru", 0.5)
+    scheduler.set_crawl_delay("slower.ru", 30)
+
+    # Assert
+    assert scheduler._limits("slow.ru") == (2.0, 1.0)
+    assert scheduler._limits("slower.ru") == (1.0, 1.0)
+    assert scheduler._limits("fast.ru") == (10, 5.0)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_respected() -> None:
+    """Test a throttled GET is retried after Retry-After and the host is held."""
+    # Arrange
+    scheduler = HostScheduler(requests_per_sec=0)
+    calls: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, text="ok")
+
+    # Act
+    async with make_client(httpx.MockTransport(handler), scheduler) as client:
+        response = await client.get("https://a.ru/")
+
+    # Assert
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert scheduler.in_flight("a.ru") == 0
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_is_not_waited_for() -> None:
+    """Test a Retry-After beyond the limit returns the answer but holds the host."""
+    # Arrange
+    scheduler = HostScheduler(requests_per_sec=0)
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(503, headers={"Retry-After": "120"})
+    )
+
+    # Act
+    async with make_client(transport, scheduler, max_retry_after=5.0) as client:
+        response = await client.get("https://a.ru/")
+
+    # Assert
+    assert response.status_code == 503
+    assert scheduler._hosts["a.ru"].blocked_until > time.monotonic() + 4
+
+
+@pytest.mark.asyncio
+async def test_wait_for_host_respects_request_timeout() -> None:
+    """Test a request fails fast instead of waiting for its host past its timeout."""
+    # Arrange
+    scheduler = HostScheduler(requests_per_sec=10, burst=1, max_crawl_delay=10.0)
+    scheduler.set_crawl_delay("slow.ru", 5.0)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+    # Act
+    start = time.perf_counter()
+    async with make_client(transport, scheduler) as client:
+        first = await client.get("https://slow.ru/", timeout=0.1)
+        with pytest.raises(httpx.PoolTimeout):
+            await client.get("https://slow.ru/page", timeout=0.1)
+        scheduler.block("busy.ru", 5.0)
+        with pytest.raises(httpx.PoolTimeout):
+            await client.get("https://busy.ru/", timeout=0.1)
+    elapsed = time.perf_counter() - start
+
+    # Assert
+    assert first.status_code == 200
+    assert elapsed < 0.1
+    assert scheduler.in_flight("slow.ru") == 0
+    assert scheduler._hosts["slow.ru"].users == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_busy_slot_respects_timeout() -> None:
+    """Test waiting for a concurrency slot is limited by the timeout too."""
+    # Arrange
+    scheduler = HostScheduler(max_concurrency=1, requests_per_sec=0)
+    await scheduler.acquire("a.ru")
+
+    # Act & Assert
+    with pytest.raises(httpx.PoolTimeout):
+        await scheduler.acquire("a.ru", timeout=0.01)
+    scheduler.release("a.ru")
+    assert await scheduler.acquire("a.ru", timeout=0.01) >= 0
+    assert scheduler._hosts["a.ru"].users == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_held_until_stream_closed() -> None:
+    """Test a streamed response keeps its slot until the body is closed."""
+    # Arrange
+    scheduler = HostScheduler(max_concurrency=1, requests_per_sec=0)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 100))
+
+    # Act / Assert
+    async with make_client(transport, scheduler) as client:
+        async with client.stream("GET", "https://a.ru/sitemap.xml") as response:
+            assert scheduler.in_flight("a.ru") == 1
+            await response.aread()
+        assert scheduler.in_flight("a.ru") == 0
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_passes_crawl_delay() -> None:
+    """Test Crawl-delay from a downloaded robots.txt reaches the scheduler."""
+    # Arrange
+    cache = RobotsCache(ttl=60)
+    mock_client = AsyncMock()
+    mock_client.get.return_value = MockResponse(200, "User-agent: *\nCrawl-delay: 0.2")
+
+    # Act
+    await cache.get("https://slow.ru/robots.txt", mock_client)
+
+    # Assert
+    assert host_scheduler._crawl_delays["slow.ru"] == 0.2
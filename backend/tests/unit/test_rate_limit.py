@@ -0,0 +1,118 @@
+"""Unit tests for rate limiting."""
+
+import pytest
+
+from app.rate_limit import InMemoryBackend, RateLimiter, RateLimitError
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_user_limit_blocks_extra_requests() -> None:
+    """Test user gets N checks per window, then a retry time."""
+    # Arrange
+    clock = FakeClock()
+    limiter = RateLimiter(InMemoryBackend(clock), user_limit=5, host_limit=0, window=3600)
+    for _ in range(5):
+        await limiter.check_user(1)
+
+    # Act & Assert
+    with pytest.raises(RateLimitError) as exc_info:
+        await limiter.check_user(1)
+    assert exc_info.value.scope == "user"
+    assert exc_info.value.retry_after == 3600
+
+    await limiter.check_user(2)  # other users are not affected
+
+
+@pytest.mark.asyncio
+async def test_window_slides() -> None:
+    """Test a request is allowed again once the oldest one leaves the window."""
+    # Arrange
+    clock = FakeClock()
+    limiter = RateLimiter(InMemoryBackend(clock), user_limit=2, host_limit=0, window=60)
+    await limiter.check_user(1)
+    clock.now += 30
+    await limiter.check_user(1)
+
+    # Act & Assert
+    with pytest.raises(RateLimitError) as exc_info:
+        await limiter.check_user(1)
+    assert exc_info.value.retry_after == 30
+
+    clock.now += 30
+    await limiter.check_user(1)
+
+
+@pytest.mark.asyncio
+async def test_host_limit_and_user_refund() -> None:
+    """Test per-site limit is shared by URLs of a host and a refund frees user quota."""
+    # Arrange
+    clock = FakeClock()
+    limiter = RateLimiter(InMemoryBackend(clock), user_limit=2, host_limit=1, window=60)
+    await limiter.check_host("https://example.ru/")
+    first = await limiter.check_user(2)
+    second = await limiter.check_user(2)
+
+    # Act
+    with pytest.raises(RateLimitError) as exc_info:
+        await limiter.check_host("https://EXAMPLE.ru/catalog")
+    await limiter.refund_user(2, second)
+
+    # Assert
+    assert exc_info.value.scope == "host"
+    assert first != second
+    await limiter.check_host("https://other.ru")
+    await limiter.check_user(2)
+    with pytest.raises(RateLimitError):
+        await limiter.check_user(2)
+
+
+@pytest.mark.asyncio
+async def test_batch_sites_have_own_quota() -> None:
+    """Test a batch is one user check and its sites use the batch quota, all or nothing."""
+    # Arrange
+    clock = FakeClock()
+    limiter = RateLimiter(
+        InMemoryBackend(clock), user_limit=2, host_limit=0, window=60, batch_limit=10
+    )
+    await limiter.check_batch(1, 6)
+
+    # Act
+    with pytest.raises(RateLimitError) as exc_info:
+        await limiter.check_batch(1, 5)
+    await limiter.check_batch(1, 4)
+
+    # Assert
+    assert exc_info.value.scope == "batch"
+    with pytest.raises(RateLimitError) as user_exc:
+        await limiter.check_user(1)  # two batches used both user checks
+    assert user_exc.value.scope == "user"
+    with pytest.raises(RateLimitError):
+        await limiter.check_batch(2, 11)  # can never fit
+
+
+@pytest.mark.asyncio
+async def test_idle_keys_are_swept() -> None:
+    """Test keys without recent requests don't accumulate."""
+    # Arrange
+    clock = FakeClock()
+    backend = InMemoryBackend(clock)
+    backend.SWEEP_EVERY = 10
+    for user_id in range(9):
+        await backend.acquire(f"user:{user_id}", 5, 60, "hit")
+    clock.now += 120
+
+    # Act
+    await backend.acquire("user:100", 5, 60, "hit")
+
+    # Assert
+    assert list(backend._hits) == ["user:100"]
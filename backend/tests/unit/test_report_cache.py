@@ -0,0 +1,209 @@
+"""Unit tests for report cache, cached report lookup and shared runs."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.checks.base import CheckResult
+from app.rate_limit import InMemoryBackend, RateLimiter, RateLimitError
+from app.report_builder import build_report
+from app.report_cache import ReportCache, report_cache
+from app.runner import CheckRun, ResultCallback, get_report
+from app.utils.urls import normalize_site_url
+
+
+def make_run(site_url: str) -> CheckRun:
+    """Build a finished CheckRun with one ok check."""
+    results = [CheckResult(id="tech-robots", name="Robots.txt", status="ok", message="✅")]
+    return CheckRun(
+        site_url=site_url,
+        started_at=datetime.utcnow(),
+        results=results,
+        report=build_report(results),
+        checks_total=1,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_report_cache() -> None:
+    """Start every test with an empty report cache."""
+    report_cache.clear()
+
+
+def test_normalize_site_url() -> None:
+    """Test equivalent URLs share one cache key."""
+    assert normalize_site_url("HTTPS://Example.RU/") == "https://example.ru"
+    assert normalize_site_url("https://example.ru:443") == "https://example.ru"
+    assert normalize_site_url("http://example.ru:8080/a/#top") == "http://example.ru:8080/a"
+    assert normalize_site_url("https://example.ru/?p=1") == "https://example.ru?p=1"
+
+
+def test_cache_expires_after_ttl() -> None:
+    """Test entries are dropped after TTL."""
+    # Arrange
+    cache = ReportCache(ttl=60, max_size=10)
+
+    # Act & Assert
+    with patch("app.report_cache.time.monotonic", return_value=1000.0):
+        cache.set("https://example.ru", {"score": 5.0})
+    with patch("app.report_cache.time.monotonic", return_value=1059.0):
+        assert cache.get("https://example.ru") == {"score": 5.0}
+    with patch("app.report_cache.time.monotonic", return_value=1061.0):
+        assert cache.get("https://example.ru") is None
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Test oldest unused entry is evicted when full."""
+    # Arrange
+    cache = ReportCache(ttl=60, max_size=2)
+    cache.set("a", {"score": 1.0})
+    cache.set("b", {"score": 2.0})
+
+    # Act
+    cache.get("a")
+    cache.set("c", {"score": 3.0})
+
+    # Assert
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_cache_returns_copies() -> None:
+    """Test callers can't modify the cached report."""
+    # Arrange
+    cache = ReportCache(ttl=60, max_size=10)
+    cache.set("a", {"metadata": {"from_cache": False}})
+
+    # Act
+    cache.get("a")["metadata"]["from_cache"] = True  # type: ignore[index]
+
+    # Assert
+    assert cache.get("a") == {"metadata": {"from_cache": False}}
+
+
+@pytest.mark.asyncio
+async def test_get_report_served_from_cache() -> None:
+    """Test second request for the same site doesn't run checks."""
+    # Act
+    with patch("app.runner.run_checks") as run:
+        run.return_value = make_run("https://example.ru")
+        first = await get_report("https://example.ru")
+        second = await get_report("https://EXAMPLE.ru/")
+
+    # Assert
+    assert run.call_count == 1
+    assert first["metadata"]["from_cache"] is False
+    assert second["metadata"]["from_cache"] is True
+    assert second["score"] == first["score"]
+
+
+@pytest.mark.asyncio
+async def test_get_report_force_refresh() -> None:
+    """Test force_refresh bypasses the cache."""
+    # Act
+    with patch("app.runner.run_checks") as run:
+        run.return_value = make_run("https://example.ru")
+        await get_report("https://example.ru")
+        refreshed = await get_report("https://example.ru", force_refresh=True)
+
+    # Assert
+    assert run.call_count == 2
+    assert refreshed["metadata"]["from_cache"] is False
+    # Checks don't reuse data cached by earlier runs either (robots.txt)
+    assert run.call_args.kwargs["force_refresh"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_run() -> None:
+    """Test concurrent requests for the same site attach to one run."""
+    # Arrange
+    release = asyncio.Event()
+    check = CheckResult(id="tech-robots", name="Robots.txt", status="ok", message="✅")
+    received: list[list[str]] = [[], [], []]
+
+    async def slow_run(
+        site_url: str, on_result: ResultCallback, force_refresh: bool = False
+    ) -> CheckRun:
+        await on_result(check)
+        await release.wait()
+        return make_run(site_url)
+
+    def collector(i: int) -> ResultCallback:
+        async def on_result(result: CheckResult) -> None:
+            received[i].append(result.id)
+
+        return on_result
+
+    # Act
+    with patch("app.runner.run_checks", side_effect=slow_run) as run:
+        tasks = [
+            asyncio.create_task(get_report("https://example.ru", on_result=collector(i)))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        responses = await asyncio.gather(*tasks)
+
+    # Assert
+    assert run.call_count == 1
+    assert all(r == responses[0] for r in responses)
+    assert received == [["tech-robots"]] * 3
+
+
+@pytest.mark.asyncio
+async def test_shared_run_survives_cancelled_caller() -> None:
+    """Test cancelling the first caller doesn't cancel the run for others."""
+    # Arrange
+    release = asyncio.Event()
+
+    async def slow_run(
+        site_url: str, on_result: ResultCallback, force_refresh: bool = False
+    ) -> CheckRun:
+        await release.wait()
+        return make_run(site_url)
+
+    # Act
+    with patch("app.runner.run_checks", side_effect=slow_run):
+        first = asyncio.create_task(get_report("https://example.ru"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(get_report("https://example.ru"))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        response = await second
+
+    # Assert
+    assert response["score"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_only_new_runs_use_host_quota() -> None:
+    """Test cached and joined requests don't count against the site's rate limit."""
+    # Arrange
+    limiter = RateLimiter(InMemoryBackend(), user_limit=0, host_limit=1, window=3600)
+    release = asyncio.Event()
+
+    async def slow_run(
+        site_url: str, on_result: ResultCallback, force_refresh: bool = False
+    ) -> CheckRun:
+        await release.wait()
+        return make_run(site_url)
+
+    # Act
+    with patch("app.runner.rate_limiter", limiter), patch(
+        "app.runner.run_checks", side_effect=slow_run
+    ):
+        tasks = [asyncio.create_task(get_report("https://example.ru")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*tasks)
+        cached = await get_report("https://example.ru")
+        with pytest.raises(RateLimitError) as exc_info:
+            await get_report("https://example.ru", force_refresh=True)
+
+    # Assert
+    assert cached["metadata"]["from_cache"] is True
+    assert exc_info.value.scope == "host"
@@ -0,0 +1,215 @@
+"""Unit tests for robots.txt parsing, rule matching and the robots cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.robots import RobotsCache, parse_robots_txt
+
+ROBOTS = """
+# Comment
+User-agent: Yandex
+User-agent: SEOChecker
+Disallow: /private
+Allow: /private/open
+Crawl-delay: 2
+
+User-agent: *
+Disallow: /admin
+Disallow: /*?sort=
+Disallow: /*.pdf$
+
+Sitemap: https://example.ru/sitemap-main.xml
+Sitemap: https://example.ru/sitemap-news.xml
+"""
+
+
+class MockResponse:
+    """Mock HTTP response."""
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+
+
+def test_parse_groups_and_sitemaps() -> None:
+    """Test agents of one group share rules, sitemaps are global."""
+    # Act
+    rules = parse_robots_txt(ROBOTS)
+
+    # Assert
+    assert rules.user_agents == ["yandex", "seochecker", "*"]
+    assert rules.sitemaps == (
+        "https://example.ru/sitemap-main.xml",
+        "https://example.ru/sitemap-news.xml",
+    )
+    assert rules.agent("Yandex").crawl_delay == 2.0
+    assert rules.agent("Googlebot").crawl_delay is None
+
+
+def test_can_fetch_uses_agent_group() -> None:
+    """Test an agent's own group replaces the ``*`` group."""
+    # Arrange
+    rules = parse_robots_txt(ROBOTS)
+
+    # Assert
+    assert not rules.can_fetch("https://example.ru/private/page", "Yandex")
+    assert rules.can_fetch("https://example.ru/admin", "Yandex")
+    assert not rules.can_fetch("https://example.ru/admin/users", "Googlebot")
+    assert rules.can_fetch("https://example.ru/", "Googlebot")
+
+
+def test_longest_match_wins() -> None:
+    """Test the most specific rule wins and Allow wins a tie."""
+    # Arrange
+    rules = parse_robots_txt(ROBOTS)
+    tie = parse_robots_txt("User-agent: *\nDisallow: /page\nAllow: /page")
+
+    # Assert
+    assert rules.can_fetch("https://example.ru/private/open/doc")
+    assert not rules.can_fetch("https://example.ru/private/closed")
+    assert tie.can_fetch("https://example.ru/page")
+
+
+def test_wildcards_and_end_anchor() -> None:
+    """Test ``*`` matches any characters and ``$`` anchors the end."""
+    # Arrange
+    rules = parse_robots_txt(ROBOTS)
+
+    # Assert
+    assert not rules.can_fetch("https://example.ru/catalog?sort=price", "Bingbot")
+    assert rules.can_fetch("https://example.ru/catalog?page=2", "Bingbot")
+    assert not rules.can_fetch("https://example.ru/files/price.pdf", "Bingbot")
+    assert rules.can_fetch("https://example.ru/files/price.pdf?v=1", "Bingbot")
+
+
+def test_empty_and_missing_rules_allow_everything() -> None:
+    """Test empty Disallow, no groups and robots.txt itself are allowed."""
+    # Arrange
+    empty_disallow = parse_robots_txt("User-agent: *\nDisallow:")
+    no_groups = parse_robots_txt("Disallow: /")
+    disallow_all = parse_robots_txt("User-agent: *\nDisallow: /")
+
+    # Assert
+    assert empty_disallow.can_fetch("https://example.ru/any")
+    assert no_groups.user_agents == []
+    assert no_groups.can_fetch("https://example.ru/any")
+    assert not disallow_all.can_fetch("https://example.ru/")
+    assert disallow_all.can_fetch("https://example.ru/robots.txt")
+
+
+@pytest.mark.asyncio
+async def test_cache_shares_concurrent_download() -> None:
+    """Test concurrent lookups of one file share one download."""
+    # Arrange
+    cache = RobotsCache(ttl=60)
+    mock_client = AsyncMock()
+
+    async def slow_get(url: str, **kwargs: object) -> MockResponse:
+        await asyncio.sleep(0.01)
+        return MockResponse(200, "User-agent: *\nDisallow: /admin")
+
+    mock_client.get.side_effect = slow_get
+
+    # Act
+    files = await asyncio.gather(
+        *(cache.get("https://example.ru/robots.txt", mock_client) for _ in range(5))
+    )
+
+    # Assert
+    assert mock_client.get.call_count == 1
+    assert all(robots is files[0] for robots in files)
+    assert not files[0].rules.can_fetch("https://example.ru/admin")
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_and_skips_server_errors() -> None:
+    """Test entries expire after TTL and 5xx answers are not cached."""
+    # Arrange
+    cache = RobotsCache(ttl=60)
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = [
+        MockResponse(503),
+        MockResponse(200, "User-agent: *"),
+        MockResponse(404),
+    ]
+    url = "https://example.ru/robots.txt"
+
+    # Act
+    with patch("app.robots.time.monotonic", return_value=1000.0):
+        failed = await cache.get(url, mock_client)
+        found = await cache.get(url, mock_client)
+        cached = await cache.get(url, mock_client)
+    with patch("app.robots.time.monotonic", return_value=1061.0):
+        expired = await cache.get(url, mock_client)
+
+    # Assert
+    assert failed.status_code == 503
+    assert found.found and cached is found
+    assert expired.status_code == 404
+    assert mock_client.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_refresh_downloads_again() -> None:
+    """Test refresh (force_refresh runs) ignores and replaces the cached file."""
+    # Arrange
+    cache = RobotsCache(ttl=3600)
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = [
+        MockResponse(200, "User-agent: *\nDisallow: /"),
+        MockResponse(200, "User-agent: *\nDisallow:"),
+    ]
+    url = "https://example.ru/robots.txt"
+
+    # Act
+    old = await cache.get(url, mock_client)
+    fresh = await cache.get(url, mock_client, refresh=True)
+    cached = await cache.get(url, mock_client)
+
+    # Assert
+    assert not old.rules.can_fetch("https://example.ru/page")
+    assert fresh.rules.can_fetch("https://example.ru/page")
+    assert cached is fresh
+
+
+@pytest.mark.asyncio
+async def test_waiter_uses_own_client_and_timeout() -> None:
+    """Test a joined caller isn't bound to the first caller's download."""
+    # Arrange
+    cache = RobotsCache(ttl=60)
+    url = "https://example.ru/robots.txt"
+
+    async def failing_get(url: str, **kwargs: object) -> MockResponse:
+        await asyncio.sleep(0.01)
+        raise httpx.ReadTimeout("first run's deadline passed")
+
+    first_client, second_client = AsyncMock(), AsyncMock()
+    first_client.get.side_effect = failing_get
+    second_client.get.return_value = MockResponse(200, "User-agent: *")
+
+    async def hanging_get(url: str, **kwargs: object) -> MockResponse:
+        await asyncio.sleep(10)
+        return MockResponse(200, "")
+
+    hanging_client = AsyncMock()
+    hanging_client.get.side_effect = hanging_get
+
+    # Act
+    first, second = await asyncio.gather(
+        cache.get(url, first_client), cache.get(url, second_client), return_exceptions=True
+    )
+    other_url = "https://other.ru/robots.txt"
+    slow = asyncio.ensure_future(cache.get(other_url, hanging_client))
+    await asyncio.sleep(0)
+    with pytest.raises(httpx.TimeoutException):
+        await cache.get(other_url, second_client, timeout=0.01)
+    cache._inflight[other_url].cancel()
+    await asyncio.gather(slow, return_exceptions=True)
+
+    # Assert
+    assert isinstance(first, httpx.ReadTimeout)
+    assert second.found
+    second_client.get.assert_called_once_with(url, timeout=5.0)
@@ -0,0 +1,417 @@
+"""Harness: update-to-reply latency of the bot without Telegram.
+
+Starts a fake Bot API server and a fake backend in this process, then runs
+the real bot (``bot.py``) in one or more subprocesses pointed at them. In
+webhook mode synthetic Telegram updates are posted straight to the bot
+workers (round robin, like a load balancer in front of them); in polling
+mode the fake server hands them out from ``getUpdates``. For every update
+the harness records when the first reply and the final report arrive.
+
+Usage (from telegram-bot/):
+    python -m benchmarks.webhook_latency [--mode webhook] [--workers 2]
+        [--updates 200] [--concurrency 50] [--backend-delay-ms 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl
+
+import httpx
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+TOKEN = "123456:HARNESS"
+SECRET = "harness-secret"
+
+REPORT = {
+    "score": 7.5,
+    "problems_critical": 1,
+    "problems_important": 1,
+    "checks_ok": 5,
+    "categories": [],
+    "top_priorities": [],
+    "detailed_checks": [
+        {"id": "robots", "name": "Robots.txt", "status": "ok", "message": "✅ Найден"},
+        {
+            "id": "noindex",
+            "name": "Индексация",
+            "status": "problem",
+            "severity": "critical",
+            "message": "❌ Главная закрыта от индексации",
+        },
+    ],
+    "metadata": {"checked_at": "2026-10-17T12:00:00Z", "processing_time_sec": 2},
+}
+
+
+class Server(ThreadingHTTPServer):
+    """Threaded HTTP server that accepts bursts of connections."""
+
+    daemon_threads = True
+    request_queue_size = 256  # Default backlog of 5 drops connections under load
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        """Ignore clients going away (bot workers are terminated at the end)."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+# Check events of the progress stream: 13 checks in 5 categories
+STREAM_CHECKS = [
+    {"id": f"check-{i}", "name": f"Проверка {i}", "status": "ok", "message": "✅", "category": cat}
+    for i, cat in enumerate(
+        ["technical"] * 5 + ["content"] * 3 + ["structure"] * 2 + ["seo"] * 2 + ["social"]
+    )
+]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    rank = max(int(len(values) * q / 100 + 0.999999) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class FakeTelegram:
+    """State of the fake Bot API: sent messages and pending updates."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Condition()
+        self.webhooks_set = 0
+        self.next_message_id = 1
+        # chat ID -> (monotonic time, method, text) of every bot message
+        self.messages: dict[int, list[tuple[float, str, str]]] = {}
+        self.updates: list[dict[str, Any]] = []  # For getUpdates (polling mode)
+
+    def call(self, method: str, params: dict[str, str]) -> Any:
+        """Handle Bot API method call and return its result."""
+        now = time.monotonic()
+        with self.lock:
+            if method == "getMe":
+                return {
+                    "id": 1,
+                    "is_bot": True,
+                    "first_name": "Harness",
+                    "username": "harness_bot",
+                    "can_join_groups": False,
+                    "can_read_all_group_messages": False,
+                    "supports_inline_queries": False,
+                }
+            if method == "setWebhook":
+                self.webhooks_set += 1
+                return True
+            if method == "getUpdates":
+                offset = int(params.get("offset", 0))
+                deadline = now + float(params.get("timeout", 0))
+                while True:
+                    pending = [u for u in self.updates if u["update_id"] >= offset]
+                    if pending or time.monotonic() >= deadline:
+                        return pending
+                    self.lock.wait(deadline - time.monotonic())
+            if method in ("sendMessage", "editMessageText"):
+                if "chat_id" not in params:
+                    return True  # Body cut off: the bot cancelled the call
+                chat_id = int(params["chat_id"])
+                self.messages.setdefault(chat_id, []).append((now, method, params["text"]))
+                self.lock.notify_all()
+                message_id = int(params.get("message_id") or 0)
+                if not message_id:
+                    message_id = self.next_message_id
+                    self.next_message_id += 1
+                return {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": params["text"],
+                }
+            return True
+
+    def push_update(self, update: dict[str, Any]) -> None:
+        """Queue update for getUpdates."""
+        with self.lock:
+            self.updates.append(update)
+            self.lock.notify_all()
+
+
+def start_fake_telegram(state: FakeTelegram, port: int) -> Server:
+    """Serve the fake Bot API at ``http://127.0.0.1:<port>/bot<token>/<method>``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802 (http.server API)
+            method = self.path.rsplit("/", 1)[-1]
+            length = int(self.headers.get("Content-Length") or 0)
+            params = dict(parse_qsl(self.rfile.read(length).decode()))
+            body = json.dumps({"ok": True, "result": state.call(method, params)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = Server(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_fake_backend(port: int, delay: float) -> Server:
+    """Serve a backend answering every check with the same report after a delay.
+
+    ``/api/check/stream`` spreads the check events evenly over the delay.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802 (http.server API)
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path == "/api/check/stream":
+                self.stream_check()
+                return
+            if self.path == "/api/check":
+                time.sleep(delay)
+            body = json.dumps(REPORT if self.path == "/api/check" else {}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream_check(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            categories: dict[str, int] = {}
+            for check in STREAM_CHECKS:
+                categories[check["category"]] = categories.get(check["category"], 0) + 1
+            job = {"job_id": 1, "status": "pending", "checks_total": len(STREAM_CHECKS)}
+            self.send_event("job", {**job, "categories": categories})
+            for check in STREAM_CHECKS:
+                time.sleep(delay / len(STREAM_CHECKS))
+                self.send_event("check", check)
+            self.send_event("report", REPORT)
+
+        def send_event(self, event: str, data: dict[str, Any]) -> None:
+            payload = json.dumps(data, ensure_ascii=False)
+            self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode())
+            self.wfile.flush()
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = Server(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_workers(args: argparse.Namespace, log_dir: Path) -> list[subprocess.Popen[bytes]]:
+    """Start bot processes (one per webhook port, or a single poller)."""
+    processes = []
+    for n in range(args.workers if args.mode == "webhook" else 1):
+        env = {
+            **os.environ,
+            "BOT_TOKEN": TOKEN,
+            "TELEGRAM_API_URL": f"http://127.0.0.1:{args.telegram_port}/bot",
+            "API_URL": f"http://127.0.0.1:{args.backend_port}",
+        }
+        env.pop("PORT", None)
+        if args.mode == "webhook":
+            env.update(
+                {
+                    "WEBHOOK_URL": f"http://127.0.0.1:{args.webhook_port}",
+                    "WEBHOOK_LISTEN": "127.0.0.1",
+                    "WEBHOOK_PORT": str(args.webhook_port + n),
+                    "WEBHOOK_SECRET": SECRET,
+                }
+            )
+        else:
+            env.pop("WEBHOOK_URL", None)
+        log = (log_dir / f"bot_worker_{n}.log").open("wb")
+        processes.append(
+            subprocess.Popen(
+                [sys.executable, "bot.py"], cwd=BOT_DIR, env=env, stdout=log, stderr=log
+            )
+        )
+    return processes
+
+
+def wait_ready(args: argparse.Namespace, state: FakeTelegram, timeout: float = 30.0) -> None:
+    """Wait until every webhook worker registered and listens (or the poller polls)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if args.mode == "polling":
+            time.sleep(2.0)  # getMe + first getUpdates
+            return
+        if state.webhooks_set >= args.workers:
+            try:
+                for n in range(args.workers):
+                    httpx.get(f"http://127.0.0.1:{args.webhook_port + n}/", timeout=1.0)
+                return
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.1)
+    raise RuntimeError("Bot workers did not start, see logs in " + tempfile.gettempdir())
+
+
+def make_update(n: int) -> dict[str, Any]:
+    """Synthetic update: user ``n`` sends a site URL."""
+    chat_id = 10_000 + n
+    return {
+        "update_id": n + 1,
+        "message": {
+            "message_id": n + 1,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "text": f"https://site-{n}.example.ru",
+        },
+    }
+
+
+async def drive(args: argparse.Namespace, state: FakeTelegram) -> dict[int, float]:
+    """Deliver updates at a fixed concurrency; return delivery time per chat."""
+    sent: dict[int, float] = {}
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for n in range(args.updates):
+        queue.put_nowait(n)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            n = queue.get_nowait()
+            update = make_update(n)
+            sent[update["message"]["chat"]["id"]] = time.monotonic()
+            if args.mode == "polling":
+                state.push_update(update)
+                continue
+            port = args.webhook_port + n % args.workers
+            await client.post(
+                f"http://127.0.0.1:{port}/telegram",
+                json=update,
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+    return sent
+
+
+def final_reply(messages: list[tuple[float, str, str]]) -> tuple[float, str] | None:
+    """Time and kind (``report``, ``rejected`` or ``error``) of the last reply to a chat."""
+    for sent_at, method, text in messages:
+        if method != "sendMessage":
+            continue
+        if "SEO" in text:
+            return sent_at, "report"
+        if "слишком много проверок" in text:
+            return sent_at, "rejected"
+        if text.startswith("❌"):
+            return sent_at, "error"
+    return None
+
+
+def wait_replies(state: FakeTelegram, chats: int, timeout: float) -> None:
+    """Wait until every chat got its final reply."""
+    deadline = time.monotonic() + timeout
+    with state.lock:
+        while True:
+            done = sum(1 for messages in state.messages.values() if final_reply(messages))
+            if done >= chats or time.monotonic() >= deadline:
+                return
+            state.lock.wait(max(deadline - time.monotonic(), 0.0))
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    values = sorted(value * 1000 for value in values)
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(values[-1], 1) if values else 0.0,
+    }
+
+
+def main() -> None:
+    """Run harness and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["webhook", "polling"], default="webhook")
+    parser.add_argument("--workers", type=int, default=2, help="Bot processes (webhook mode)")
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="Updates delivered at once")
+    parser.add_argument("--backend-delay-ms", type=float, default=2000.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="Max wait for all replies")
+    parser.add_argument("--telegram-port", type=int, default=8781)
+    parser.add_argument("--backend-port", type=int, default=8782)
+    parser.add_argument("--webhook-port", type=int, default=8790)
+    parser.add_argument("--output", help="Save results as JSON")
+    args = parser.parse_args()
+
+    state = FakeTelegram()
+    servers = [
+        start_fake_telegram(state, args.telegram_port),
+        start_fake_backend(args.backend_port, args.backend_delay_ms / 1000),
+    ]
+    log_dir = Path(tempfile.gettempdir())
+    workers = start_workers(args, log_dir)
+    try:
+        wait_ready(args, state)
+        start = time.monotonic()
+        sent = asyncio.run(drive(args, state))
+        wait_replies(state, len(sent), args.timeout)
+        wall = time.monotonic() - start
+    finally:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.wait(timeout=30)
+        for server in servers:
+            server.shutdown()
+
+    first_reply, report = [], []
+    outcomes = {"report": 0, "rejected": 0, "error": 0, "missing": 0}
+    edits = 0
+    for chat_id, delivered in sent.items():
+        messages = state.messages.get(chat_id, [])
+        edits += sum(1 for _, method, _ in messages if method == "editMessageText")
+        if messages:
+            first_reply.append(messages[0][0] - delivered)
+        final = final_reply(messages)
+        outcomes[final[1] if final else "missing"] += 1
+        if final and final[1] == "report":
+            report.append(final[0] - delivered)
+
+    result = {
+        "benchmark": "webhook_latency",
+        "params": {
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "webhook" else 1,
+            "updates": args.updates,
+            "concurrency": args.concurrency,
+            "backend_delay_ms": args.backend_delay_ms,
+        },
+        "results": {
+            **outcomes,
+            "wall_sec": round(wall, 3),
+            "updates_per_sec": round(len(report) / wall, 2) if wall else 0.0,
+            "edits_per_update": round(edits / len(sent), 2) if sent else 0.0,
+            "first_reply_ms": summarize(first_reply),
+            "report_ms": summarize(report),
+        },
+    }
+    print(json.dumps(result["results"], indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
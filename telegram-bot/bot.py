@@ -1,4 +1,10 @@
-"""Telegram bot main entry point."""
+"""Telegram bot main entry point.
+
+Runs with long polling by default. Set WEBHOOK_URL to receive updates via
+webhook instead: Telegram pushes each update to the bot's HTTP server, so
+there is no polling delay and several bot processes can serve one endpoint
+behind a load balancer.
+"""
 
 import os
 import logging
@@ -7,7 +13,8 @@ from telegram.ext import Application, CommandHandler, MessageHandler, filters
 
 from handlers.start import start_command
 from handlers.help import help_command
-from handlers.url import handle_url
+from handlers.url import check_queue, handle_url
+from services.api_client import api_client
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -17,23 +24,79 @@ logger = logging.getLogger(__name__)
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+# Updates handled at the same time; checks beyond MAX_CONCURRENT_CHECKS wait
+# in the check queue, so users get their place in line right away
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))
+# Bot API server (the local test harness points this to a fake one)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
 
+# Webhook mode: public base URL Telegram posts updates to (empty = polling)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+# PORT is set by Railway and similar platforms
+WEBHOOK_PORT = int(os.getenv("PORT", os.getenv("WEBHOOK_PORT", "8443")))
+# Telegram sends it in X-Telegram-Bot-Api-Secret-Token; other requests are rejected
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
 
-def main() -> None:
-    """Start the bot."""
-    if not BOT_TOKEN:
-        raise ValueError("BOT_TOKEN environment variable is not set")
 
-    application = Application.builder().token(BOT_TOKEN).build()
+async def close_api_client(application: Application) -> None:
+    """Close pooled backend connections on shutdown."""
+    await api_client.close()
+
+
+def build_application(token: str, base_url: str = TELEGRAM_API_URL) -> Application:
+    """Build bot application with all handlers.
+
+    Args:
+        token: Bot token from @BotFather
+        base_url: Bot API URL the token is appended to
+
+    Returns:
+        Application ready for polling or webhook mode
+    """
+    application = (
+        Application.builder()
+        .token(token)
+        .base_url(base_url)
+        .concurrent_updates(CONCURRENT_UPDATES)
+        .post_shutdown(close_api_client)
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("help", help_command))
-    
+
     # Handle text messages (URLs)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_url))
+    return application
+
+
+def main() -> None:
+    """Start the bot."""
+    if not BOT_TOKEN:
+        raise ValueError("BOT_TOKEN environment variable is not set")
+
+    application = build_application(BOT_TOKEN)
 
-    logger.info(f"🤖 Bot starting... API URL: {API_URL}")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    logger.info(
+        f"🤖 Bot starting... API URL: {API_URL}, "
+        f"concurrent checks: {check_queue.max_concurrent}, queue: {check_queue.max_waiting}"
+    )
+    if WEBHOOK_URL:
+        webhook_url = f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}"
+        logger.info(f"Webhook mode: {webhook_url}, listening on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}")
+        # Every worker registers the same URL; Telegram keeps the last call
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=webhook_url,
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+        )
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,14 @@
 """Start command handler for SEO Checker bot."""
 
 import logging
-import os
 from uuid import UUID
 
-import httpx
 from telegram import Update
 from telegram.ext import ContextTypes
 
-logger = logging.getLogger(__name__)
+from services.api_client import api_client
 
-API_URL = os.getenv("API_URL", "http://localhost:8000")
+logger = logging.getLogger(__name__)
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -48,22 +46,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
             logger.info(f"User {user_id} opened bot via web session: {session_id}")
 
             # Update session with Telegram data
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{API_URL}/api/update-session-telegram",
-                    json={
-                        "session_id": str(session_id),
-                        "telegram_id": user_id,
-                        "telegram_username": username,
-                    },
-                )
-
-                if response.status_code == 200:
-                    logger.info(f"Session {session_id} updated with Telegram data")
-                else:
-                    logger.warning(
-                        f"Failed to update session {session_id}: {response.status_code}"
-                    )
+            if await api_client.update_session_telegram(str(session_id), user_id, username):
+                logger.info(f"Session {session_id} updated with Telegram data")
 
             # Store session_id in user context for future checks
             context.user_data["session_id"] = str(session_id)
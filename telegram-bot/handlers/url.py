@@ -5,13 +5,27 @@ import re
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from services.api_client import APIClient
+from services.api_client import api_client
+from services.check_queue import CheckQueue, QueueFullError
+from services.progress import ProgressMessage
 import os
 
 logger = logging.getLogger(__name__)
 
-API_URL = os.getenv("API_URL", "http://localhost:8000")
-api_client = APIClient(api_url=API_URL)
+# Checks sent to the backend at once; the rest wait in line
+check_queue = CheckQueue(
+    max_concurrent=int(os.getenv("MAX_CONCURRENT_CHECKS", "4")),
+    max_waiting=int(os.getenv("MAX_QUEUED_CHECKS", "50")),
+)
+
+# (user ID, URL) of checks waiting or running; a resubmitted URL is not checked twice
+in_flight: set[tuple[int, str]] = set()
+
+PROCESSING_TEXT = (
+    "⏳ Проверяю сайт, пожалуйста подождите...\n\n"
+    "🔗 {url}\n\n"
+    "⏱ Обычно проверка занимает 10-15 секунд"
+)
 
 
 async def handle_url(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -44,49 +58,87 @@ async def handle_url(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         )
         return
 
-    # Show processing message
-    processing_msg = await update.message.reply_text(
-        "⏳ Проверяю сайт, пожалуйста подождите...\n\n"
-        f"🔗 {text}\n\n"
-        "⏱ Обычно проверка занимает 10-15 секунд"
-    )
+    key = (user_id, text.rstrip("/").lower())
+    if key in in_flight:
+        await update.message.reply_text(
+            "⏳ Этот сайт уже проверяется — отчёт придёт сюда, как только будет готов.\n\n"
+            f"🔗 {text}"
+        )
+        return
+    in_flight.add(key)
+
+    processing_msg = None
+    progress = None
+
+    async def show_position(position: int) -> None:
+        nonlocal processing_msg
+        processing_msg = await update.message.reply_text(
+            f"🕐 Сейчас проверяются другие сайты. Ваше место в очереди: {position}\n\n"
+            f"🔗 {text}\n\n"
+            "Проверка начнётся автоматически, отправлять ссылку ещё раз не нужно."
+        )
+
+    async def reply_final(message: str, **kwargs) -> None:
+        """Send the final text as a new message (it notifies the user), then drop the progress."""
+        await update.message.reply_text(message, **kwargs)
+        if progress is not None:
+            await progress.finish()
+        elif processing_msg is not None:
+            await ProgressMessage(processing_msg, text).finish()
 
     try:
         # Get session_id from user context (if came from web form)
         session_id = context.user_data.get("session_id")
 
-        # Call API to check the site
-        result = await api_client.check_site(text, user_id, session_id)
-
-        # Delete processing message
-        try:
-            await processing_msg.delete()
-        except:
-            pass
+        async with check_queue.slot(show_position):
+            # Show processing message
+            if processing_msg is None:
+                processing_msg = await update.message.reply_text(PROCESSING_TEXT.format(url=text))
+            else:
+                await processing_msg.edit_text(PROCESSING_TEXT.format(url=text))
+
+            # Call API to check the site, showing progress as checks finish
+            progress = ProgressMessage(processing_msg, text)
+            try:
+                result = await api_client.check_site_streaming(
+                    text, user_id, session_id, on_event=progress.on_event
+                )
+            finally:
+                await progress.close()
 
         if "error" in result:
             error_data = result["error"]
             error_msg = error_data.get("message", "Неизвестная ошибка")
-            await update.message.reply_text(
+            await reply_final(
                 f"❌ Ошибка при проверке:\n{error_msg}\n\n"
                 "Попробуйте позже или проверьте URL."
             )
         else:
-            # Success - format and send report
+            # Success - send the report
             message = format_report(text, result)
-            await update.message.reply_text(
+            await reply_final(
                 message, 
                 parse_mode="Markdown",
                 disable_web_page_preview=True
             )
 
+    except QueueFullError:
+        logger.warning(f"Check queue is full, rejected {text}")
+        await update.message.reply_text(
+            "😔 Сейчас слишком много проверок.\n\n"
+            "Попробуйте отправить ссылку через пару минут."
+        )
+
     except Exception as e:
         logger.error(f"Error checking URL {text}: {e}")
-        await update.message.reply_text(
+        await reply_final(
             "❌ Произошла ошибка при проверке сайта.\n\n"
             "Попробуйте позже или проверьте корректность URL."
         )
 
+    finally:
+        in_flight.discard(key)
+
 
 def format_report(url: str, report: dict) -> str:
     """Format SEO report as Telegram message.
@@ -1,24 +1,81 @@
 """API client for backend communication."""
 
+import json
 import logging
+import os
+from collections.abc import Awaitable, Callable
 from typing import Any
 import httpx
 
 logger = logging.getLogger(__name__)
 
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+
 
 class APIClient:
     """Client for communicating with SEO Checker backend API."""
 
-    def __init__(self, api_url: str, timeout: float = 150.0):
+    def __init__(self, api_url: str, timeout: float = 150.0, max_connections: int = 10):
         """Initialize API client.
 
         Args:
             api_url: Base URL of the backend API (e.g., http://localhost:8000)
             timeout: Request timeout in seconds (default: 150s for long checks)
+            max_connections: Size of the connection pool to the backend
         """
         self.api_url = api_url.rstrip("/")
         self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use.
+
+        One client is kept for the life of the bot, so calls reuse
+        keep-alive connections instead of a new TCP/TLS handshake each.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections (call on bot shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def update_session_telegram(
+        self, session_id: str, telegram_id: int, telegram_username: str | None
+    ) -> bool:
+        """Attach Telegram user to a web session.
+
+        Args:
+            session_id: Session ID from the web form deep link
+            telegram_id: Telegram user ID
+            telegram_username: Telegram username
+
+        Returns:
+            True if the backend updated the session
+        """
+        response = await self._get_client().post(
+            f"{self.api_url}/api/update-session-telegram",
+            json={
+                "session_id": session_id,
+                "telegram_id": telegram_id,
+                "telegram_username": telegram_username,
+            },
+            timeout=10.0,
+        )
+        if response.status_code != 200:
+            logger.warning(f"Failed to update session {session_id}: {response.status_code}")
+            return False
+        return True
 
     async def check_site(self, site_url: str, telegram_id: int, session_id: str | None = None) -> dict[str, Any]:
         """Call backend API to check site SEO.
@@ -32,51 +89,122 @@ class APIClient:
             dict: API response with report data or error information
         """
         endpoint = f"{self.api_url}/api/check"
-        payload = {
+        payload = self._payload(site_url, telegram_id, session_id)
+
+        try:
+            response = await self._get_client().post(endpoint, json=payload)
+
+            if response.status_code == 200:
+                return response.json()
+            return self._status_error(response)
+
+        except Exception as e:
+            return self._exception_error(e, site_url)
+
+    async def check_site_streaming(
+        self,
+        site_url: str,
+        telegram_id: int,
+        session_id: str | None = None,
+        on_event: Callable[[str, dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
+        """Check site SEO, receiving progress while the checks run.
+
+        Reads the backend's server-sent events: ``job`` (check counts per
+        category), ``check`` for every finished check, then ``report`` or
+        ``error``.
+
+        Args:
+            site_url: URL of the site to check
+            telegram_id: Telegram user ID for rate limiting
+            session_id: Optional session ID from web form
+            on_event: Called with the name and data of every progress event
+                (``job`` and ``check``)
+
+        Returns:
+            dict: Report data or error information, as check_site()
+        """
+        endpoint = f"{self.api_url}/api/check/stream"
+        payload = self._payload(site_url, telegram_id, session_id)
+
+        try:
+            async with self._get_client().stream("POST", endpoint, json=payload) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    return self._status_error(response)
+
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:") and event:
+                        data = json.loads(line[len("data:"):])
+                        if event == "report":
+                            return data
+                        if event == "error":
+                            return data if "error" in data else {"error": data}
+                        if on_event is not None:
+                            await on_event(event, data)
+
+            logger.warning(f"Progress stream ended without a report for site: {site_url}")
+            return {
+                "error": {
+                    "code": "server_error",
+                    "message": "Ошибка сервера. Попробуйте позже.",
+                }
+            }
+
+        except Exception as e:
+            return self._exception_error(e, site_url)
+
+    @staticmethod
+    def _payload(site_url: str, telegram_id: int, session_id: str | None) -> dict[str, Any]:
+        """Build check request body."""
+        payload: dict[str, Any] = {
             "site_url": site_url,
             "telegram_id": telegram_id,
         }
-        
+
         if session_id:
             payload["session_id"] = session_id
+        return payload
 
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(endpoint, json=payload)
-
-                if response.status_code == 200:
-                    return response.json()
-
-                elif response.status_code == 429:
-                    error_data = response.json().get("error", {})
-                    return {"error": error_data}
-
-                elif response.status_code == 422:
-                    return {
-                        "error": {
-                            "code": "validation_error",
-                            "message": "Некорректный URL. Проверьте адрес сайта.",
-                        }
-                    }
-
-                elif response.status_code >= 500:
-                    return {
-                        "error": {
-                            "code": "server_error",
-                            "message": "Ошибка сервера. Попробуйте позже.",
-                        }
-                    }
-
-                else:
-                    logger.warning(f"Unexpected status code: {response.status_code}")
-                    return {
-                        "error": {
-                            "code": "unknown_error",
-                            "message": "Произошла ошибка. Попробуйте позже.",
-                        }
-                    }
-
-        except httpx.TimeoutException:
+    @staticmethod
+    def _status_error(response: httpx.Response) -> dict[str, Any]:
+        """Map unsuccessful backend response to error information."""
+        if response.status_code == 429:
+            error_data = response.json().get("error", {})
+            return {"error": error_data}
+
+        elif response.status_code == 422:
+            return {
+                "error": {
+                    "code": "validation_error",
+                    "message": "Некорректный URL. Проверьте адрес сайта.",
+                }
+            }
+
+        elif response.status_code >= 500:
+            return {
+                "error": {
+                    "code": "server_error",
+                    "message": "Ошибка сервера. Попробуйте позже.",
+                }
+            }
+
+        else:
+            logger.warning(f"Unexpected status code: {response.status_code}")
+            return {
+                "error": {
+                    "code": "unknown_error",
+                    "message": "Произошла ошибка. Попробуйте позже.",
+                }
+            }
+
+    @staticmethod
+    def _exception_error(e: Exception, site_url: str) -> dict[str, Any]:
+        """Map failed backend call to error information."""
+        if isinstance(e, httpx.TimeoutException):
             logger.error(f"API timeout for site: {site_url}")
             return {
                 "error": {
@@ -88,7 +216,7 @@ class APIClient:
                 }
             }
 
-        except httpx.ConnectError as e:
+        if isinstance(e, httpx.ConnectError):
             logger.error(f"API connection error: {e}")
             return {
                 "error": {
@@ -97,11 +225,16 @@ class APIClient:
                 }
             }
 
-        except Exception as e:
-            logger.error(f"Unexpected API error: {e}", exc_info=True)
-            return {
-                "error": {
-                    "code": "unknown_error",
-                    "message": "Произошла непредвиденная ошибка. Попробуйте позже.",
-                }
+        logger.error(f"Unexpected API error: {e}", exc_info=e)
+        return {
+            "error": {
+                "code": "unknown_error",
+                "message": "Произошла непредвиденная ошибка. Попробуйте позже.",
             }
+        }
+
+
+api_client = APIClient(
+    api_url=API_URL,
+    max_connections=int(os.getenv("API_MAX_CONNECTIONS", "10")),
+)
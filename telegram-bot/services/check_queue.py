@@ -0,0 +1,81 @@
+"""Queue limiting how many site checks the bot runs at once."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+
+class QueueFullError(Exception):
+    """Raised when too many checks are already waiting."""
+
+
+class CheckQueue:
+    """First-come, first-served queue in front of the backend.
+
+    At most ``max_concurrent`` checks call the backend at the same time; the
+    rest wait in arrival order (up to ``max_waiting`` of them).
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_waiting: int = 50):
+        """Initialize queue.
+
+        Args:
+            max_concurrent: Checks running at the same time
+            max_waiting: Checks allowed to wait for a slot
+        """
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting: list[object] = []
+
+    @property
+    def waiting(self) -> int:
+        """Number of checks waiting for a slot."""
+        return len(self._waiting)
+
+    @property
+    def running(self) -> int:
+        """Number of checks holding a slot."""
+        return self.max_concurrent - self._semaphore._value
+
+    @asynccontextmanager
+    async def slot(
+        self, on_wait: Callable[[int], Awaitable[None]] | None = None
+    ) -> AsyncIterator[None]:
+        """Hold a slot for one check.
+
+        Args:
+            on_wait: Called with the position in the queue (1 = next) if the
+                check has to wait
+
+        Raises:
+            QueueFullError: If ``max_waiting`` checks are already waiting
+        """
+        if self._waiting or self._semaphore.locked():
+            if len(self._waiting) >= self.max_waiting:
+                raise QueueFullError(f"{len(self._waiting)} checks are waiting")
+            ticket = object()
+            self._waiting.append(ticket)
+            try:
+                # Take the place in line before notifying the user, so a
+                # slow Telegram call doesn't let later arrivals overtake
+                acquire = asyncio.ensure_future(self._semaphore.acquire())
+                try:
+                    if on_wait is not None:
+                        await on_wait(len(self._waiting))
+                    await acquire
+                except BaseException:
+                    if acquire.done() and not acquire.cancelled() and acquire.exception() is None:
+                        self._semaphore.release()
+                    else:
+                        acquire.cancel()
+                    raise
+            finally:
+                self._waiting.remove(ticket)
+        else:
+            await self._semaphore.acquire()
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
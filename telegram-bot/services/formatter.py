@@ -2,6 +2,15 @@
 
 from typing import Any
 
+# Display names of backend check categories
+CATEGORY_NAMES = {
+    "technical": "Техническая база",
+    "content": "Контент",
+    "structure": "Структура",
+    "seo": "SEO улучшения",
+    "social": "Социальные сети",
+}
+
 
 def get_category_emoji(category_name: str) -> str:
     """Get emoji for category.
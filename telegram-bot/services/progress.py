@@ -0,0 +1,175 @@
+"""Live progress of a running check in the processing message."""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+
+from telegram import Message
+from telegram.error import RetryAfter, TelegramError
+
+from services.formatter import CATEGORY_NAMES, get_category_emoji
+
+logger = logging.getLogger(__name__)
+
+# Min seconds between edits of one message (Telegram allows about 1 per second per chat)
+EDIT_INTERVAL = float(os.getenv("PROGRESS_EDIT_INTERVAL", "2.0"))
+# Progress edits per second across all chats (Telegram allows ~30 bot messages per second)
+EDITS_PER_SEC = float(os.getenv("PROGRESS_EDITS_PER_SEC", "20"))
+
+
+class EditBudget:
+    """Token bucket shared by all progress messages of the bot."""
+
+    def __init__(self, rate: float):
+        """Initialize budget.
+
+        Args:
+            rate: Edits per second (also the burst size)
+        """
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        """Take one edit from the budget if available."""
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+edit_budget = EditBudget(EDITS_PER_SEC)
+
+
+class ProgressMessage:
+    """Processing message edited as checks finish.
+
+    Edits run in a background task, so a slow Telegram call never holds up
+    reading the progress stream. Changes arriving faster than the edit
+    interval are merged into one edit. The report or the error is sent as a
+    new message (edits don't notify the user); ``finish`` then removes the
+    progress.
+    """
+
+    def __init__(
+        self,
+        message: Message,
+        url: str,
+        interval: float = EDIT_INTERVAL,
+        budget: EditBudget = edit_budget,
+    ):
+        """Initialize progress message.
+
+        Args:
+            message: Processing message to edit
+            url: Checked URL
+            interval: Min seconds between edits of this message
+            budget: Edit budget shared with other messages
+        """
+        self.message = message
+        self.url = url
+        self.interval = interval
+        self.budget = budget
+        self.edits = 0
+        self._totals: dict[str, int] = {}
+        self._done: dict[str, int] = {}
+        self._checks_total = 0
+        self._last_edit = time.monotonic()  # The message was just sent
+        self._last_text = ""
+        self._dirty = False
+        self._task: asyncio.Task[None] | None = None
+
+    async def on_event(self, event: str, data: dict[str, Any]) -> None:
+        """Record progress event from the backend (see APIClient.check_site_streaming)."""
+        if event == "job":
+            self._totals = dict(data.get("categories") or {})
+            self._checks_total = data.get("checks_total") or sum(self._totals.values())
+        elif event == "check":
+            category = data.get("category", "")
+            self._done[category] = self._done.get(category, 0) + 1
+            self._dirty = True
+            if self._task is None:
+                self._task = asyncio.create_task(self._flush())
+
+    def render(self) -> str:
+        """Text of the processing message."""
+        done_total = sum(self._done.values())
+        lines = [f"⏳ Проверяю сайт...\n\n🔗 {self.url}\n"]
+        for category, total in self._totals.items():
+            done = min(self._done.get(category, 0), total)
+            name = CATEGORY_NAMES.get(category, category)
+            mark = "✅" if done >= total else "⏳"
+            lines.append(f"{mark} {get_category_emoji(name)} {name}: {done}/{total}")
+        if self._checks_total:
+            lines.append(f"\nГотово проверок: {done_total} из {self._checks_total}")
+        else:
+            lines.append(f"Готово проверок: {done_total}")
+        return "\n".join(lines)
+
+    async def close(self) -> None:
+        """Stop pending edits (call before the report replaces the message)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def finish(self) -> None:
+        """Remove the progress once the final message has been sent.
+
+        Pending progress edits are dropped first, so none lands afterwards.
+        If the message can't be deleted (e.g. it is older than 48 hours in a
+        group), it is trimmed to one line instead of showing stale progress.
+        """
+        await self.close()
+        try:
+            await self.message.delete()
+        except TelegramError as e:
+            logger.debug(f"Progress delete failed: {e}")
+            try:
+                await self.message.edit_text(f"Проверка завершена\n\n🔗 {self.url}")
+            except TelegramError as e:
+                logger.debug(f"Progress trim failed: {e}")
+
+    async def _flush(self) -> None:
+        """Edit the message once the interval and the budget allow, until up to date."""
+        try:
+            while self._dirty:
+                delay = self._last_edit + self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                if not self.budget.try_acquire():
+                    await asyncio.sleep(1 / self.budget.rate)
+                    continue
+                self._dirty = False
+                await self._edit()
+        finally:
+            self._task = None
+
+    async def _edit(self) -> None:
+        """Edit the message with the current progress (errors are only logged)."""
+        text = self.render()
+        self._last_edit = time.monotonic()
+        if text == self._last_text:
+            return
+        try:
+            await self.message.edit_text(text)
+            self._last_text = text
+            self.edits += 1
+        except RetryAfter as e:
+            # Flood control: hold further edits of this message
+            retry_after = e.retry_after
+            if not isinstance(retry_after, (int, float)):
+                retry_after = retry_after.total_seconds()
+            self._last_edit = time.monotonic() + retry_after
+            self._dirty = True
+        except TelegramError as e:
+            logger.debug(f"Progress edit failed: {e}")
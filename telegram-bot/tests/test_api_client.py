@@ -148,3 +148,84 @@ async def test_api_client_validation_error():
 
     assert "error" in result
     assert result["error"]["code"] == "validation_error"
+
+
+@pytest.mark.asyncio
+async def test_api_client_reuses_pooled_connection():
+    """Test consecutive checks share one HTTP client."""
+    from services.api_client import APIClient
+
+    api_client = APIClient(api_url="http://test-api.local")
+    connections = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"score": 8.0})
+
+    transport = httpx.MockTransport(handler)
+    original = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        client = original(transport=transport, **kwargs)
+        connections.append(client)
+        return client
+
+    with patch("httpx.AsyncClient", side_effect=make_client):
+        first = await api_client.check_site("https://example.ru", 1)
+        second = await api_client.check_site("https://example.ru", 2)
+
+    assert first["score"] == second["score"] == 8.0
+    assert len(connections) == 1
+
+    await api_client.close()
+    assert connections[0].is_closed
+
+
+@pytest.mark.asyncio
+async def test_api_client_streaming_reports_progress():
+    """Test progress events are passed on and the report is returned."""
+    from services.api_client import APIClient
+
+    api_client = APIClient(api_url="http://test-api.local")
+    stream = (
+        'event: job\ndata: {"job_id": 1, "checks_total": 2, "categories": {"technical": 2}}\n\n'
+        'event: check\ndata: {"id": "robots", "category": "technical", "status": "ok"}\n\n'
+        'event: check\ndata: {"id": "sitemap", "category": "technical", "status": "problem"}\n\n'
+        'event: report\ndata: {"score": 5.0, "detailed_checks": []}\n\n'
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/check/stream"
+        return httpx.Response(200, text=stream, headers={"content-type": "text/event-stream"})
+
+    events = []
+
+    async def on_event(event: str, data: dict) -> None:
+        events.append((event, data.get("id")))
+
+    original = httpx.AsyncClient
+    transport = httpx.MockTransport(handler)
+    with patch("httpx.AsyncClient", side_effect=lambda **kw: original(transport=transport, **kw)):
+        result = await api_client.check_site_streaming("https://example.ru", 1, on_event=on_event)
+
+    assert result == {"score": 5.0, "detailed_checks": []}
+    assert events == [("job", None), ("check", "robots"), ("check", "sitemap")]
+    await api_client.close()
+
+
+@pytest.mark.asyncio
+async def test_api_client_streaming_rate_limit():
+    """Test errors before the stream starts are mapped like check_site."""
+    from services.api_client import APIClient
+
+    api_client = APIClient(api_url="http://test-api.local")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, json={"error": {"code": "rate_limit_exceeded", "message": "Лимит"}})
+
+    original = httpx.AsyncClient
+    transport = httpx.MockTransport(handler)
+    with patch("httpx.AsyncClient", side_effect=lambda **kw: original(transport=transport, **kw)):
+        result = await api_client.check_site_streaming("https://example.ru", 1)
+
+    assert result["error"]["code"] == "rate_limit_exceeded"
+    await api_client.close()
@@ -0,0 +1,12 @@
+"""Unit tests for bot application setup."""
+
+
+def test_build_application_uses_api_url_and_concurrent_updates():
+    """Test application talks to the given Bot API and handles updates concurrently."""
+    from bot import CONCURRENT_UPDATES, build_application
+
+    application = build_application("123456:TEST", base_url="http://127.0.0.1:8781/bot")
+
+    assert application.bot.base_url == "http://127.0.0.1:8781/bot123456:TEST"
+    assert application.concurrent_updates == CONCURRENT_UPDATES
+    assert len(application.handlers[0]) == 3
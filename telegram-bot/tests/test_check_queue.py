@@ -0,0 +1,94 @@
+"""Unit tests for the check queue."""
+
+import asyncio
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_check_queue_limits_concurrency_and_reports_positions():
+    """Test extra checks wait in arrival order and learn their position."""
+    from services.check_queue import CheckQueue
+
+    queue = CheckQueue(max_concurrent=2, max_waiting=10)
+    release = asyncio.Event()
+    running = 0
+    max_running = 0
+    positions: dict[int, int] = {}
+    order: list[int] = []
+
+    async def check(n: int) -> None:
+        nonlocal running, max_running
+
+        async def on_wait(position: int) -> None:
+            positions[n] = position
+
+        async with queue.slot(on_wait):
+            order.append(n)
+            running += 1
+            max_running = max(max_running, running)
+            await release.wait()
+            running -= 1
+
+    tasks = [asyncio.create_task(check(n)) for n in range(5)]
+    await asyncio.sleep(0.01)
+
+    assert queue.running == 2
+    assert queue.waiting == 3
+    assert positions == {2: 1, 3: 2, 4: 3}
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert max_running == 2
+    assert order == [0, 1, 2, 3, 4]
+    assert queue.running == 0
+    assert queue.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_check_queue_rejects_when_full():
+    """Test checks beyond max_waiting are rejected."""
+    from services.check_queue import CheckQueue, QueueFullError
+
+    queue = CheckQueue(max_concurrent=1, max_waiting=1)
+    release = asyncio.Event()
+
+    async def check() -> None:
+        async with queue.slot():
+            await release.wait()
+
+    tasks = [asyncio.create_task(check()) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(QueueFullError):
+        async with queue.slot():
+            pass
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_check_queue_cancelled_waiter_frees_its_place():
+    """Test a cancelled waiter leaves the line without taking a slot."""
+    from services.check_queue import CheckQueue
+
+    queue = CheckQueue(max_concurrent=1, max_waiting=5)
+    release = asyncio.Event()
+
+    async def check() -> None:
+        async with queue.slot():
+            await release.wait()
+
+    running = asyncio.create_task(check())
+    waiting = asyncio.create_task(check())
+    await asyncio.sleep(0.01)
+
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    release.set()
+    await running
+
+    assert queue.waiting == 0
+    assert queue.running == 0
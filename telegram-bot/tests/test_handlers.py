@@ -1,6 +1,8 @@
 """Unit tests for bot handlers."""
 
+import asyncio
 import base64
+import functools
 from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from telegram import Update, User, Message
@@ -96,3 +98,182 @@ async def test_start_command_handles_invalid_base64():
     message_text = update.message.reply_text.call_args[0][0]
 
     assert "❌" in message_text or "ошибк" in message_text.lower()
+
+
+def _url_update(user_id: int, text: str) -> MagicMock:
+    """Build an update with a text message whose replies are recorded."""
+    update = MagicMock(spec=Update)
+    update.effective_user = MagicMock(spec=User)
+    update.effective_user.id = user_id
+    update.message = MagicMock(spec=Message)
+    update.message.text = text
+    processing_msg = MagicMock(spec=Message)
+    processing_msg.edit_text = AsyncMock()
+    processing_msg.delete = AsyncMock()
+    update.message.reply_text = AsyncMock(return_value=processing_msg)
+    return update
+
+
+def _url_context() -> MagicMock:
+    context = MagicMock()
+    context.user_data = {}
+    return context
+
+
+@pytest.mark.asyncio
+async def test_handle_url_tells_queue_position():
+    """Test a check waiting for a free slot shows its place in the queue."""
+    from handlers.url import PROCESSING_TEXT, handle_url
+    from services.check_queue import CheckQueue
+
+    queue = CheckQueue(max_concurrent=1, max_waiting=5)
+    release = asyncio.Event()
+
+    async def busy() -> None:
+        async with queue.slot():
+            await release.wait()
+
+    mock_api_client = AsyncMock()
+    mock_api_client.check_site_streaming = AsyncMock(
+        return_value={"error": {"message": "Сайт недоступен"}}
+    )
+    update = _url_update(1, "example.ru")
+
+    with patch("handlers.url.check_queue", queue), patch("handlers.url.api_client", mock_api_client):
+        holder = asyncio.create_task(busy())
+        await asyncio.sleep(0)
+        handler = asyncio.create_task(handle_url(update, _url_context()))
+        await asyncio.sleep(0.01)
+        first_reply = update.message.reply_text.call_args_list[0][0][0]
+        api_called_while_waiting = mock_api_client.check_site_streaming.called
+        release.set()
+        await asyncio.gather(holder, handler)
+
+    assert "Ваше место в очереди: 1" in first_reply
+    assert "https://example.ru" in first_reply
+    assert not api_called_while_waiting
+    processing_msg = update.message.reply_text.return_value
+    processing_msg.edit_text.assert_any_call(PROCESSING_TEXT.format(url="https://example.ru"))
+    mock_api_client.check_site_streaming.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_handle_url_rejects_duplicate_request():
+    """Test the same URL sent again while it is checked is not checked twice."""
+    from handlers.url import handle_url, in_flight
+    from services.check_queue import CheckQueue
+
+    release = asyncio.Event()
+
+    async def slow_check(*args, **kwargs) -> dict:
+        await release.wait()
+        return {"error": {"message": "Сайт недоступен"}}
+
+    mock_api_client = AsyncMock()
+    mock_api_client.check_site_streaming = AsyncMock(side_effect=slow_check)
+    first = _url_update(2, "https://example.ru")
+    again = _url_update(2, "https://EXAMPLE.ru/")
+    other_user = _url_update(3, "https://example.ru")
+
+    with patch("handlers.url.check_queue", CheckQueue()), patch(
+        "handlers.url.api_client", mock_api_client
+    ):
+        handler = asyncio.create_task(handle_url(first, _url_context()))
+        await asyncio.sleep(0.01)
+        await handle_url(again, _url_context())
+        other = asyncio.create_task(handle_url(other_user, _url_context()))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(handler, other)
+
+    duplicate_reply = again.message.reply_text.call_args[0][0]
+    assert "уже проверяется" in duplicate_reply
+    assert again.message.reply_text.call_count == 1
+    assert mock_api_client.check_site_streaming.call_count == 2
+    assert not in_flight
+
+
+def _fast_progress():
+    """ProgressMessage factory with a short edit interval and an ample budget."""
+    from services.progress import EditBudget, ProgressMessage
+
+    return functools.partial(ProgressMessage, interval=0.05, budget=EditBudget(100))
+
+
+@pytest.mark.asyncio
+async def test_handle_url_throttles_progress_and_ends_with_report():
+    """Test progress edits are merged and the report comes as a new message."""
+    from handlers.url import handle_url
+    from services.check_queue import CheckQueue
+
+    async def streaming_check(url, user_id, session_id, on_event) -> dict:
+        await on_event("job", {"checks_total": 4, "categories": {"technical": 4}})
+        for check_id in ("robots", "sitemap", "ssl"):
+            await on_event("check", {"id": check_id, "category": "technical"})
+        await asyncio.sleep(0.1)
+        await on_event("check", {"id": "speed", "category": "technical"})
+        await asyncio.sleep(0.01)
+        return {"score": 9.0, "checks_ok": 4, "detailed_checks": []}
+
+    mock_api_client = AsyncMock()
+    mock_api_client.check_site_streaming = AsyncMock(side_effect=streaming_check)
+    update = _url_update(4, "https://example.ru")
+    edits: list[str] = []
+    processing_msg = update.message.reply_text.return_value
+
+    async def fake_edit_text(text: str, **kwargs) -> None:
+        edits.append(text)
+
+    processing_msg.edit_text = AsyncMock(side_effect=fake_edit_text)
+
+    with patch("handlers.url.check_queue", CheckQueue()), patch(
+        "handlers.url.api_client", mock_api_client
+    ), patch("handlers.url.ProgressMessage", _fast_progress()):
+        await handle_url(update, _url_context())
+
+    progress_edits = [text for text in edits if "Готово проверок" in text]
+    assert 1 <= len(progress_edits) < 4
+    assert "Готово проверок: 3 из 4" in progress_edits[0]
+    assert all("SEO Отчёт" not in text for text in edits)
+    assert update.message.reply_text.call_count == 2  # processing message, report
+    report_call = update.message.reply_text.call_args
+    assert "SEO Отчёт" in report_call[0][0]
+    assert report_call.kwargs["parse_mode"] == "Markdown"
+    processing_msg.delete.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("outcome", "expected"),
+    [
+        ({"error": {"message": "Сайт недоступен"}}, "Сайт недоступен"),
+        (RuntimeError("stream broke"), "Произошла ошибка при проверке сайта"),
+    ],
+)
+async def test_handle_url_sends_error_and_removes_progress_on_failure(outcome, expected):
+    """Test a failed check sends the error as a new message and leaves no stale progress."""
+    from handlers.url import handle_url
+    from services.check_queue import CheckQueue
+
+    async def failing_check(url, user_id, session_id, on_event) -> dict:
+        await on_event("job", {"checks_total": 2, "categories": {"technical": 2}})
+        await on_event("check", {"id": "robots", "category": "technical"})
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    mock_api_client = AsyncMock()
+    mock_api_client.check_site_streaming = AsyncMock(side_effect=failing_check)
+    update = _url_update(5, "https://example.ru")
+    processing_msg = update.message.reply_text.return_value
+
+    with patch("handlers.url.check_queue", CheckQueue()), patch(
+        "handlers.url.api_client", mock_api_client
+    ), patch("handlers.url.ProgressMessage", _fast_progress()):
+        await handle_url(update, _url_context())
+        await asyncio.sleep(0.1)  # a pending progress edit would land by now
+
+    assert update.message.reply_text.call_count == 2  # processing message, error
+    assert expected in update.message.reply_text.call_args[0][0]
+    processing_msg.delete.assert_awaited_once()
+    processing_msg.edit_text.assert_not_called()  # the pending progress edit was dropped
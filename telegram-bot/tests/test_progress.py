@@ -0,0 +1,83 @@
+"""Unit tests for live progress messages."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+def _job_event() -> dict:
+    return {"job_id": 1, "status": "pending", "checks_total": 3, "categories": {"technical": 2, "content": 1}}
+
+
+@pytest.mark.asyncio
+async def test_progress_message_shows_categories():
+    """Test progress text lists done checks per category."""
+    from services.progress import EditBudget, ProgressMessage
+
+    progress = ProgressMessage(MagicMock(), "https://example.ru", budget=EditBudget(100))
+
+    await progress.on_event("job", _job_event())
+    await progress.on_event("check", {"id": "robots", "category": "technical"})
+    await progress.on_event("check", {"id": "title", "category": "content"})
+    await progress.close()
+    text = progress.render()
+
+    assert "⏳ ⚙️ Техническая база: 1/2" in text
+    assert "✅ 📝 Контент: 1/1" in text
+    assert "Готово проверок: 2 из 3" in text
+
+
+@pytest.mark.asyncio
+async def test_progress_message_merges_fast_updates():
+    """Test checks finishing within the edit interval produce one edit."""
+    from services.progress import EditBudget, ProgressMessage
+
+    message = MagicMock()
+    message.edit_text = AsyncMock()
+    progress = ProgressMessage(message, "https://example.ru", interval=0.05, budget=EditBudget(100))
+
+    await progress.on_event("job", _job_event())
+    for check_id in ("robots", "sitemap", "title"):
+        await progress.on_event("check", {"id": check_id, "category": "technical"})
+    await asyncio.sleep(0.15)
+    await progress.close()
+
+    assert message.edit_text.call_count == 1
+    assert "Готово проверок: 3 из 3" in message.edit_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_progress_message_respects_shared_budget():
+    """Test no edits are made while the shared budget is exhausted."""
+    from services.progress import EditBudget, ProgressMessage
+
+    budget = EditBudget(1)
+    assert budget.try_acquire()
+    message = MagicMock()
+    message.edit_text = AsyncMock()
+    progress = ProgressMessage(message, "https://example.ru", interval=0.0, budget=budget)
+
+    await progress.on_event("check", {"id": "robots", "category": "technical"})
+    await asyncio.sleep(0.1)
+    await progress.close()
+
+    message.edit_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_progress_message_trimmed_when_it_cannot_be_deleted():
+    """Test finish leaves one short line if the progress message can't be deleted."""
+    from telegram.error import BadRequest
+
+    from services.progress import EditBudget, ProgressMessage
+
+    message = MagicMock()
+    message.edit_text = AsyncMock()
+    message.delete = AsyncMock(side_effect=BadRequest("Message can't be deleted"))
+    progress = ProgressMessage(message, "https://example.ru", budget=EditBudget(100))
+
+    await progress.finish()
+
+    message.delete.assert_awaited_once()
+    assert message.edit_text.call_args[0][0] == "Проверка завершена\n\n🔗 https://example.ru"